@@ -2,7 +2,7 @@ import numpy as np
 from ..utils.roulette_selection import roulette_wheel_selection
 from ..utils.heuristic_weights import normalize_for_selection
 
-def ant_solution_best_worst(graph_map: dict, pheromone_graph: dict, start_node: int, end_node: int, heuristic_weight: float, pheromone_weight: float):
+def ant_solution_best_worst(graph_map: dict, pheromone_graph: dict, start_node: int, end_node: int, heuristic_weight: float, pheromone_weight: float, rng=None):
     """
     Finds a path from the start node to the end node using an ant-inspired algorithm that incorporates pheromone levels
     and heuristic information to guide the search.
@@ -16,6 +16,7 @@ def ant_solution_best_worst(graph_map: dict, pheromone_graph: dict, start_node:
     - end_node (int): The destination node (food) in the graph.
     - heuristic_weight (float): The weight for the heuristic information used to guide the search. Higher values prioritize heuristic information.
     - pheromone_weight (float): The weight for the pheromone information used to guide the search. Higher values prioritize pheromone levels.
+    - rng (numpy.random.Generator, optional): The ant's random stream. Defaults to the global np.random state.
 
     Returns:
     - solution_path (list of int): The sequence of nodes representing the path found by the ant. Includes `np.inf` if no valid path is found.
@@ -63,7 +64,7 @@ def ant_solution_best_worst(graph_map: dict, pheromone_graph: dict, start_node:
         probabilities = combined / sum_values
 
         # Select the next node using roulette wheel selection
-        next_node_index = roulette_wheel_selection(probabilities)
+        next_node_index = roulette_wheel_selection(probabilities, rng)
         solution_path.append(int(neighbors[next_node_index-1]))
 
     # Calculate the cost of the found path
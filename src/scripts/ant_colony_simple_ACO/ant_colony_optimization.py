@@ -1,10 +1,10 @@
-import numpy as np
-from time import time
-from collections import Counter
-from scripts.utils.generators import generate_pheromone_map
-from .ant_solution_ACO import ant_solution_ACO
+from functools import partial
 
-def ACO(graph_map, start_node, end_node, ants_number, evaporation_rate, initial_pheromone_lvl, heuristic_weight, pheromone_weight, max_epochs: int = 500):
+from ..colony_engine.engine import best_route, run_colony
+from ..colony_engine.hierarchical import run_hierarchical
+from ..colony_engine.strategies import ACOStrategy
+
+def ACO(graph_map, start_node, end_node, ants_number, evaporation_rate, initial_pheromone_lvl, heuristic_weight, pheromone_weight, max_epochs: int = 500, backend: str = "auto", seed=None, hierarchical=None, **colony_options):
     """
     Performs Simple Ant Colony Optimization (ACO) to find the optimal path between start and end nodes in a graph.
 
@@ -36,6 +36,21 @@ def ACO(graph_map, start_node, end_node, ants_number, evaporation_rate, initial_
     pheromone_weight : float
         The exponent applied to the inverse of the weights (costs), determining the importance of heuristic desirability in the decision process.
 
+    backend : str
+        Walk kernel backend: "auto" (Numba when installed), "numba" or "python" (see walk_kernels).
+
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator, optional
+        Seed of the run; every ant gets its own spawned stream (see random_streams).
+        None draws from the global np.random state.
+
+    hierarchical : int, optional
+        Block size: solve a coarse graph of blocks of about this many nodes first, then refine inside a corridor
+        around its route (see hierarchical).
+
+    **colony_options
+        Other keyword arguments of run_colony (observer, candidate_list_size, local_search, threads, ...),
+        documented there.
+
     Returns:
     --------
     path : list of int
@@ -50,54 +65,13 @@ def ACO(graph_map, start_node, end_node, ants_number, evaporation_rate, initial_
     epochs : int
         The number of epochs (iterations) the algorithm ran before converging to a solution.
     """
-    start_time = time()
-    
-    pheromone_graph = generate_pheromone_map(graph_map, initial_pheromone_lvl)
-    routes = [None] * ants_number
-    distances = np.zeros(ants_number)
-
-    epochs = 0
-    counter = 0
-    
-    while counter < ants_number and epochs < max_epochs:
-        # Each ant makes its journey
-        for ant in range(ants_number):
-            path_found,path_distance = ant_solution_ACO(graph_map, pheromone_graph, start_node, end_node, heuristic_weight, pheromone_weight)
-            routes[ant] = path_found
-            distances[ant] = path_distance
-
-        # Global pheromone evaporation
-        for key in pheromone_graph:
-            pheromone_graph[key] *= (1 - evaporation_rate)
-
-        # Global pheromone deposition
-        for ant in range(ants_number):
-            if distances[ant] != np.inf:
-                for i in range(len(routes[ant]) - 1):
-                    current_route_node = routes[ant][i]
-                    next_route_node = routes[ant][i+1]
-                    indx_next_node = graph_map["connections"][current_route_node].index(next_route_node)
-                    pheromone_graph[current_route_node][indx_next_node] += 1 / distances[ant]
-
-        # Check termination criteria
-        number_of_solutions = distances[distances != np.inf].size
-        if number_of_solutions > 0:
-            _, counter = Counter(distances[distances != np.inf]).most_common(1)[0]
-
-        epochs += 1
-    
-    # Return the optimal path
-    finite_mask = distances != np.inf
-    if np.any(finite_mask):
-        best_idx = np.argmin(distances[finite_mask])
-        finite_indices = np.where(finite_mask)[0]
-        selected = finite_indices[best_idx]
-        optimal_path = routes[selected]
-        total_distance = distances[selected]
-    else:
-        optimal_path = routes[0]
-        total_distance = distances[0]
-    
-    total_time = time() - start_time
-
-    return optimal_path, total_distance, total_time, epochs
+
+    strategy = ACOStrategy(evaporation_rate)
+    solve = run_colony if hierarchical is None else partial(run_hierarchical, block_size=hierarchical)
+    state = solve(
+        graph_map, start_node, end_node, strategy, ants_number, max_epochs, initial_pheromone_lvl,
+        heuristic_weight, pheromone_weight, backend=backend, seed=seed, **colony_options,
+    )
+    optimal_path, total_distance = best_route(state)
+
+    return optimal_path, total_distance, state.time, state.epoch
@@ -2,7 +2,7 @@ import numpy as np
 from ..utils.roulette_selection import roulette_wheel_selection
 from ..utils.heuristic_weights import normalize_for_selection
 
-def ant_solution_ACO(graph_map: dict, pheromone_graph:dict, start_node:int, end_node:int, heuristic_weight:float, pheromone_weight:float):
+def ant_solution_ACO(graph_map: dict, pheromone_graph:dict, start_node:int, end_node:int, heuristic_weight:float, pheromone_weight:float, rng=None):
     """
     Executes the Ant Colony Optimization (ACO) algorithm to find a path from a start node to an end node in a graph.
 
@@ -28,6 +28,9 @@ def ant_solution_ACO(graph_map: dict, pheromone_graph:dict, start_node:int, end_
     pheromone_weight : float
         The exponent applied to the inverse of the weights (costs), representing the importance of the heuristic (desirability) in the decision process.
 
+    rng : numpy.random.Generator, optional
+        The ant's random stream. Defaults to the global np.random state.
+
     Returns:
     --------
     path : list of int or float
@@ -72,7 +75,7 @@ def ant_solution_ACO(graph_map: dict, pheromone_graph:dict, start_node:int, end_
         probabilities = combined / sum_values
 
         # select the next node based on the roulette wheel selection
-        next_node_index = roulette_wheel_selection(probabilities)
+        next_node_index = roulette_wheel_selection(probabilities, rng)
         solution_path.append(int(neighbors[next_node_index-1]))
 
     if solution_path[-1] != np.inf:  # If the ant is not lost, return the path and calculate the total cost
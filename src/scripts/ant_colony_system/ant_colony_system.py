@@ -1,10 +1,10 @@
-import numpy as np
-from time import time
-from collections import Counter
-from .ant_solution_ACS import ant_solution_ACS
-from scripts.utils.generators import generate_pheromone_map
+from functools import partial
 
-def ACS(graph_map, start_node, end_node, ants_number, global_evap_rate, local_evap_rate, transition_prob, initial_pheromone_lvl, heuristic_weight, pheromone_weight, max_epochs: int = 500):
+from ..colony_engine.engine import best_route, run_colony
+from ..colony_engine.hierarchical import run_hierarchical
+from ..colony_engine.strategies import ACSStrategy
+
+def ACS(graph_map, start_node, end_node, ants_number, global_evap_rate, local_evap_rate, transition_prob, initial_pheromone_lvl, heuristic_weight, pheromone_weight, max_epochs: int = 500, backend: str = "auto", seed=None, local_update_during_walk: bool = False, hierarchical=None, **colony_options):
     """
     Executes the Ant Colony System (ACS) elitism that considers only the ant that
     generated the best global solution, to find the best route between 2 nodes in a graph.
@@ -32,63 +32,31 @@ def ACS(graph_map, start_node, end_node, ants_number, global_evap_rate, local_ev
         Importance of pheromone information.
     heuristic_weight : float
         Importance of heuristic information.
+    backend : str
+        Walk kernel backend: "auto" (Numba when installed), "numba" or "python" (see walk_kernels).
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator, optional
+        Seed of the run; every ant gets its own spawned stream (see random_streams).
+        None draws from the global np.random state.
+    local_update_during_walk : bool
+        Apply the classic ACS local update tau <- (1 - rho) * tau + rho * tau0 while the ants
+        walk instead of after the walks (see colony_engine.strategies.ACSStrategy).
+    hierarchical : int, optional
+        Block size: solve a coarse graph of blocks of about this many nodes first, then refine inside a corridor
+        around its route (see hierarchical).
+    **colony_options
+        Other keyword arguments of run_colony (observer, candidate_list_size, local_search, threads, ...),
+        documented there.
 
     Returns:
     Optimal path: list, total distance of the optimal path: float, execution time: float, number of epochs executed: int.
     """
 
-    pheromone_graph = generate_pheromone_map(graph_map,initial_pheromone_lvl)
-    routes = [None] * ants_number  # Paths taken by each ant
-    distances = np.zeros(ants_number)
-
-    epochs = 0
-    counter = 0
-
-    start_time = time()
-    while counter < ants_number and epochs < max_epochs:
-        # Each ant makes its journey
-        for ant in range(ants_number):
-            path_found, path_distance  = ant_solution_ACS(graph_map, pheromone_graph, start_node, end_node, transition_prob, heuristic_weight, pheromone_weight)
-            routes[ant] = path_found
-            distances[ant] = path_distance
-
-        # Global pheromone evaporation
-        for key in pheromone_graph:
-            pheromone_graph[key] *= (1 - global_evap_rate)
-
-        # Sort ants based on path distances
-        sorted_indices_by_ant_solution = np.argsort(distances)
-        best_ant = sorted_indices_by_ant_solution[0]
-
-        # Perform local pheromone update on the ant's path
-        for ant in range(ants_number):
-            if distances[ant] != np.inf:
-                for i in range(len(routes[ant])-1):
-                    current_path_node = routes[ant][i]
-                    next_path_node = routes[ant][i+1]
-                    indx_next_node = graph_map["connections"][current_path_node].index(next_path_node)
-                    pheromone_graph[current_path_node][indx_next_node] = ((1 - local_evap_rate) * pheromone_graph[current_path_node][indx_next_node]) + (local_evap_rate * (1 / distances[ant]))
-
-                    if(best_ant == ant): # Deposit pheromone on the paths of the best ant
-                        pheromone_graph[current_path_node][indx_next_node] = ((1 - global_evap_rate) * pheromone_graph[current_path_node][indx_next_node]) + (global_evap_rate * (1 / distances[best_ant]))
-
-        # Analyze algorithm termination criteria
-        number_of_solutions = distances[distances != np.inf].size
-        if number_of_solutions > 0:
-            _, counter = Counter(distances[distances != np.inf]).most_common(1)[0]
-
-        epochs += 1
-
-    finite_mask = distances != np.inf
-    if np.any(finite_mask):
-        best_idx = np.argmin(distances[finite_mask])
-        finite_indices = np.where(finite_mask)[0]
-        selected = finite_indices[best_idx]
-        optimal_path = routes[selected]
-        total_distance = distances[selected]
-    else:
-        optimal_path = routes[0]
-        total_distance = distances[0]
-    total_time = time() - start_time
+    strategy = ACSStrategy(global_evap_rate, local_evap_rate, transition_prob, local_update_during_walk)
+    solve = run_colony if hierarchical is None else partial(run_hierarchical, block_size=hierarchical)
+    state = solve(
+        graph_map, start_node, end_node, strategy, ants_number, max_epochs, initial_pheromone_lvl,
+        heuristic_weight, pheromone_weight, backend=backend, seed=seed, **colony_options,
+    )
+    optimal_path, total_distance = best_route(state)
 
-    return optimal_path, total_distance, total_time, epochs
+    return optimal_path, total_distance, state.time, state.epoch
@@ -1,8 +1,9 @@
 import numpy as np
 from ..utils.roulette_selection import roulette_wheel_selection
 from ..utils.heuristic_weights import normalize_for_selection
+from ..utils.random_streams import stream
 
-def ant_solution_ACS(graph_map: dict, pheromone_graph:dict, start_node:int, end_node:int, q0: float, heuristic_weight:float, pheromone_weight:float):
+def ant_solution_ACS(graph_map: dict, pheromone_graph:dict, start_node:int, end_node:int, q0: float, heuristic_weight:float, pheromone_weight:float, rng=None):
     """
     Ant Colony System (ACS) solution for a single ant traversing the graph to find a path.
 
@@ -14,6 +15,7 @@ def ant_solution_ACS(graph_map: dict, pheromone_graph:dict, start_node:int, end_
     q0: constant parameter for probabilistic transition (exclusive to ACS) between [0,1]
     pheromone_weight (alpha): importance of pheromone values
     heuristic_weight (beta): importance of heuristic values (1 / cost)
+    rng: optional numpy Generator of the ant (defaults to the global np.random state)
 
     Returns:
     path: solution path found by the ant
@@ -39,7 +41,7 @@ def ant_solution_ACS(graph_map: dict, pheromone_graph:dict, start_node:int, end_
             break
 
         # Probabilistic choice of the next node (proposed by Ant Colony System ACS)
-        q = np.random.rand()
+        q = stream(rng).random()
         if q <= q0:
             effective_weights = normalize_for_selection(neighbors_weights)
             Z = (neighbors_pheromones ** heuristic_weight) * ((1.0 / effective_weights) ** pheromone_weight)
@@ -61,7 +63,7 @@ def ant_solution_ACS(graph_map: dict, pheromone_graph:dict, start_node:int, end_
             else:
                 probabilities = combined / sum_values
                 # Select the next node based on the roulette wheel selection
-                next_node_index = roulette_wheel_selection(probabilities)
+                next_node_index = roulette_wheel_selection(probabilities, rng)
                 solution_path.append(int(neighbors[next_node_index-1]))
 
     # return the path and calculate the incurred costs
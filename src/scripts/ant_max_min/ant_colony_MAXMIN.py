@@ -1,11 +1,18 @@
-import numpy as np
-from time import time
-from statistics import mode
-from .ant_solution_MAXMIN import ant_solution_MAXMIN
-from configuration.algorithm_settings import settings
-from scripts.utils.generators import generate_pheromone_map
+from functools import partial
 
-def ACS_MAXMIN(graph_map, start_node, end_node, num_ants, evaporation_rate, transition_probability, max_epochs, initial_pheromone, alpha, beta):
+from ..colony_engine.engine import best_route, run_colony
+from ..colony_engine.hierarchical import run_hierarchical
+from ..colony_engine.strategies import MaxMinStrategy
+
+# Support both execution modes:
+# - tests import the package as `src.scripts...`
+# - the notebook adds `src` to sys.path (so configuration is top-level)
+try:
+    from src.configuration.algorithm_settings import settings  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover
+    from configuration.algorithm_settings import settings
+
+def ACS_MAXMIN(graph_map, start_node, end_node, num_ants, evaporation_rate, transition_probability, max_epochs, initial_pheromone, alpha, beta, backend="auto", seed=None, hierarchical=None, **colony_options):
     """
     Ant Colony System with MAX-MIN strategy over a dict-based graph.
 
@@ -22,79 +29,23 @@ def ACS_MAXMIN(graph_map, start_node, end_node, num_ants, evaporation_rate, tran
     max_epochs: Maximum number of epochs to run the algorithm
     initial_pheromone: Initial pheromone level on all edges
     alpha and beta: Parameters to weigh the importance of heuristic and pheromone values
+    backend: Walk kernel backend: "auto" (Numba when installed), "numba" or "python" (see walk_kernels)
+    seed: Optional int, SeedSequence or Generator; each ant draws from its own spawned stream (None uses the global np.random state)
+    hierarchical: Optional block size; solve a coarse graph of blocks of about this many nodes first, then refine
+        inside a corridor around its route (see hierarchical)
+    **colony_options: Other keyword arguments of run_colony (observer, candidate_list_size, local_search, threads,
+        ...), documented there
 
     Returns:
     total_epochs: Number of epochs executed
     """
-    tic = time()
-
-    pheromone_graph = generate_pheromone_map(graph_map, initial_pheromone)
-    ant_paths = [None] * num_ants
-    ant_distances = np.full(num_ants, np.inf)
-
-    epochs = 0
-    number_ants_following_path = 0
-    
-    while number_ants_following_path < num_ants and epochs < max_epochs:
-        # Each ant performs its tour
-        for ant_idx in range(num_ants):
-            path, cost = ant_solution_MAXMIN(
-                graph_map,
-                pheromone_graph,
-                start_node,
-                end_node,
-                transition_probability,
-                alpha,
-                beta,
-            )
-            ant_paths[ant_idx] = path
-            ant_distances[ant_idx] = cost
-
-        # Global pheromone evaporation
-        for node in pheromone_graph:
-            pheromone_graph[node] *= (1 - evaporation_rate)
-
-        # Sort results to find the best ant path
-        sorted_indices = np.argsort(ant_distances)
-        best_idx = sorted_indices[0]
-
-        # Deposit pheromone on the best ant path only
-        best_cost = ant_distances[best_idx]
-        if np.isfinite(best_cost):
-            best_route = ant_paths[best_idx]
-            for i in range(len(best_route) - 1):
-                u = best_route[i]
-                v = best_route[i + 1]
-                j = graph_map["connections"][u].index(v)
-                pheromone_graph[u][j] += evaporation_rate * (1.0 / best_cost)
-
-        # Clamp pheromone within [f_min, f_max]
-        f_min = settings.get("f_min", 0.0)
-        f_max = settings.get("f_max", 1.0)
-        for node in pheromone_graph:
-            pheromone_graph[node] = np.clip(pheromone_graph[node], f_min, f_max)
-
-        # Check stopping criterion
-        finite = ant_distances[np.isfinite(ant_distances)]
-        if finite.size > 0:
-            try:
-                most_common_distance = mode(finite)
-                number_ants_following_path = list(finite).count(most_common_distance)
-            except Exception:
-                number_ants_following_path = 0
-
-        epochs += 1
 
-    # Return best finite path
-    finite_mask = np.isfinite(ant_distances)
-    if np.any(finite_mask):
-        finite_indices = np.where(finite_mask)[0]
-        best_idx = finite_indices[np.argmin(ant_distances[finite_mask])]
-        path = ant_paths[best_idx]
-        cost = ant_distances[best_idx]
-    else:
-        path = ant_paths[0] or []
-        cost = ant_distances[0]
+    strategy = MaxMinStrategy(evaporation_rate, transition_probability, settings.get("f_min", 0.0), settings.get("f_max", 1.0))
+    solve = run_colony if hierarchical is None else partial(run_hierarchical, block_size=hierarchical)
+    state = solve(
+        graph_map, start_node, end_node, strategy, num_ants, max_epochs, initial_pheromone,
+        alpha, beta, backend=backend, seed=seed, **colony_options,
+    )
+    path, cost = best_route(state, mark_lost=False)
 
-    t = time() - tic
-    return [int(node) for node in path], float(cost), t, epochs
+    return path, float(cost), state.time, state.epoch
@@ -1,12 +1,15 @@
 import numpy as np
 from ..utils.roulette_selection import roulette_wheel_selection
 from ..utils.heuristic_weights import normalize_for_selection
+from ..utils.random_streams import stream
 
 
-def ant_solution_MAXMIN(graph_map, pheromone_graph, start_node, end_node, q0, alpha, beta):
+def ant_solution_MAXMIN(graph_map, pheromone_graph, start_node, end_node, q0, alpha, beta, rng=None):
     """
     Finds a solution path for an ant using the MAX-MIN Ant System.
 
+    rng is the ant's optional numpy Generator (defaults to the global np.random state).
+
     Returns:
         tuple[list[int], float]: path and its cumulative cost (inf if no route).
     """
@@ -42,7 +45,7 @@ def ant_solution_MAXMIN(graph_map, pheromone_graph, start_node, end_node, q0, al
 
         attractiveness = (valid_pheromones ** alpha) * heuristic
 
-        if np.random.rand() <= q0:
+        if stream(rng).random() <= q0:
             best_idx = np.argmax(attractiveness)
             next_node = int(valid_neighbors[best_idx])
         else:
@@ -51,7 +54,7 @@ def ant_solution_MAXMIN(graph_map, pheromone_graph, start_node, end_node, q0, al
                 probabilities = np.ones_like(attractiveness) / len(attractiveness)
             else:
                 probabilities = attractiveness / total_attractiveness
-            selected_idx = roulette_wheel_selection(probabilities) - 1
+            selected_idx = roulette_wheel_selection(probabilities, rng) - 1
             next_node = int(valid_neighbors[selected_idx])
 
         path.append(next_node)
@@ -0,0 +1,186 @@
+"""Batch solver for many (origin, destination) pairs on one city.
+
+``solve_od_pairs`` compiles the graph and its edge heuristic once, groups the
+pairs by destination and solves every group with the same colony, each query
+starting from the trails left by the previous one (trails towards one
+destination are useful to any origin). Groups are spread over a process
+pool; every worker receives the compiled graph once.
+
+Each pair gets its own seed spawned from the batch seed in input order, so
+results do not depend on the number of processes. Optionally every result is
+compared with the optimal cost of a one-to-many Dijkstra, run once per
+origin::
+
+    results = solve_od_pairs(city, [(1, 60), (8, 60), (1, 63)], "ACS", processes=4, seed=0,
+                             compare_dijkstra=True)
+    write_results_csv(results, "od.csv")
+"""
+
+import csv
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+import numpy as np
+
+from ..colony_engine.engine import best_route, run_colony
+from ..colony_engine.strategies import ACOStrategy, ACSStrategy, BestWorstStrategy, MaxMinStrategy
+from ..utils.chain_compression import COMPRESSION_MODES, compress_chains
+from ..utils.node_index import to_dense
+from ..utils.random_streams import spawn_seeds
+from ..utils.route_finder import dijkstra_distances
+from ..utils.walk_kernels import prepare_walk_graph
+
+try:
+    from src.configuration.algorithm_settings import settings  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover
+    from configuration.algorithm_settings import settings
+
+ALGORITHMS = ("ACO", "ACS", "ABW", "ACS_MAXMIN")
+
+# Compiled graph of a pool worker, set once by _init_worker
+_worker_graph = None
+
+
+def build_strategy(name, parameters):
+    """Return a fresh ColonyStrategy for an algorithm and its settings (see algorithm_settings)."""
+    p = parameters
+    if name == "ACO":
+        return ACOStrategy(p["evaporation_rate"])
+    if name == "ACS":
+        return ACSStrategy(p["evaporation_rate"], p["local_evaporation_rate"], p["transition_probability"])
+    if name == "ABW":
+        return BestWorstStrategy(p["evaporation_rate"], p["f_min"])
+    if name == "ACS_MAXMIN":
+        return MaxMinStrategy(p["evaporation_rate"], p["transition_probability"], p["f_min"], p["f_max"])
+    raise ValueError(f"Unknown algorithm: {name!r}")
+
+
+def _init_worker(walk_graph):
+    global _worker_graph
+    _worker_graph = walk_graph
+
+
+def _solve_group(walk_graph, name, parameters, queries, backend, warm_start, goal_directed):
+    """Solve the queries (index, origin, destination, seed) of one destination in order."""
+    p = parameters
+    walk_graph = _worker_graph if walk_graph is None else walk_graph
+    trails = None
+    rows = []
+    for index, origin, destination, seed in queries:
+        tic = perf_counter()
+        state = run_colony(
+            walk_graph, origin, destination, build_strategy(name, p), p["ants"], p["epomax"], p["f_ini"],
+            p["alfa"], p["beta"], backend=backend, seed=seed, warm_start=trails, goal_directed=goal_directed,
+        )
+        path, cost = best_route(state, mark_lost=name != "ACS_MAXMIN")
+        if warm_start:
+            trails = state.pheromones
+        rows.append((index, {
+            "origin": origin,
+            "destination": destination,
+            "path": path,
+            "cost": float(cost),
+            "epochs": state.epoch,
+            "time_s": perf_counter() - tic,
+        }))
+    return rows
+
+
+def _origin_costs(walk_graph, origin, destinations):
+    """Optimal cost from one origin to each destination."""
+    walk_graph = _worker_graph if walk_graph is None else walk_graph
+    distances = dijkstra_distances(walk_graph, origin)
+    return origin, dict(zip(destinations, distances[to_dense(walk_graph, destinations)].tolist()))
+
+
+def solve_od_pairs(graph_map, od_pairs, algorithm="ACS", parameters=None, processes=None, seed=None, backend="auto",
+                   compare_dijkstra=False, warm_start=True, goal_directed=False, chain_compression=None):
+    """
+    Solve many (origin, destination) pairs over one shared compiled graph.
+
+    Parameters:
+        graph_map (dict): Dict graph or compact graph.
+        od_pairs (array-like): (origin, destination) pairs in external ids.
+        algorithm (str): One of ALGORITHMS.
+        parameters (dict, optional): Algorithm settings (keys of
+            algorithm_settings.settings); defaults to ``settings``.
+        processes (int, optional): Pool size; None uses every CPU and 1 runs
+            in the calling process.
+        seed: Batch seed; every pair gets a spawned child (see random_streams).
+            None draws from the global np.random state of each process.
+        backend (str): Walk kernel backend (see walk_kernels).
+        compare_dijkstra (bool): Add the optimal cost and the relative gap.
+        warm_start (bool): Start every query from the trails of the previous
+            query with the same destination.
+        goal_directed (bool): Goal-directed heuristic (see goal_heuristic); the
+            distances to a destination are computed once per group.
+        chain_compression (str, optional): "chains" or "bus_express" (see
+            chain_compression); the graph is compressed once, keeping every
+            origin and destination, and the paths are expanded.
+
+    Returns:
+        list: One dict per pair, in input order, with origin, destination,
+        path, cost, epochs and time_s (plus dijkstra_cost and cost_gap).
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm: {algorithm!r}")
+    p = dict(settings)
+    p.update(parameters or {})
+    pairs = [(origin, destination) for origin, destination in od_pairs]
+    seeds = spawn_seeds(seed, len(pairs)) if seed is not None else [None] * len(pairs)
+
+    if chain_compression is not None:
+        if chain_compression not in COMPRESSION_MODES:
+            raise ValueError(f"Unknown chain_compression: {chain_compression!r}")
+        endpoints = list({node for pair in pairs for node in pair})
+        graph_map = compress_chains(graph_map, keep=endpoints, bus_express=chain_compression == "bus_express")
+    walk_graph = prepare_walk_graph(graph_map, p["beta"])
+    groups = {}
+    for index, (origin, destination) in enumerate(pairs):
+        groups.setdefault(destination, []).append((index, origin, destination, seeds[index]))
+    destinations_of = {}
+    for origin, destination in pairs:
+        destinations_of.setdefault(origin, []).append(destination)
+
+    results = [None] * len(pairs)
+    optimal = {}
+    if processes == 1:
+        for queries in groups.values():
+            for index, row in _solve_group(walk_graph, algorithm, p, queries, backend, warm_start, goal_directed):
+                results[index] = row
+        if compare_dijkstra:
+            for origin, destinations in destinations_of.items():
+                optimal[origin] = _origin_costs(walk_graph, origin, destinations)[1]
+    else:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(walk_graph,)) as pool:
+            solving = [pool.submit(_solve_group, None, algorithm, p, queries, backend, warm_start, goal_directed)
+                       for queries in groups.values()]
+            costing = [pool.submit(_origin_costs, None, origin, destinations)
+                       for origin, destinations in destinations_of.items()] if compare_dijkstra else []
+            for future in solving:
+                for index, row in future.result():
+                    results[index] = row
+            for future in costing:
+                origin, costs = future.result()
+                optimal[origin] = costs
+
+    if compare_dijkstra:
+        for row in results:
+            reference = optimal[row["origin"]][row["destination"]]
+            row["dijkstra_cost"] = reference
+            row["cost_gap"] = ((row["cost"] - reference) / reference
+                               if np.isfinite(row["cost"]) and np.isfinite(reference) and reference > 0 else None)
+    return results
+
+
+def write_results_csv(results, path):
+    """Write the results table as CSV; paths are space-separated node ids."""
+    if not results:
+        fieldnames = ["origin", "destination", "path", "cost", "epochs", "time_s"]
+    else:
+        fieldnames = list(results[0])
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=fieldnames)
+        writer.writeheader()
+        for row in results:
+            writer.writerow({**row, "path": " ".join(str(node) for node in (row["path"] or []))})
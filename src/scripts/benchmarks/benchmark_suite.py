@@ -0,0 +1,278 @@
+"""Benchmark suite for the colonies and Dijkstra on square toy cities.
+
+Every case runs one algorithm on a ``size`` x ``size`` grid with a number of
+vertical bus lines, from the top-left corner to the bottom-right corner, using
+the parameters of an algorithm settings preset. The suite records:
+
+- wall time, epochs and time per epoch,
+- the cost gap against Dijkstra's optimal route,
+- the peak traced memory (a separate run under tracemalloc, so the timing
+  itself is not slowed down by tracing).
+
+Results are written as JSON so runs can be compared over time, and a previous
+results file can be used as a baseline to flag slowdowns::
+
+    python -m src.scripts.benchmarks.benchmark_suite --sizes 10 20 --output bench.json
+    python -m src.scripts.benchmarks.benchmark_suite --sizes 10 20 --baseline bench.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tracemalloc
+from datetime import datetime, timezone
+from time import perf_counter
+
+import numpy as np
+
+from ..ant_best_worst.ant_colony_best_worst import ABW
+from ..ant_colony_simple_ACO.ant_colony_optimization import ACO
+from ..ant_colony_system.ant_colony_system import ACS
+from ..ant_max_min.ant_colony_MAXMIN import ACS_MAXMIN
+from ..utils.generators import merge_bus_and_map_graph
+from ..utils.route_finder import dijkstra
+from ..utils.toy_city_generators import generate_bus_lines_square_city, generate_square_city_graph
+
+try:
+    from src.configuration.algorithm_settings import load_profile, presets, settings  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover
+    from configuration.algorithm_settings import load_profile, presets, settings
+
+DEFAULT_SIZES = (10, 50, 100, 250, 500)
+DEFAULT_BUS_LINES = (0, 1, 4)
+ALGORITHMS = ("ACO", "ACS", "ABW", "ACS_MAXMIN", "dijkstra")
+
+
+def load_parameters(profile="settings"):
+    """Return the algorithm parameters of ``settings`` or of a named preset."""
+    if profile == "settings":
+        return dict(settings)
+    if profile not in presets:
+        raise ValueError(f"Unknown settings profile: {profile!r}")
+    return load_profile(profile)
+
+
+def build_city(size, bus_lines, fixed_weight=1):
+    """Build a square city with ``bus_lines`` evenly spread vertical bus lines."""
+    city = generate_square_city_graph(size, fixed_weight)
+    if bus_lines > 0:
+        city = merge_bus_and_map_graph(city, generate_bus_lines_square_city(size, fixed_weight, bus_lines))
+    return city
+
+
+def path_cost(graph, path):
+    """Return the cost of a path of a dict graph (inf for a missing or broken path)."""
+    if not path or path[-1] == np.inf:
+        return np.inf
+    total = 0.0
+    for start, end in zip(path, path[1:]):
+        try:
+            total += graph["weights"][start][graph["connections"][start].index(end)]
+        except (KeyError, ValueError):
+            return np.inf
+    return total
+
+
+def run_algorithm(name, graph, start_node, end_node, parameters, seed=None, backend="auto"):
+    """
+    Run one algorithm with the parameters of a settings preset.
+
+    Returns:
+        tuple: (path, cost, epochs); Dijkstra reports a single epoch.
+    """
+    p = parameters
+    if name == "dijkstra":
+        path = dijkstra(graph, start_node, end_node)
+        return path, path_cost(graph, path), 1
+    if name == "ACO":
+        result = ACO(graph, start_node, end_node, p["ants"], p["evaporation_rate"], p["f_ini"], p["alfa"], p["beta"],
+                     p["epomax"], backend=backend, seed=seed)
+    elif name == "ACS":
+        result = ACS(graph, start_node, end_node, p["ants"], p["evaporation_rate"], p["local_evaporation_rate"],
+                     p["transition_probability"], p["f_ini"], p["alfa"], p["beta"], p["epomax"], backend=backend, seed=seed)
+    elif name == "ABW":
+        result = ABW(graph, start_node, end_node, p["ants"], p["evaporation_rate"], p["epomax"], p["f_ini"], p["alfa"],
+                     p["beta"], backend=backend, seed=seed)
+    elif name == "ACS_MAXMIN":
+        result = ACS_MAXMIN(graph, start_node, end_node, p["ants"], p["evaporation_rate"], p["transition_probability"],
+                            p["epomax"], p["f_ini"], p["alfa"], p["beta"], backend=backend, seed=seed)
+    else:
+        raise ValueError(f"Unknown algorithm: {name!r}")
+    path, cost, _, epochs = result
+    return path, float(cost), epochs
+
+
+def _peak_memory(name, graph, start_node, end_node, parameters, seed, backend):
+    tracemalloc.start()
+    try:
+        run_algorithm(name, graph, start_node, end_node, parameters, seed=seed, backend=backend)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def benchmark_case(name, graph, start_node, end_node, parameters, reference_cost, seed=0, backend="auto", measure_memory=True):
+    """
+    Benchmark one algorithm on one graph.
+
+    Parameters:
+        name (str): One of ALGORITHMS.
+        graph (dict): Dict graph (kept unchanged).
+        start_node, end_node: Route end points.
+        parameters (dict): Algorithm settings (see load_parameters).
+        reference_cost (float): Dijkstra's optimal cost for the cost gap.
+        seed (int): Seed passed to the colonies.
+        backend (str): Walk kernel backend of the colonies.
+        measure_memory (bool): Also measure the peak traced memory.
+
+    Returns:
+        dict: Measured metrics of the case.
+    """
+    tic = perf_counter()
+    _, cost, epochs = run_algorithm(name, graph, start_node, end_node, parameters, seed=seed, backend=backend)
+    wall_time = perf_counter() - tic
+
+    gap = (cost - reference_cost) / reference_cost if np.isfinite(cost) and reference_cost > 0 else None
+    return {
+        "wall_time_s": wall_time,
+        "epochs": int(epochs),
+        "time_per_epoch_s": wall_time / max(1, epochs),
+        "cost": cost if np.isfinite(cost) else None,
+        "dijkstra_cost": reference_cost,
+        "cost_gap": gap,
+        "peak_memory_bytes": _peak_memory(name, graph, start_node, end_node, parameters, seed, backend) if measure_memory else None,
+    }
+
+
+def run_suite(sizes=DEFAULT_SIZES, bus_lines=DEFAULT_BUS_LINES, algorithms=ALGORITHMS, profiles=("settings",),
+              seed=0, backend="auto", max_epochs=None, ants=None, measure_memory=True, log=None):
+    """
+    Run every combination of grid size, bus lines, settings profile and algorithm.
+
+    Parameters:
+        sizes (iterable of int): Grid sizes (nodes per side).
+        bus_lines (iterable of int): Numbers of bus lines.
+        algorithms (iterable of str): Names from ALGORITHMS.
+        profiles (iterable of str): "settings" or preset names of algorithm_settings.
+        seed (int): Seed of the colonies.
+        backend (str): Walk kernel backend of the colonies.
+        max_epochs (int, optional): Override the profiles' "epomax".
+        ants (int, optional): Override the profiles' "ants".
+        measure_memory (bool): Measure the peak traced memory of every case.
+        log (callable, optional): Called with a progress line per case.
+
+    Returns:
+        dict: {"metadata": {...}, "results": [...]} ready to be dumped as JSON.
+    """
+    results = []
+    for size in sizes:
+        for lines in bus_lines:
+            graph = build_city(size, lines)
+            start_node, end_node = 0, size * size - 1
+            reference_cost = path_cost(graph, dijkstra(graph, start_node, end_node))
+
+            for profile in profiles:
+                parameters = load_parameters(profile)
+                if max_epochs is not None:
+                    parameters["epomax"] = max_epochs
+                if ants is not None:
+                    parameters["ants"] = ants
+
+                for name in algorithms:
+                    metrics = benchmark_case(
+                        name, graph, start_node, end_node, parameters, reference_cost,
+                        seed=seed, backend=backend, measure_memory=measure_memory,
+                    )
+                    case = {"algorithm": name, "size": size, "bus_lines": lines, "profile": profile}
+                    case.update(metrics)
+                    results.append(case)
+                    if log is not None:
+                        log(f"{name:>10} size={size} bus_lines={lines} profile={profile} "
+                            f"time={metrics['wall_time_s']:.3f}s epochs={metrics['epochs']} gap={metrics['cost_gap']}")
+
+    metadata = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "seed": seed,
+        "backend": backend,
+        "max_epochs": max_epochs,
+        "ants": ants,
+    }
+    return {"metadata": metadata, "results": results}
+
+
+def _case_key(case):
+    return case["algorithm"], case["size"], case["bus_lines"], case["profile"]
+
+
+def find_regressions(results, baseline, metric="wall_time_s", tolerance=0.2, min_delta=0.05):
+    """
+    Compare a run against a baseline run.
+
+    A case regresses when ``metric`` grew by more than ``tolerance`` (relative)
+    and by more than ``min_delta`` (absolute, to ignore noise on tiny cases).
+    Cases missing from either run are ignored.
+
+    Parameters:
+        results (dict): Output of run_suite.
+        baseline (dict): A previous output of run_suite.
+
+    Returns:
+        list of dict: One entry per regressed case with both values.
+    """
+    previous = {_case_key(case): case for case in baseline["results"]}
+    regressions = []
+    for case in results["results"]:
+        old = previous.get(_case_key(case))
+        if old is None or old.get(metric) is None or case.get(metric) is None:
+            continue
+        if case[metric] > old[metric] * (1 + tolerance) and case[metric] - old[metric] > min_delta:
+            regression = dict(zip(("algorithm", "size", "bus_lines", "profile"), _case_key(case)))
+            regression.update({"metric": metric, "baseline": old[metric], "current": case[metric]})
+            regressions.append(regression)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the colonies and Dijkstra on square toy cities.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--bus-lines", type=int, nargs="+", default=list(DEFAULT_BUS_LINES))
+    parser.add_argument("--algorithms", nargs="+", default=list(ALGORITHMS), choices=ALGORITHMS)
+    parser.add_argument("--profiles", nargs="+", default=["settings"], choices=["settings"] + sorted(presets))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", default="auto", choices=["auto", "numba", "python"])
+    parser.add_argument("--max-epochs", type=int, default=None, help="Override the profiles' epomax")
+    parser.add_argument("--ants", type=int, default=None, help="Override the profiles' number of ants")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the peak memory run")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Previous results JSON used as regression gate")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown")
+    args = parser.parse_args(argv)
+
+    results = run_suite(
+        sizes=args.sizes, bus_lines=args.bus_lines, algorithms=args.algorithms, profiles=args.profiles,
+        seed=args.seed, backend=args.backend, max_epochs=args.max_epochs, ants=args.ants,
+        measure_memory=not args.no_memory, log=print,
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        regressions = find_regressions(results, baseline, tolerance=args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression['algorithm']} size={regression['size']} bus_lines={regression['bus_lines']} "
+                  f"profile={regression['profile']}: {regression['baseline']:.3f}s -> {regression['current']:.3f}s")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""Checkpoints of colony runs.
+
+Long runs (``epomax`` in the thousands on big maps) lose all their progress
+when a worker is preempted. ``run_colony(checkpoint=path)`` saves the colony
+every ``checkpoint_every`` epochs (and when it stops) to a compressed ``.npz``
+file, and ``run_colony(resume=path)`` carries on from it bit-exactly:
+
+- the pheromone store (dense array, LazyPheromones or SparsePheromones, with
+  their internal arrays),
+- the epoch, the global best cost, the convergence counters and the routes
+  of the last epoch,
+- the strategy attributes listed in ``checkpoint_attributes`` (e.g. ABW's
+  ``stagnant_count`` and ``epoch_before_restart``),
+- the state of every random stream (colony and ants, or the global
+  np.random state for unseeded runs).
+
+Scalars and random states travel as one JSON string inside the archive, so
+loading never unpickles anything. A checkpoint is written to a temporary
+file first and then renamed, so a preempted write never corrupts the last
+good one. ``load_checkpoint(path)["pheromones"]`` also makes a good
+``warm_start`` for follow-up queries on the same graph.
+"""
+
+import copy
+import json
+import os
+
+import numpy as np
+
+from ..utils.lazy_evaporation import LazyPheromones
+from ..utils.sparse_pheromones import SparsePheromones
+
+_STORES = {"lazy": LazyPheromones, "sparse": SparsePheromones}
+_ROUTE_FIELDS = ("nodes", "edges", "lengths", "status", "costs", "hashes")
+
+
+def _rng_state(rng):
+    if rng is np.random:
+        state = np.random.get_state(legacy=False)
+        state["state"]["key"] = state["state"]["key"].tolist()
+        return state
+    return rng.bit_generator.state
+
+
+def _set_rng_state(rng, state):
+    if rng is np.random:
+        state["state"]["key"] = np.asarray(state["state"]["key"], dtype=np.uint32)
+        np.random.set_state(state)
+    else:
+        rng.bit_generator.state = state
+
+
+def save_checkpoint(path, state, strategy, ant_rngs, start, end):
+    """
+    Write the colony to ``path`` (see the module docstring).
+
+    Parameters:
+        path (str): Checkpoint file.
+        state (ColonyState): Colony between two epochs.
+        strategy (ColonyStrategy): Strategy of the run.
+        ant_rngs (list or None): Per-ant streams (None for unseeded runs).
+        start, end (int): Dense ant hill and food, checked when resuming.
+    """
+    tau = state.pheromones
+    store = next((name for name, kind in _STORES.items() if isinstance(tau, kind)), "dense")
+    arrays = tau.to_arrays() if store != "dense" else {"levels": tau}
+    arrays = {f"pheromones.{key}": value for key, value in arrays.items()}
+    arrays.update({f"routes.{field}": getattr(state.routes, field) for field in _ROUTE_FIELDS})
+
+    meta = {
+        "strategy": type(strategy).__name__,
+        "store": store,
+        "edges": int(state.walk_graph["indices"].size),
+        "ants_number": int(state.ants_number),
+        "start": int(start),
+        "end": int(end),
+        "epoch": int(state.epoch),
+        "best_cost": float(state.best_cost),
+        "cut_ants": int(state.cut_ants),
+        "converged_ants": int(state.converged_ants),
+        "most_common_cost": None if state.most_common_cost is None else float(state.most_common_cost),
+        "strategy_state": {name: getattr(strategy, name) for name in strategy.checkpoint_attributes},
+        "colony_rng": _rng_state(state.random),
+        "ant_rngs": None if ant_rngs is None else [_rng_state(rng) for rng in ant_rngs],
+    }
+    arrays["meta"] = np.array(json.dumps(meta, default=lambda value: value.item()))
+
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as file:
+        np.savez_compressed(file, **arrays)
+    os.replace(temporary, path)
+
+
+def load_checkpoint(path):
+    """
+    Read a checkpoint.
+
+    Returns:
+        dict: The metadata of save_checkpoint plus "pheromones" (the store,
+        rebuilt) and "routes" (the route arrays of the last epoch).
+    """
+    with np.load(path) as archive:
+        checkpoint = json.loads(str(archive["meta"]))
+        pheromones = {key.split(".", 1)[1]: archive[key] for key in archive.files if key.startswith("pheromones.")}
+        checkpoint["routes"] = {field: archive[f"routes.{field}"] for field in _ROUTE_FIELDS}
+    store = checkpoint["store"]
+    checkpoint["pheromones"] = pheromones["levels"] if store == "dense" else _STORES[store].from_arrays(pheromones)
+    return checkpoint
+
+
+def restore_checkpoint(checkpoint, state, strategy, ant_rngs, start, end):
+    """
+    Put a colony back in the state of a checkpoint (after strategy.setup).
+
+    Parameters:
+        checkpoint (str or dict): Checkpoint file or load_checkpoint result.
+        state, strategy, ant_rngs, start, end: As in save_checkpoint.
+
+    Raises:
+        ValueError: If the checkpoint belongs to another query, graph, colony
+            or pheromone store.
+    """
+    if not isinstance(checkpoint, dict):
+        checkpoint = load_checkpoint(checkpoint)
+    tau = state.pheromones
+    store = next((name for name, kind in _STORES.items() if isinstance(tau, kind)), "dense")
+    expected = {"strategy": type(strategy).__name__, "store": store, "edges": int(state.walk_graph["indices"].size),
+                "ants_number": int(state.ants_number), "start": int(start), "end": int(end)}
+    mismatched = [key for key, value in expected.items() if checkpoint[key] != value]
+    if mismatched or (checkpoint["ant_rngs"] is None) != (ant_rngs is None):
+        raise ValueError(f"Checkpoint does not match this run: {mismatched or ['seed']}")
+
+    state.pheromones = copy.deepcopy(checkpoint["pheromones"])
+    for field, values in checkpoint["routes"].items():
+        setattr(state.routes, field, np.array(values))
+    state.epoch = checkpoint["epoch"]
+    state.best_cost = checkpoint["best_cost"]
+    state.cut_ants = checkpoint["cut_ants"]
+    state.converged_ants = checkpoint["converged_ants"]
+    state.most_common_cost = checkpoint["most_common_cost"]
+    for name, value in checkpoint["strategy_state"].items():
+        setattr(strategy, name, value)
+
+    _set_rng_state(state.random, checkpoint["colony_rng"])
+    for rng, rng_state in zip(ant_rngs or [], checkpoint["ant_rngs"] or []):
+        _set_rng_state(rng, rng_state)
@@ -0,0 +1,353 @@
+"""Epoch engine shared by every colony.
+
+ACO, ACS, ABW and ACS_MAXMIN only differ in how ants choose their next node
+and in how the pheromones are updated after the walks. ``run_colony`` owns
+everything else (graph compilation, random streams, walks, convergence test,
+telemetry) and delegates the differences to a ColonyStrategy, whose hooks are
+called once per epoch in this order::
+
+    walk -> [local search] -> evaporate -> local_update -> deposit -> clamp
+         -> mutate -> convergence test -> restart
+
+The colony stops when every ant walked the most common cost or after
+``max_epochs`` epochs.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from time import time
+
+import numpy as np
+
+from ..utils.candidate_lists import build_candidate_lists
+from ..utils.chain_compression import COMPRESSION_MODES, compress_chains, expand_edges
+from ..utils.goal_heuristic import distances_to, goal_directed_eta
+from ..utils.lazy_evaporation import LazyPheromones
+from ..utils.node_index import to_dense
+from ..utils.random_streams import colony_streams, stream
+from ..utils.reachability import can_reach
+from ..utils.route_buffer import RouteBuffer
+from ..utils.sparse_pheromones import SparsePheromones
+from ..utils.telemetry import PhaseTimer, epoch_record
+from ..utils.walk_kernels import WALK_CUT, prepare_walk_graph, walk_ants, walk_threads
+from .checkpoint import restore_checkpoint, save_checkpoint
+
+# Smallest pocket of unvisited nodes an ant may enter with dead_end_pruning="lookahead"
+LOOKAHEAD_POCKET = 32
+
+
+class ColonyState:
+    """
+    Mutable state of a colony run, shared with the strategy hooks.
+
+    Attributes:
+        walk_graph (dict): Compact graph with the "eta" edge heuristic.
+        pheromones (numpy.ndarray, LazyPheromones or SparsePheromones):
+            Pheromone level of every edge.
+        initial_pheromone (float): Initial (and restart) pheromone level.
+        ants_number (int): Number of ants.
+        max_epochs (int): Epoch limit.
+        epoch (int): Current epoch (0-based).
+        random: Colony random stream (Generator or the np.random module).
+        routes (RouteBuffer): Routes of the last epoch (nodes, edges, hashes).
+        distances (numpy.ndarray): Cost of every ant (inf when it did not arrive).
+        status (numpy.ndarray): Walk outcome of every ant (see walk_kernels).
+        most_common_cost (float or None): Most frequent finite cost of the epoch.
+        converged_ants (int): Number of ants that walked ``most_common_cost``.
+        best_cost (float): Cheapest cost found so far (inf before any arrival).
+        cut_ants (int): Ants cut by a walk budget over the whole run.
+        time (float): Run time in seconds, set when the run ends.
+    """
+
+    def __init__(self, walk_graph, initial_pheromone, ants_number, max_epochs, random, sparse=False, lazy=False):
+        self.walk_graph = walk_graph
+        self.initial_pheromone = float(initial_pheromone)
+        if sparse:
+            self.pheromones = SparsePheromones(walk_graph["indices"].size, self.initial_pheromone)
+        elif lazy:
+            self.pheromones = LazyPheromones(walk_graph["indices"].size, self.initial_pheromone)
+        else:
+            self.pheromones = np.full(walk_graph["indices"].size, self.initial_pheromone)
+        self.ants_number = ants_number
+        self.max_epochs = max_epochs
+        self.epoch = 0
+        self.random = random
+        self.routes = RouteBuffer(ants_number)
+        self.most_common_cost = None
+        self.converged_ants = 0
+        self.best_cost = np.inf
+        self.cut_ants = 0
+        self.time = 0.0
+
+    @property
+    def distances(self):
+        return self.routes.costs
+
+    @property
+    def status(self):
+        return self.routes.status
+
+    def reset_pheromones(self):
+        """Put every edge back to the initial pheromone level, in place."""
+        self.pheromones.fill(self.initial_pheromone)
+
+
+class ColonyStrategy:
+    """
+    Base strategy: plain evaporation and no update at all.
+
+    Subclasses override the hooks they need; every hook receives the
+    ColonyState and updates ``state.pheromones`` in place (or replaces it).
+
+    Attributes:
+        evaporation_rate (float): Global evaporation rate in [0, 1].
+        walk_options (dict): Extra keyword arguments of run_ant_walks
+            (``q0``, ``revisit``, ``max_steps``).
+        checkpoint_attributes (tuple): Attributes carrying state from one
+            epoch to the next, saved in checkpoints (see checkpoint).
+    """
+
+    checkpoint_attributes = ()
+
+    def __init__(self, evaporation_rate):
+        self.evaporation_rate = evaporation_rate
+        self.walk_options = {}
+
+    def setup(self, graph_map, state):
+        """Called once before the first epoch."""
+
+    def evaporate(self, state):
+        state.pheromones *= (1 - self.evaporation_rate)
+
+    def local_update(self, state):
+        """Per-ant update of the walked edges (ACS)."""
+
+    def deposit(self, state):
+        """Global pheromone deposit."""
+
+    def clamp(self, state):
+        """Keep the pheromones within bounds (MAX-MIN)."""
+
+    def mutate(self, state):
+        """Perturb the pheromones (ABW)."""
+
+    def restart(self, state):
+        """Called after the convergence test; return True when the colony restarted."""
+        return False
+
+
+def _update_convergence(state):
+    finite = state.distances[np.isfinite(state.distances)]
+    state.most_common_cost = None
+    if finite.size > 0:
+        costs, first_seen, counts = np.unique(finite, return_index=True, return_counts=True)
+        # Most frequent cost; ties go to the cost seen first
+        selected = np.lexsort((first_seen, -counts))[0]
+        state.most_common_cost = costs[selected]
+        state.converged_ants = int(counts[selected])
+
+
+def _route_stats(state):
+    representatives, multiplicity = state.routes.unique_routes()
+    if representatives.size == 0:
+        return {"distinct_routes": 0, "best_route_ants": 0}
+    cheapest = np.argmin(state.distances[representatives])
+    return {"distinct_routes": int(representatives.size), "best_route_ants": int(multiplicity[cheapest])}
+
+
+def run_colony(graph_map, start_node, end_node, strategy, ants_number, max_epochs, initial_pheromone, alpha, beta,
+               backend="auto", seed=None, observer=None, candidate_list_size=None, warm_start=None, local_search=None,
+               dead_end_pruning=None, goal_directed=False, backtrack=0, max_steps=None, cost_limit=None,
+               cost_limit_reference="dijkstra", chain_compression=None, sparse_pheromones=False,
+               lazy_evaporation=False, checkpoint=None, checkpoint_every=50, resume=None,
+               threads=1):
+    """
+    Run a colony with the given strategy.
+
+    ACO, ACS, ABW and ACS_MAXMIN forward their extra keyword arguments here
+    (or to run_hierarchical), so the options from ``observer`` on are only
+    documented below.
+
+    Parameters:
+        graph_map (dict): Dict graph, compact graph, or a graph already
+            prepared by prepare_walk_graph (used as is, so ``beta`` and
+            ``candidate_list_size`` must match the ones it was prepared with).
+        start_node, end_node: External ids of the ant hill and the food.
+        strategy (ColonyStrategy): Variant-specific rules.
+        ants_number (int): Number of ants.
+        max_epochs (int): Epoch limit.
+        initial_pheromone (float): Initial pheromone level of every edge.
+        alpha (float): Exponent of the pheromone term.
+        beta (float): Exponent of the heuristic term.
+        backend (str): Walk kernel backend (see walk_kernels).
+        seed: Run seed (see random_streams); None uses the global np.random state.
+        observer (callable, optional): Receives a telemetry dict per epoch
+            (and the state, through ``pheromone_snapshot``, when it defines it).
+        candidate_list_size (int, optional): Top-k candidate lists per node
+            (see candidate_lists); None lets ants weigh every neighbor.
+        warm_start (numpy.ndarray, optional): Pheromone level of every edge to
+            start from (e.g. the final trails of a previous query); restarts
+            still go back to ``initial_pheromone``.
+        local_search (LocalSearch, optional): Improves the best routes of every
+            epoch before the pheromone update (see local_search).
+        dead_end_pruning (str, optional): "reachable" keeps the ants out of
+            nodes that cannot reach the food (see reachability); "lookahead"
+            also makes them avoid pockets closed by their own visited nodes.
+        goal_directed (bool): Use eta = (1 / (w + h(v))) ** beta with the exact
+            distance h from every node to the food (see goal_heuristic).
+        backtrack (int): Dead ends an ant may back out of before it is lost
+            (see walk_kernels); 0 loses it at the first one. MAX-MIN ants
+            revisit nodes instead.
+        max_steps (int, optional): Cut walks after this many moves (the
+            strategy's own limit, if any, still applies when it is lower).
+        cost_limit (float, optional): Cut walks whose route costs more than
+            ``cost_limit`` times the reference cost before reaching the food.
+        cost_limit_reference (str): "dijkstra" (the optimal cost, computed
+            once) or "best" (the cheapest cost found so far; no limit until
+            an ant arrives).
+        chain_compression (str, optional): "chains" runs the colony on the
+            graph with its forced chains contracted (see chain_compression);
+            "bus_express" also adds express rides between transfer stops.
+            Routes are expanded back by best_route.
+        sparse_pheromones (bool): Store the trails of the touched edges only,
+            with lazy evaporation (see sparse_pheromones), so the memory of a
+            query scales with the explored corridor; the ants walk with the
+            Python kernel.
+        lazy_evaporation (bool): Keep the dense trails divided by a global
+            decay scale (see lazy_evaporation), so an epoch only touches the
+            walked and deposited edges; sparse trails always evaporate lazily.
+        checkpoint (str, optional): File the colony is saved to every
+            ``checkpoint_every`` epochs and when it stops (see checkpoint).
+        checkpoint_every (int): Epochs between two checkpoints.
+        resume (str or dict, optional): Checkpoint (file or load_checkpoint
+            result) of this very query to carry on from; the run then
+            continues bit-exactly up to ``max_epochs``. ``time`` only counts
+            the resumed part.
+        threads (int): Walk the ants of every epoch on a pool of this many
+            threads, created once per run (see walk_kernels); needs a
+            ``seed``, is not available with the ACS during-walk local update,
+            and leaves the results unchanged. Only the Numba kernel walks in
+            parallel under the GIL: with the "python" backend (or no Numba)
+            or ``sparse_pheromones``, a regular CPython build warns and walks
+            in one thread; free-threaded builds use every thread.
+
+    Returns:
+        ColonyState: Final state; see best_route to extract the answer.
+    """
+    tic = time()
+    compiled = graph_map
+    if chain_compression is not None:
+        if chain_compression not in COMPRESSION_MODES:
+            raise ValueError(f"Unknown chain_compression: {chain_compression!r}")
+        compiled = compress_chains(graph_map, keep=[start_node, end_node],
+                                   bus_express=chain_compression == "bus_express")
+    walk_graph = compiled if "eta" in compiled else prepare_walk_graph(compiled, beta, candidate_list_size)
+    start, end = to_dense(walk_graph, [start_node, end_node])
+    if goal_directed:
+        # The distances are cached on the shared walk graph; the heuristic is per query
+        eta = goal_directed_eta(walk_graph, end, beta)
+        walk_graph = dict(walk_graph, eta=eta)
+        if candidate_list_size is not None:
+            walk_graph["cand_indptr"], walk_graph["cand_edges"] = build_candidate_lists(walk_graph, candidate_list_size)
+    dead_ends = {"backtrack": int(backtrack)}
+    if dead_end_pruning is not None:
+        if dead_end_pruning not in ("reachable", "lookahead"):
+            raise ValueError(f"Unknown dead_end_pruning: {dead_end_pruning!r}")
+        dead_ends["blocked"] = np.flatnonzero(~can_reach(walk_graph, end))
+        dead_ends["lookahead"] = LOOKAHEAD_POCKET if dead_end_pruning == "lookahead" else 0
+    if cost_limit_reference not in ("dijkstra", "best"):
+        raise ValueError(f"Unknown cost_limit_reference: {cost_limit_reference!r}")
+    if cost_limit is not None and cost_limit <= 0:
+        raise ValueError("cost_limit must be positive")
+    reference_cost = None
+    if cost_limit is not None and cost_limit_reference == "dijkstra":
+        reference_cost = distances_to(walk_graph, end)[start]
+    colony_rng, ant_rngs = colony_streams(seed, ants_number)
+    state = ColonyState(walk_graph, initial_pheromone, ants_number, max_epochs, stream(colony_rng),
+                        sparse=sparse_pheromones, lazy=lazy_evaporation)
+    if warm_start is not None:
+        state.pheromones[:] = warm_start
+    strategy.setup(graph_map, state)
+    if resume is not None:
+        restore_checkpoint(resume, state, strategy, ant_rngs, start, end)
+    walk_options = dict(strategy.walk_options)
+    if max_steps is not None:
+        walk_options["max_steps"] = min(max_steps, walk_options.get("max_steps") or max_steps)
+    timer = PhaseTimer(enabled=observer is not None)
+    threads = walk_threads(threads, backend, sparse=sparse_pheromones)
+
+    # One pool for the whole run: workers are not respawned every epoch
+    with ThreadPoolExecutor(threads) if threads > 1 else nullcontext() as pool:
+        while state.converged_ants < ants_number and state.epoch < max_epochs:
+            timer.start()
+            if cost_limit is not None:
+                walk_options["max_cost"] = cost_limit * (state.best_cost if reference_cost is None else reference_cost)
+            walk_ants(
+                walk_graph, state.pheromones, start, end, state.routes, alpha,
+                backend=backend, rngs=ant_rngs, threads=threads, pool=pool, **dead_ends, **walk_options,
+            )
+            state.cut_ants += int(np.count_nonzero(state.status == WALK_CUT))
+            timer.lap("walk")
+            if local_search is not None:
+                local_search.improve(state)
+                timer.lap("local_search")
+
+            strategy.evaporate(state)
+            timer.lap("evaporation")
+            strategy.local_update(state)
+            timer.lap("local_update")
+            strategy.deposit(state)
+            timer.lap("deposit")
+            strategy.clamp(state)
+            timer.lap("clamp")
+            strategy.mutate(state)
+            timer.lap("mutation")
+
+            _update_convergence(state)
+            if np.any(state.routes.arrived()):
+                state.best_cost = min(state.best_cost, float(state.distances.min()))
+            restart = strategy.restart(state)
+            timer.lap("convergence")
+
+            if observer is not None:
+                observer(epoch_record(state.epoch, state.distances, state.routes.lengths, state.status,
+                                      state.pheromones, timer.timings, restart=restart, **_route_stats(state)))
+                if hasattr(observer, "pheromone_snapshot"):
+                    observer.pheromone_snapshot(state)
+            state.epoch += 1
+            if checkpoint is not None and state.epoch % checkpoint_every == 0:
+                save_checkpoint(checkpoint, state, strategy, ant_rngs, start, end)
+
+    if checkpoint is not None and state.epoch % checkpoint_every != 0:
+        save_checkpoint(checkpoint, state, strategy, ant_rngs, start, end)
+    state.time = time() - tic
+    return state
+
+
+def best_route(state, mark_lost=True):
+    """
+    Return the cheapest route of the last epoch in external ids.
+
+    Routes walked on a compressed graph (see chain_compression) are expanded.
+
+    Parameters:
+        state (ColonyState): Result of run_colony.
+        mark_lost (bool): When every ant got lost, return the first ant's walk
+            followed by ``np.inf`` (the historical ACO/ACS/ABW convention);
+            otherwise return the bare walk.
+
+    Returns:
+        tuple: (path, cost); path is None (or [] without ``mark_lost``) when no
+        epoch ran.
+    """
+    distances = state.distances
+    finite = np.isfinite(distances)
+    if np.any(finite):
+        selected = np.flatnonzero(finite)[np.argmin(distances[finite])]
+        route = expand_edges(state.walk_graph, state.routes.path(selected), state.routes.edge_path(selected))
+        return route, distances[selected]
+
+    if state.routes.lengths[0] == 0:
+        return (None if mark_lost else []), distances[0]
+    path = expand_edges(state.walk_graph, state.routes.path(0), state.routes.edge_path(0))
+    return (path + [np.inf] if mark_lost else path), distances[0]
@@ -0,0 +1,127 @@
+"""Hierarchical colonies for very large cities: coarsen, solve, refine.
+
+On city-scale graphs the trails start uniform over millions of edges and the
+colony rarely converges within ``max_epochs``. ``run_hierarchical``:
+
+1. coarsens the city into blocks (see coarsening), bus lines kept as express
+   chains, and runs the colony on the coarse graph (skipped when the ant hill
+   and the food share a block);
+2. keeps only the fine nodes in a corridor of blocks around the coarse route
+   (widened until the food is reachable inside it);
+3. projects the coarse route onto the corridor: the edges crossing from one
+   block of the route to the next start at initial_pheromone * route_boost,
+   every other edge at initial_pheromone (raw coarse levels are not used, as
+   their scale depends on the colony: ACS trails on the best route fall
+   below the initial level);
+4. refines with the same colony inside the corridor, starting from those
+   trails.
+
+Pass ``hierarchical=<block size>`` to any colony to use it.
+"""
+
+import copy
+from time import time
+
+import numpy as np
+
+from ..utils.chain_compression import COMPRESSION_MODES, compress_chains
+from ..utils.coarsening import coarsen_graph, corridor_mask
+from ..utils.compact_graph import compile_graph, edge_sources, subgraph
+from ..utils.node_index import to_dense
+from ..utils.random_streams import spawn_seeds
+from ..utils.reachability import can_reach
+from ..utils.route_finder import dijkstra_compact
+from .engine import best_route, run_colony
+
+# Options of run_colony that also help the coarse colony
+_COARSE_OPTIONS = ("candidate_list_size", "dead_end_pruning", "goal_directed", "backtrack")
+
+
+def _projected_trails(compact, blocks, route, edge_ids, initial_pheromone, route_boost):
+    """Initial pheromone of the corridor edges (step 3 of the module docstring)."""
+    n_blocks = int(blocks.max()) + 1
+    route = np.asarray(route, dtype=np.int64)
+    steps = np.unique(route[:-1] * n_blocks + route[1:])
+
+    keys = blocks[edge_sources(compact)[edge_ids]] * n_blocks + blocks[compact["indices"][edge_ids]]
+    trails = np.full(edge_ids.size, float(initial_pheromone))
+    trails[np.isin(keys, steps)] *= route_boost
+    return trails
+
+
+def run_hierarchical(graph_map, start_node, end_node, strategy, ants_number, max_epochs, initial_pheromone, alpha,
+                     beta, block_size=64, corridor=1, route_boost=4.0, coarse_epochs=None, backend="auto", seed=None,
+                     observer=None, chain_compression=None, **options):
+    """
+    Run a colony coarse-to-fine (see the module docstring).
+
+    Parameters:
+        graph_map, start_node, end_node, strategy, ants_number, max_epochs,
+        initial_pheromone, alpha, beta, backend, observer: As in run_colony;
+            the strategy is copied for the coarse colony and the observer only
+            sees the refinement.
+        block_size (int): Target number of street nodes per block.
+        corridor (int): Rings of blocks kept around the coarse route.
+        route_boost (float): Initial pheromone factor of the edges following
+            the coarse route.
+        coarse_epochs (int, optional): Epoch limit of the coarse colony;
+            defaults to ``max_epochs``.
+        seed: Run seed; the coarse and the fine colonies get a child each.
+        chain_compression (str, optional): Compress the city first (see
+            chain_compression).
+        **options: Other keyword arguments of run_colony, for the refinement
+            (candidate_list_size, dead_end_pruning, goal_directed and
+            backtrack also apply to the coarse colony).
+
+    Returns:
+        ColonyState: State of the refinement, over the corridor subgraph;
+        ``time`` covers the whole run.
+    """
+    tic = time()
+    compact = graph_map if "indptr" in graph_map else compile_graph(graph_map)
+    if chain_compression is not None:
+        if chain_compression not in COMPRESSION_MODES:
+            raise ValueError(f"Unknown chain_compression: {chain_compression!r}")
+        compact = compress_chains(compact, keep=[start_node, end_node],
+                                  bus_express=chain_compression == "bus_express")
+    start, end = to_dense(compact, [start_node, end_node])
+    coarse_seed, fine_seed = spawn_seeds(seed, 2) if seed is not None else (None, None)
+
+    coarse, blocks = coarsen_graph(compact, block_size)
+    if blocks[start] == blocks[end]:
+        # Nothing to solve on the coarse graph: the corridor grows around the common block
+        route = [int(blocks[start])]
+    else:
+        coarse_state = run_colony(
+            coarse, blocks[start], blocks[end], copy.deepcopy(strategy), ants_number, coarse_epochs or max_epochs,
+            initial_pheromone, alpha, beta, backend=backend, seed=coarse_seed,
+            **{key: options[key] for key in _COARSE_OPTIONS if key in options},
+        )
+        route, cost = best_route(coarse_state, mark_lost=False)
+        if not np.isfinite(cost):
+            route = dijkstra_compact(coarse, blocks[start], blocks[end])
+
+    if route is None:
+        corridor_nodes = np.ones(blocks.size, dtype=bool)
+    else:
+        corridor_nodes = corridor_mask(coarse, blocks, route, corridor)
+    while True:
+        sub, edge_ids = subgraph(compact, corridor_nodes)
+        sub_start, sub_end = to_dense(sub, [start_node, end_node])
+        if corridor_nodes.all() or can_reach(sub, sub_end)[sub_start]:
+            break
+        corridor += 1
+        wider = corridor_mask(coarse, blocks, route, corridor)
+        # A corridor that stops growing falls back to the whole city
+        corridor_nodes = wider if np.count_nonzero(wider) > np.count_nonzero(corridor_nodes) else np.ones_like(wider)
+
+    if route is None:
+        trails = np.full(edge_ids.size, float(initial_pheromone))
+    else:
+        trails = _projected_trails(compact, blocks, route, edge_ids, initial_pheromone, route_boost)
+    state = run_colony(
+        sub, start_node, end_node, strategy, ants_number, max_epochs, initial_pheromone, alpha, beta,
+        backend=backend, seed=fine_seed, observer=observer, warm_start=trails, **options,
+    )
+    state.time = time() - tic
+    return state
@@ -0,0 +1,219 @@
+"""Pheromone rules of the four colonies, as ColonyStrategy subclasses."""
+
+import numpy as np
+
+from ..utils.pheromone_updates import add_at, affine_scatter
+from .engine import ColonyStrategy
+
+
+class ACOStrategy(ColonyStrategy):
+    """
+    Simple ACO: every ant that reached the food deposits 1 / cost on its edges.
+
+    Ants sharing a route deposit once, scaled by how many walked it.
+    """
+
+    def deposit(self, state):
+        routes, multiplicity = state.routes.unique_routes()
+        edges, amounts = state.routes.edge_events(routes, multiplicity / state.distances[routes])
+        if isinstance(state.pheromones, np.ndarray):
+            state.pheromones += np.bincount(edges, weights=amounts, minlength=state.pheromones.size)
+        else:
+            state.pheromones.add_at(edges, amounts)
+
+
+class ACSStrategy(ColonyStrategy):
+    """
+    Ant Colony System: pseudo-random proportional rule, local update on every
+    walked edge and a global deposit on the best ant's edges.
+
+    By default the local update runs after the walks, ant after ant, with the
+    best ant's global update interleaved edge by edge (the original loop),
+    applied as one affine_scatter. With ``local_update_during_walk`` the ants
+    apply the classic ACS rule tau <- (1 - rho) * tau + rho * tau0 while they
+    walk, so later ants see the trails eaten by earlier ones, and only the
+    global update remains after the walks.
+
+    Parameters:
+        global_evap_rate (float): Global evaporation rate in [0, 1].
+        local_evap_rate (float): Local evaporation rate in [0, 1].
+        q0 (float): Greedy transition probability in [0, 1].
+        local_update_during_walk (bool): Use the classic during-walk local update.
+    """
+
+    def __init__(self, global_evap_rate, local_evap_rate, q0, local_update_during_walk=False):
+        super().__init__(global_evap_rate)
+        self.local_evap_rate = local_evap_rate
+        self.local_update_during_walk = local_update_during_walk
+        self.walk_options = {"q0": q0}
+
+    def setup(self, graph_map, state):
+        if self.local_update_during_walk:
+            self.walk_options["local_rho"] = float(self.local_evap_rate)
+            self.walk_options["local_tau0"] = state.initial_pheromone
+
+    def local_update(self, state):
+        distances = state.distances
+        best_ant = np.argsort(distances)[0]
+        if self.local_update_during_walk:
+            ants = np.array([best_ant]) if np.isfinite(distances[best_ant]) else np.zeros(0, dtype=np.int64)
+        else:
+            ants = np.flatnonzero(np.isfinite(distances))
+        if ants.size == 0:
+            return
+
+        # Event slots (ant, edge, local/global) in application order; the
+        # global slot is only used by the best ant
+        edges = state.routes.edges[ants]
+        slots = np.repeat(edges[:, :, None], 2, axis=2)
+        shifts = np.empty(slots.shape)
+        shifts[:, :, 0] = self.local_evap_rate / distances[ants][:, None]
+        shifts[:, :, 1] = self.evaporation_rate / distances[best_ant]
+        used = slots >= 0
+        used[:, :, 0] &= not self.local_update_during_walk
+        used[ants != best_ant, :, 1] = False
+        kinds = np.broadcast_to(np.array([0, 1]), slots.shape)
+
+        affine_scatter(state.pheromones, slots[used], kinds[used], shifts[used],
+                       (1 - self.local_evap_rate, 1 - self.evaporation_rate))
+
+
+class BestWorstStrategy(ColonyStrategy):
+    """
+    Best-Worst Ant System: reinforce the best ant, penalize the worst ant's
+    edges it does not share with the best one, mutate the trails and restart
+    when the colony stagnates. With a pheromone store the mutation perturbs
+    its entries (SparsePheromones: the touched edges only, the others keep
+    the implicit level).
+
+    Parameters:
+        evaporation_rate (float): Global evaporation rate in [0, 1].
+        min_pheromone (float): Lower bound applied by the mutation.
+        max_stagnant_count (int): Stagnant epochs before a restart.
+    """
+
+    checkpoint_attributes = ("epoch_before_restart", "stagnant_count", "global_best_cost", "threshold")
+
+    def __init__(self, evaporation_rate, min_pheromone, max_stagnant_count=8):
+        super().__init__(evaporation_rate)
+        self.min_pheromone = min_pheromone
+        self.max_stagnant_count = max_stagnant_count
+        self.epoch_before_restart = 0
+        self.stagnant_count = 0
+        self.global_best_cost = np.inf
+        self.threshold = 0.0
+
+    def deposit(self, state):
+        tau = state.pheromones
+        distances = state.distances
+        sorted_ants = np.argsort(distances)
+        best_ant = sorted_ants[0]
+        worst_ant = sorted_ants[-1]
+
+        # Default threshold based on global pheromone mean (fallback)
+        self.threshold = float(tau.mean()) if tau.size > 0 else float(self.min_pheromone)
+
+        # Update pheromone on the best ant's path and compute threshold from it
+        best_trail = np.zeros(0, dtype=np.int64)
+        if distances[best_ant] != np.inf:
+            best_trail = state.routes.edge_path(best_ant)
+            add_at(tau, best_trail, 1 / distances[best_ant])
+
+            self.global_best_cost = distances[best_ant]
+            if best_trail.size > 0:
+                self.threshold = float(np.mean(tau[best_trail]))
+
+        # Evaporate the worst ant's edges not shared with the best ant (lost ants are skipped);
+        # ABW ants never revisit, so the trail has no repeated edge
+        if distances[worst_ant] != np.inf:
+            worst_trail = state.routes.edge_path(worst_ant)
+            worst_only = worst_trail[~np.isin(worst_trail, best_trail)]
+            tau[worst_only] = tau[worst_only] * (1 - self.evaporation_rate)
+
+    def mutate(self, state):
+        indptr = state.walk_graph["indptr"]
+        denom = max(1, (state.max_epochs - self.epoch_before_restart))
+        mutation = ((state.epoch - self.epoch_before_restart) / denom) * state.random.random() * float(self.threshold)
+        tau = state.pheromones
+        if not isinstance(tau, np.ndarray):
+            # Pheromone store: one coin per source node of its entries
+            edges, levels = tau.touched()
+            nodes, node_of = np.unique(np.searchsorted(indptr, edges, side="right") - 1, return_inverse=True)
+            raise_trail = (state.random.random(nodes.size) < 0.5)[node_of]
+            levels += np.where(raise_trail, mutation, -mutation)
+            levels[~raise_trail & (levels < self.min_pheromone)] = self.min_pheromone
+            tau[edges] = levels
+            return
+        # One coin per node (in node order, like the per-trail loop) decides
+        # whether its outgoing edges gain or lose the mutation
+        raise_trail = np.repeat(state.random.random(indptr.size - 1) < 0.5, np.diff(indptr))
+        tau += np.where(raise_trail, mutation, -mutation)
+        tau[~raise_trail & (tau < self.min_pheromone)] = self.min_pheromone
+
+    def restart(self, state):
+        if (state.most_common_cost is not None) and (state.most_common_cost != self.global_best_cost):
+            self.stagnant_count += 1
+        else:
+            # Reset stagnation count if we are on the right track or improved
+            self.stagnant_count = 0
+
+        if self.stagnant_count == self.max_stagnant_count:
+            self.epoch_before_restart = state.epoch
+            self.stagnant_count = 0
+            state.reset_pheromones()
+            return True
+        return False
+
+
+class MaxMinStrategy(ColonyStrategy):
+    """
+    MAX-MIN Ant System (ACS flavour): only the best ant deposits and the
+    pheromones are clamped to [f_min, f_max]. Ants may revisit nodes when
+    stuck, with a step cap of max(number of nodes, 50).
+
+    Parameters:
+        evaporation_rate (float): Evaporation rate in [0, 1], also scaling the deposit.
+        q0 (float): Greedy transition probability in [0, 1].
+        f_min, f_max (float): Pheromone bounds.
+    """
+
+    checkpoint_attributes = ("_bounded",)
+
+    def __init__(self, evaporation_rate, q0, f_min, f_max):
+        super().__init__(evaporation_rate)
+        self.f_min = f_min
+        self.f_max = f_max
+        self.walk_options = {"q0": q0, "revisit": True}
+        self._deposited = None
+        self._bounded = False
+
+    def setup(self, graph_map, state):
+        # Same step cap as ant_solution_MAXMIN
+        self.walk_options["max_steps"] = max(len(graph_map.get("node_index", state.walk_graph["node_ids"])), 50)
+        self._bounded = False
+
+    def deposit(self, state):
+        best_idx = np.argsort(state.distances)[0]
+        best_cost = state.distances[best_idx]
+        self._deposited = None
+        if np.isfinite(best_cost):
+            self._deposited = state.routes.edge_path(best_idx)
+            add_at(state.pheromones, self._deposited, self.evaporation_rate * (1.0 / best_cost))
+
+    def clamp(self, state):
+        tau = state.pheromones
+        if not isinstance(tau, np.ndarray):
+            # Same bounds; once bounded only the deposited edges can exceed f_max
+            deposited = self._deposited if self._deposited is not None else np.zeros(0, dtype=np.int64)
+            tau.clip(self.f_min, self.f_max, deposited if self._bounded else None)
+            self._bounded = True
+            return
+        if not self._bounded:
+            np.clip(tau, self.f_min, self.f_max, out=tau)
+            self._bounded = True
+            return
+        # Once within bounds, evaporation can only push edges below f_min and
+        # only the deposited edges can exceed f_max
+        np.maximum(tau, self.f_min, out=tau)
+        if self._deposited is not None and self._deposited.size:
+            tau[self._deposited] = np.minimum(tau[self._deposited], self.f_max)
@@ -0,0 +1,58 @@
+"""Candidate lists for ant transitions.
+
+A stop shared by many bus lines gets one boarding edge per line, and every
+ant visiting it weighs all of them. Candidate lists bound that work: every
+node keeps its ``k`` most desirable street edges (highest heuristic eta,
+i.e. cheapest) plus its ``bus_k`` most desirable edges into bus line nodes.
+Bus edges get their own quota so cheap street edges never crowd boarding
+out, and a hub with dozens of lines only offers a few of them.
+
+The lists are stored like the graph rows: the candidates of node i are
+``cand_edges[cand_indptr[i]:cand_indptr[i + 1]]``, edge ids in row order.
+Ants fall back to the full row once every candidate has been visited.
+"""
+
+import numpy as np
+
+from .compact_graph import edge_sources
+from .node_index import BUS_LINE_NODE
+
+
+def build_candidate_lists(walk_graph, k, bus_k=None):
+    """
+    Select the candidate edges of every node.
+
+    Parameters:
+        walk_graph (dict): Compact graph with an "eta" edge array (see
+            walk_kernels.prepare_walk_graph).
+        k (int): Street edges kept per node.
+        bus_k (int, optional): Edges into bus line nodes kept per node
+            (defaults to ``k``).
+
+    Returns:
+        tuple: (cand_indptr, cand_edges) int64 arrays.
+    """
+    if k < 1:
+        raise ValueError("Candidate lists need at least one candidate per node")
+    bus_k = k if bus_k is None else bus_k
+
+    indices = walk_graph["indices"]
+    n_nodes = walk_graph["indptr"].size - 1
+    edge_ids = np.arange(indices.size, dtype=np.int64)
+    sources = edge_sources(walk_graph)
+    to_bus = (walk_graph["node_type"][indices] == BUS_LINE_NODE).astype(np.int8)
+
+    # Rank the edges of every (node, street/bus) group by decreasing eta, ties by row order
+    order = np.lexsort((edge_ids, -walk_graph["eta"], to_bus, sources))
+    group = sources[order].astype(np.int64) * 2 + to_bus[order]
+    new_group = np.ones(order.size, dtype=bool)
+    new_group[1:] = group[1:] != group[:-1]
+    group_start = np.maximum.accumulate(np.where(new_group, np.arange(order.size), 0))
+    rank = np.arange(order.size) - group_start
+
+    quota = np.where(to_bus[order] == 1, bus_k, k)
+    cand_edges = np.sort(order[rank < quota]).astype(np.int64)
+
+    cand_indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources[cand_edges], minlength=n_nodes), out=cand_indptr[1:])
+    return cand_indptr, cand_edges
@@ -0,0 +1,236 @@
+"""Degree-2 chain compression of compact graphs.
+
+Imported street networks (and the streets between junctions of any city) are
+full of nodes where the way on is forced: a one-way street with a single way
+in and out, or a two-way street node whose only neighbors are the previous
+and the next one. Ants still spend one sampling step on each of them.
+``compress_chains`` contracts every such chain into a super-edge whose weight
+is the sum of the chain, remembering the contracted nodes so routes can be
+expanded back:
+
+- "chain_indptr": the contracted nodes of edge e are
+  chain_nodes[chain_indptr[e]:chain_indptr[e + 1]] (empty for plain edges)
+- "chain_nodes": external ids of the contracted nodes, in walking order
+
+Bus line nodes are never contracted (every one of them is a stop where the
+rider may get off). With ``bus_express`` every bus node also gets an express
+edge to the next transfer stop of its line (a stop shared with another line,
+the end of the line or a kept node), so a ride between transfers is one step.
+
+Parallel edges created by a contraction keep only the cheapest one, so a
+route is fully determined by its node sequence. Costs between kept nodes are
+unchanged, hence Dijkstra and the colonies find the same optimal costs on the
+compressed graph; expand_edges / expand_path restore the full routes.
+"""
+
+from collections import Counter
+
+import numpy as np
+
+from .compact_graph import _STRUCTURE_KEYS, compile_graph, edge_sources, node_count
+from .node_index import BUS_LINE_NODE, to_dense, to_external
+
+# Values of the colonies' chain_compression option
+COMPRESSION_MODES = ("chains", "bus_express")
+
+
+def _contractible(compact, keep):
+    """Boolean mask of the pass-through nodes (see the module docstring) outside ``keep``."""
+    indptr, indices = compact["indptr"], compact["indices"]
+    n = node_count(compact)
+    if indices.size == 0:
+        return np.zeros(n, dtype=bool)
+
+    sources = edge_sources(compact).astype(np.float64)
+    nodes = np.arange(n)
+    out_degree = np.diff(indptr)
+    in_degree = np.bincount(indices, minlength=n)
+    # With at most two predecessors, their sum and sum of squares identify them
+    in_sum = np.bincount(indices, weights=sources, minlength=n)
+    in_squares = np.bincount(indices, weights=sources ** 2, minlength=n)
+    first = indices[np.minimum(indptr[:-1], indices.size - 1)].astype(np.int64)
+    second = indices[np.minimum(indptr[:-1] + 1, indices.size - 1)].astype(np.int64)
+
+    one_way = (in_degree == 1) & (out_degree == 1) & (first != in_sum) & (first != nodes) & (in_sum != nodes)
+    two_way = ((in_degree == 2) & (out_degree == 2) & (first != second) & (first != nodes) & (second != nodes)
+               & (in_sum == first + second) & (in_squares == first ** 2 + second ** 2))
+
+    contract = (one_way | two_way) & (compact["node_type"] != BUS_LINE_NODE)
+    contract[keep] = False
+    return contract
+
+
+def _express_edges(compact, keep):
+    """Express rides (source, target, weight, ride edge, contracted bus nodes) to the next transfer stop."""
+    indptr, indices, weights = compact["indptr"], compact["indices"], compact["weights"]
+    lines = [bus for bus in compact.get("buses", []) if bus.get("stops")]
+    served = Counter(stop for bus in lines for stop in {map_node for map_node, _ in bus["stops"]})
+    kept = set(to_external(compact, keep))
+
+    express = []
+    for bus in lines:
+        stops = bus["stops"]
+        transfer = [i == 0 or i == len(stops) - 1 or served[map_node] > 1 or map_node in kept
+                    for i, (map_node, _) in enumerate(stops)]
+        bus_nodes = to_dense(compact, [bus_node for _, bus_node in stops])
+
+        # Edge id of every ride bus_nodes[i] -> bus_nodes[i + 1]
+        rides = []
+        for here, there in zip(bus_nodes[:-1], bus_nodes[1:]):
+            lo, hi = indptr[here], indptr[here + 1]
+            ride = np.flatnonzero(indices[lo:hi] == there)
+            if ride.size == 0:
+                break
+            rides.append(lo + int(ride[0]))
+        if len(rides) < len(stops) - 1:
+            # Not a plain line of rides between consecutive stops
+            continue
+
+        next_transfer = len(stops) - 1
+        for i in range(len(stops) - 2, -1, -1):
+            if next_transfer > i + 1:
+                cost = weights[rides[i]]
+                for ride in rides[i + 1:next_transfer]:
+                    cost += weights[ride]
+                express.append((int(bus_nodes[i]), int(bus_nodes[next_transfer]), cost, rides[i],
+                                bus_nodes[i + 1:next_transfer]))
+            if transfer[i]:
+                next_transfer = i
+    return express
+
+
+def compress_chains(graph_map, keep=(), bus_express=False):
+    """
+    Contract the forced chains of a graph into super-edges.
+
+    Parameters:
+        graph_map (dict): Dict graph or compact graph.
+        keep (iterable): External ids that must survive (e.g. the ant hill
+            and the food of the queries to solve).
+        bus_express (bool): Add express rides between transfer stops.
+
+    Returns:
+        dict: Compact graph with the "chain_indptr" and "chain_nodes" columns;
+        rows keep the order of the original edges they start with.
+
+    Raises:
+        ValueError: If the graph is already compressed or prepared for the
+            walk kernels (compress first, then prepare_walk_graph).
+    """
+    compact = graph_map if "indptr" in graph_map else compile_graph(graph_map)
+    if "chain_indptr" in compact or "eta" in compact:
+        raise ValueError("Compress the graph once, before prepare_walk_graph")
+    indptr, indices, weights = compact["indptr"], compact["indices"], compact["weights"]
+    keep = list(keep)
+    keep = to_dense(compact, keep) if keep else np.zeros(0, dtype=np.int32)
+    contract = _contractible(compact, keep)
+    sources = edge_sources(compact)
+
+    # Plain edges between kept nodes stay as they are
+    plain = np.flatnonzero(~contract[sources] & ~contract[indices])
+    new_sources, new_targets, new_weights, first_edges, ranks, chains = [], [], [], [], [], []
+
+    # Follow every chain from the kept node it starts at
+    for edge in np.flatnonzero(~contract[sources] & contract[indices]).tolist():
+        previous, node = int(sources[edge]), int(indices[edge])
+        cost = weights[edge]
+        chain = []
+        while contract[node]:
+            chain.append(node)
+            step = indptr[node]
+            if indices[step] == previous:
+                # Two-way node: leave by the other neighbor
+                step += 1
+            previous, node = node, int(indices[step])
+            cost += weights[step]
+        if node == sources[edge]:
+            # Chain looping back to its start
+            continue
+        new_sources.append(int(sources[edge]))
+        new_targets.append(node)
+        new_weights.append(cost)
+        first_edges.append(edge)
+        ranks.append(0)
+        chains.append(np.asarray(chain, dtype=np.int64))
+
+    if bus_express:
+        for source, target, cost, ride, bus_nodes in _express_edges(compact, keep):
+            new_sources.append(source)
+            new_targets.append(target)
+            new_weights.append(cost)
+            first_edges.append(ride)
+            ranks.append(1)
+            chains.append(np.asarray(bus_nodes, dtype=np.int64))
+
+    all_sources = np.concatenate([sources[plain].astype(np.int64), np.asarray(new_sources, dtype=np.int64)])
+    all_targets = np.concatenate([indices[plain].astype(np.int64), np.asarray(new_targets, dtype=np.int64)])
+    all_weights = np.concatenate([weights[plain], np.asarray(new_weights, dtype=np.float64)])
+    all_first = np.concatenate([plain, np.asarray(first_edges, dtype=np.int64)])
+    all_ranks = np.concatenate([np.zeros(plain.size, dtype=np.int64), np.asarray(ranks, dtype=np.int64)])
+    chain_of = np.concatenate([np.full(plain.size, -1), np.arange(len(chains))])
+
+    # Keep the cheapest of parallel edges
+    order = np.lexsort((all_first, all_ranks, all_weights, all_targets, all_sources))
+    pairs = np.stack([all_sources[order], all_targets[order]], axis=1)
+    cheapest = order[np.concatenate([[True], np.any(pairs[1:] != pairs[:-1], axis=1)])] if order.size else order
+
+    # Rows in dense order, each in the order of the original edges
+    selected = cheapest[np.lexsort((all_ranks[cheapest], all_first[cheapest]))]
+    dense = np.cumsum(~contract) - 1
+    new_src = dense[all_sources[selected]]
+    counts = np.bincount(new_src, minlength=int(np.count_nonzero(~contract)))
+    new_indptr = np.zeros(counts.size + 1, dtype=np.int64)
+    np.cumsum(counts, out=new_indptr[1:])
+
+    lengths = np.zeros(selected.size, dtype=np.int64)
+    selected_chains = [chains[c] for c in chain_of[selected].tolist() if c >= 0]
+    lengths[chain_of[selected] >= 0] = [chain.size for chain in selected_chains]
+    chain_indptr = np.zeros(selected.size + 1, dtype=np.int64)
+    np.cumsum(lengths, out=chain_indptr[1:])
+    contracted = np.concatenate(selected_chains) if selected_chains else np.zeros(0, dtype=np.int64)
+
+    kept = ~contract
+    compressed = {
+        "node_ids": compact["node_ids"][kept],
+        "node_type": compact["node_type"][kept],
+        "indptr": new_indptr,
+        "indices": dense[all_targets[selected]].astype(np.int32),
+        "weights": all_weights[selected],
+        "buses": list(compact.get("buses", [])),
+        "chain_indptr": chain_indptr,
+        "chain_nodes": compact["node_ids"][contracted],
+    }
+    for key, column in compact.items():
+        if key not in _STRUCTURE_KEYS and key not in compressed:
+            compressed[key] = column[kept]
+    return compressed
+
+
+def expand_edges(compact, nodes, edges):
+    """
+    External ids of a route given by its dense nodes and edge ids, contracted nodes included.
+
+    Graphs that were not compressed just translate the nodes (see to_external).
+    """
+    if "chain_indptr" not in compact or len(edges) == 0:
+        return to_external(compact, nodes)
+    node_ids, chain_indptr, chain_nodes = compact["node_ids"], compact["chain_indptr"], compact["chain_nodes"]
+    nodes = np.asarray(nodes, dtype=np.int64)
+    parts = [node_ids[nodes[:1]]]
+    for i, edge in enumerate(np.asarray(edges, dtype=np.int64).tolist()):
+        parts.append(chain_nodes[chain_indptr[edge]:chain_indptr[edge + 1]])
+        parts.append(node_ids[nodes[i + 1:i + 2]])
+    return np.concatenate(parts).tolist()
+
+
+def expand_path(compact, path):
+    """Expand a route of a compressed graph given in external ids (e.g. from dijkstra_compact)."""
+    if path is None or "chain_indptr" not in compact or len(path) < 2:
+        return path
+    indptr, indices = compact["indptr"], compact["indices"]
+    nodes = to_dense(compact, path)
+    edges = []
+    for here, there in zip(nodes[:-1].tolist(), nodes[1:].tolist()):
+        lo, hi = indptr[here], indptr[here + 1]
+        edges.append(lo + int(np.flatnonzero(indices[lo:hi] == there)[0]))
+    return expand_edges(compact, nodes, edges)
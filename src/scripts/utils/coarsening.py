@@ -0,0 +1,162 @@
+"""Coarse graphs of blocks for hierarchical colonies.
+
+``coarsen_graph`` groups the street nodes of a city into blocks of about
+``block_size`` nodes (seeds laid out by BFS grow by a multi-source BFS, so no
+coordinates are needed) and builds the graph of blocks. Bus line nodes stay nodes of their own, so every bus line survives as
+an express chain of the coarse graph.
+
+The coarse edge between two blocks approximates the cost between their seeds
+through the cheapest crossing edge (u, v):
+
+    depth(u) * w_median + w(u, v) + depth(v) * w_median
+
+where depth is the BFS depth of a node from the seed of its block and
+w_median the median street edge weight. ``corridor_mask`` selects the fine
+nodes around a coarse route, where a colony refines it.
+"""
+
+import numpy as np
+
+from .compact_graph import build_compact_graph, compile_graph, edge_sources, node_count
+from .node_index import BUS_LINE_NODE
+
+
+def _grow(compact, seeds, labels, allowed):
+    """Multi-source BFS along the edges; returns the label and the depth of every node (-1 when not reached)."""
+    indptr, indices = compact["indptr"], compact["indices"]
+    n = node_count(compact)
+    owner = np.full(n, -1, dtype=np.int64)
+    depth = np.full(n, -1, dtype=np.int64)
+    frontier = np.asarray(seeds, dtype=np.int64)
+    owner[frontier] = labels
+    depth[frontier] = 0
+    level = 0
+    while frontier.size:
+        level += 1
+        # Outgoing edges of the whole frontier at once
+        starts = indptr[frontier]
+        counts = indptr[frontier + 1] - starts
+        offsets = np.repeat(starts - np.concatenate([[0], np.cumsum(counts)[:-1]]), counts)
+        targets = indices[offsets + np.arange(counts.sum())]
+        sources = np.repeat(owner[frontier], counts)
+        fresh = (owner[targets] == -1) & allowed[targets]
+        frontier, first = np.unique(targets[fresh], return_index=True)
+        owner[frontier] = sources[fresh][first]
+        depth[frontier] = level
+    return owner, depth
+
+
+def partition_blocks(compact, block_size):
+    """
+    Group the nodes of a compact graph into blocks.
+
+    Seeds are laid on a lattice of BFS coordinates: the hop distances from a
+    first street node and from a far "corner" found by BFS serve as two
+    axes, so blocks come out as compact patches without node coordinates.
+    The blocks grow from the seeds along the edges and every node joins the
+    first block to reach it. Bus line nodes and the nodes no block reaches
+    get a block each.
+
+    Returns:
+        tuple: (blocks, depth); the block of every node and its BFS depth from
+        the seed of its block.
+    """
+    if block_size < 1:
+        raise ValueError("block_size must be at least 1")
+    n = node_count(compact)
+    street = compact["node_type"] != BUS_LINE_NODE
+    blocks = np.full(n, -1, dtype=np.int64)
+    depth = np.zeros(n, dtype=np.int64)
+
+    streets = np.flatnonzero(street)
+    if streets.size:
+        zeros = np.zeros(1, dtype=np.int64)
+        first_axis = _grow(compact, streets[:1], zeros, street)[1]
+        reached = first_axis >= 0
+        # The reached node farthest from the first one, then the one farthest from both
+        far = np.flatnonzero(reached)[np.argmax(first_axis[reached])]
+        opposite = _grow(compact, [far], zeros, street)[1]
+        spread = np.where(reached & (opposite >= 0), np.minimum(first_axis, opposite), -1)
+        corner = int(np.argmax(spread))
+        second_axis = _grow(compact, [corner], zeros, street)[1]
+
+        # One seed per cell of the lattice, the node nearest to the cell center
+        located = np.flatnonzero(reached & (second_axis >= 0))
+        side = max(int(np.ceil(np.sqrt(2 * block_size))), 1)
+        cell_x, cell_y = first_axis[located] // side, second_axis[located] // side
+        cells = cell_x * (int(second_axis.max()) // side + 1) + cell_y
+        off_center = (np.abs(first_axis[located] - (cell_x * side + side // 2))
+                      + np.abs(second_axis[located] - (cell_y * side + side // 2)))
+        order = np.lexsort((located, off_center, cells))
+        seeds = located[order[np.concatenate([[True], cells[order][1:] != cells[order][:-1]])]]
+        seeds.sort()
+
+        blocks, depth = _grow(compact, seeds, np.arange(seeds.size), street)
+
+    alone = np.flatnonzero(blocks == -1)
+    blocks[alone] = blocks.max(initial=-1) + 1 + np.arange(alone.size)
+    depth[alone] = 0
+    return blocks, depth
+
+
+def coarsen_graph(graph_map, block_size):
+    """
+    Build the graph of blocks of a city (see the module docstring).
+
+    Parameters:
+        graph_map (dict): Dict graph or compact graph.
+        block_size (int): Target number of street nodes per block.
+
+    Returns:
+        tuple: (coarse, blocks); the coarse compact graph, whose node ids are
+        the block numbers, and the block of every dense node of the city.
+    """
+    compact = graph_map if "indptr" in graph_map else compile_graph(graph_map)
+    blocks, depth = partition_blocks(compact, block_size)
+    n_blocks = int(blocks.max(initial=-1)) + 1
+    sources, targets, weights = edge_sources(compact), compact["indices"], compact["weights"]
+    node_type = compact["node_type"]
+
+    streets = (node_type[sources] != BUS_LINE_NODE) & (node_type[targets] != BUS_LINE_NODE)
+    scale = float(np.median(weights[streets])) if np.any(streets) else 1.0
+
+    crossing = np.flatnonzero(blocks[sources] != blocks[targets])
+    block_from, block_to = blocks[sources[crossing]], blocks[targets[crossing]]
+    cost = depth[sources[crossing]] * scale + weights[crossing] + depth[targets[crossing]] * scale
+
+    # Cheapest crossing of every pair of blocks
+    order = np.lexsort((cost, block_to, block_from))
+    pairs = np.stack([block_from[order], block_to[order]], axis=1)
+    cheapest = order[np.concatenate([[True], np.any(pairs[1:] != pairs[:-1], axis=1)])] if order.size else order
+
+    coarse = build_compact_graph(block_from[cheapest], block_to[cheapest], cost[cheapest],
+                                 node_ids=np.arange(n_blocks))
+    # A block is a bus line node, holds a bus stop or only streets
+    coarse["node_type"] = np.zeros(n_blocks, dtype=np.int8)
+    np.maximum.at(coarse["node_type"], blocks, node_type)
+    return coarse, blocks
+
+
+def corridor_mask(coarse, blocks, route, width=1):
+    """
+    Fine nodes whose block lies within ``width`` coarse hops of a coarse route.
+
+    Parameters:
+        coarse (dict): Coarse graph from coarsen_graph.
+        blocks (numpy.ndarray): Block of every fine node.
+        route (list): Block numbers of the coarse route.
+        width (int): Rings of neighboring blocks (in either direction) added
+            around the route.
+
+    Returns:
+        numpy.ndarray: Boolean mask over the fine nodes.
+    """
+    sources, targets = edge_sources(coarse), coarse["indices"]
+    selected = np.zeros(node_count(coarse), dtype=bool)
+    selected[np.asarray(route, dtype=np.int64)] = True
+    for _ in range(width):
+        ring = selected.copy()
+        ring[targets[selected[sources]]] = True
+        ring[sources[selected[targets]]] = True
+        selected = ring
+    return selected[blocks]
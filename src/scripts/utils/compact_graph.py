@@ -0,0 +1,243 @@
+"""Compact (CSR) graph representation for large city networks.
+
+The dict-of-lists graphs produced by the generators are handy for toy cities
+but every node costs a dict entry plus two Python lists. A compact graph keeps
+the same information in flat NumPy arrays:
+
+- "node_ids": external id of every dense node index (see node_index)
+- "node_type": STREET_NODE / BUS_STOP_NODE / BUS_LINE_NODE per node (int8)
+- "indptr": row pointers; the edges of node i are indptr[i]:indptr[i + 1]
+- "indices": dense index of the target node of each edge (int32)
+- "weights": edge costs aligned with "indices" (float64)
+- "buses": bus line dicts merged into the graph (same layout as the generators)
+
+Optional per-node columns (e.g. "lat" and "lon" from the importers) are float
+arrays aligned with "node_ids".
+"""
+
+import numpy as np
+
+from .node_index import STREET_NODE, classify_nodes, concat_ids, factorize_ids, to_dense, to_external
+from .weights import calculate_bus_get_on_cost, calculate_bus_get_off_cost
+
+# Keys that are not float per-node columns
+_STRUCTURE_KEYS = ("node_ids", "node_type", "node_lookup", "indptr", "indices", "weights", "buses", "chain_indptr",
+                   "chain_nodes")
+
+
+def build_compact_graph(sources, targets, weights, node_ids=None):
+    """
+    Build a compact graph from parallel edge arrays expressed in external ids.
+
+    Edges keep their relative input order inside every row, so a graph built
+    from dict connections lists the neighbors exactly as the dict does.
+
+    Parameters:
+        sources (array-like): External id of the origin of every edge.
+        targets (array-like): External id of the destination of every edge.
+        weights (array-like): Cost of every edge.
+        node_ids (array-like, optional): Extra nodes to include even when they
+            have no edges.
+
+    Returns:
+        dict: The compact graph; every node is typed as a street node.
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    n_edges = weights.size
+
+    parts = [sources, targets] + ([node_ids] if node_ids is not None else [])
+    ids, codes = factorize_ids(concat_ids(parts))
+    src = codes[:n_edges]
+    dst = codes[n_edges:2 * n_edges]
+
+    # Stable sort keeps the per-row neighbor order of the input
+    order = np.argsort(src, kind="stable")
+    counts = np.bincount(src, minlength=ids.size)
+    indptr = np.zeros(ids.size + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+
+    return {
+        "node_ids": ids,
+        "node_type": np.full(ids.size, STREET_NODE, dtype=np.int8),
+        "indptr": indptr,
+        "indices": dst[order].astype(np.int32),
+        "weights": weights[order],
+        "buses": [],
+    }
+
+
+def compile_graph(graph_map):
+    """
+    Convert a dict graph ("node_index", "connections", "weights") into a compact graph.
+
+    Parameters:
+        graph_map (dict): Graph in the dict layout used across the project.
+
+    Returns:
+        dict: The compact graph, carrying over the "buses" list if present.
+    """
+    sources, targets, weights = [], [], []
+    for node, neighbors in graph_map["connections"].items():
+        node_weights = graph_map["weights"][node]
+        sources.extend([node] * len(neighbors))
+        targets.extend(neighbors)
+        weights.extend(node_weights)
+
+    node_ids = list(graph_map.get("node_index", ())) + list(graph_map["connections"].keys())
+    compact = build_compact_graph(sources, targets, weights, node_ids=node_ids)
+    compact["buses"] = list(graph_map.get("buses", []))
+    compact["node_type"] = classify_nodes(compact["node_ids"], compact["buses"])
+    return compact
+
+
+def node_count(compact):
+    """Return the number of nodes of a compact graph."""
+    return compact["node_ids"].size
+
+
+def edge_sources(compact):
+    """Return the dense index of the origin of every edge."""
+    degrees = np.diff(compact["indptr"])
+    return np.repeat(np.arange(degrees.size, dtype=np.int32), degrees)
+
+
+def subgraph(compact, nodes):
+    """
+    Induced subgraph on a boolean node mask.
+
+    Nodes keep their relative order and every row keeps its edge order;
+    per-node columns and the contracted chains of a compressed graph (see
+    chain_compression) are carried over.
+
+    Parameters:
+        compact (dict): The compact graph (not prepared for the walk kernels).
+        nodes (numpy.ndarray): Boolean mask of the nodes to keep.
+
+    Returns:
+        tuple: (sub, edge_ids); the subgraph and the id, in ``compact``, of
+        every edge of the subgraph.
+    """
+    if "eta" in compact:
+        raise ValueError("Take the subgraph before prepare_walk_graph")
+    nodes = np.asarray(nodes, dtype=bool)
+    sources = edge_sources(compact)
+    edge_ids = np.flatnonzero(nodes[sources] & nodes[compact["indices"]])
+    dense = np.cumsum(nodes) - 1
+    counts = np.bincount(dense[sources[edge_ids]], minlength=int(np.count_nonzero(nodes)))
+    indptr = np.zeros(counts.size + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+
+    sub = {
+        "node_ids": compact["node_ids"][nodes],
+        "node_type": compact["node_type"][nodes],
+        "indptr": indptr,
+        "indices": dense[compact["indices"][edge_ids]].astype(np.int32),
+        "weights": compact["weights"][edge_ids],
+        "buses": list(compact.get("buses", [])),
+    }
+    if "chain_indptr" in compact:
+        starts = compact["chain_indptr"][edge_ids]
+        lengths = compact["chain_indptr"][edge_ids + 1] - starts
+        sub["chain_indptr"] = np.zeros(edge_ids.size + 1, dtype=np.int64)
+        np.cumsum(lengths, out=sub["chain_indptr"][1:])
+        offsets = np.repeat(starts - sub["chain_indptr"][:-1], lengths)
+        sub["chain_nodes"] = compact["chain_nodes"][offsets + np.arange(lengths.sum())]
+    for key, column in compact.items():
+        if (key not in _STRUCTURE_KEYS and isinstance(column, np.ndarray) and column.dtype.kind == "f"
+                and column.shape == nodes.shape):
+            sub[key] = column[nodes]
+    return sub, edge_ids
+
+
+def compact_to_dict(compact):
+    """
+    Convert a compact graph back into the dict layout.
+
+    Meant for small graphs (drawing, dict-based Dijkstra); large networks
+    should stay compact.
+    """
+    ids = compact["node_ids"].tolist()
+    indptr = compact["indptr"]
+    targets = to_external(compact, compact["indices"])
+    weights = compact["weights"].tolist()
+
+    graph = {"node_index": set(ids), "connections": {}, "weights": {}}
+    for i, node in enumerate(ids):
+        lo, hi = indptr[i], indptr[i + 1]
+        graph["connections"][node] = targets[lo:hi]
+        graph["weights"][node] = weights[lo:hi]
+    graph["buses"] = list(compact.get("buses", []))
+    return graph
+
+
+def merge_bus_and_compact_graph(compact, buses_graph):
+    """
+    Merge bus lines into a compact graph.
+
+    Mirrors merge_bus_and_map_graph: bus ride edges are added, every stop but
+    the last gets a boarding edge and every stop gets an alighting edge.
+    Extra per-node columns (e.g. "lat"/"lon") are copied from the stop's map
+    node to its bus node.
+
+    Parameters:
+        compact (dict): The compact city graph.
+        buses_graph (list): Bus line dicts ("stops", "route", "node_bus_index",
+            "connections", "weights") using external node ids.
+
+    Returns:
+        dict: A new compact graph with both map and bus nodes.
+    """
+    ids = compact["node_ids"]
+    sources = [ids[edge_sources(compact)]]
+    targets = [ids[compact["indices"]]]
+    weights = [compact["weights"]]
+
+    cost_get_on = calculate_bus_get_on_cost()
+    cost_get_off = calculate_bus_get_off_cost()
+    bus_to_stop = {}
+    bus_nodes = []
+
+    for bus_graph in buses_graph:
+        bus_src, bus_dst, bus_w = [], [], []
+        for bus_node, neighbors in bus_graph["connections"].items():
+            bus_src.extend([bus_node] * len(neighbors))
+            bus_dst.extend(neighbors)
+            bus_w.extend(bus_graph["weights"][bus_node])
+
+        route = bus_graph["route"]
+        for i, (start_map_node, start_bus_node) in enumerate(bus_graph["stops"]):
+            if i < len(route) - 1:
+                bus_src.append(start_map_node)
+                bus_dst.append(start_bus_node)
+                bus_w.append(cost_get_on)
+            bus_src.append(start_bus_node)
+            bus_dst.append(start_map_node)
+            bus_w.append(cost_get_off)
+            bus_to_stop[start_bus_node] = start_map_node
+
+        sources.append(bus_src)
+        targets.append(bus_dst)
+        weights.append(np.asarray(bus_w, dtype=np.float64))
+        bus_nodes.extend(bus_graph["node_bus_index"])
+
+    merged = build_compact_graph(
+        concat_ids(sources),
+        concat_ids(targets),
+        np.concatenate(weights),
+        node_ids=concat_ids([ids, bus_nodes]),
+    )
+    merged["buses"] = list(compact.get("buses", [])) + list(buses_graph)
+    merged["node_type"] = classify_nodes(merged["node_ids"], merged["buses"])
+
+    # Carry extra node columns over; bus nodes inherit their stop's values
+    for key, column in compact.items():
+        if key in _STRUCTURE_KEYS:
+            continue
+        values = np.full(merged["node_ids"].size, np.nan, dtype=np.float64)
+        values[to_dense(merged, ids)] = column
+        if bus_to_stop:
+            bus_dense = to_dense(merged, list(bus_to_stop.keys()))
+            values[bus_dense] = column[to_dense(compact, list(bus_to_stop.values()))]
+        merged[key] = values
+
+    return merged
@@ -0,0 +1,78 @@
+"""Goal-directed edge heuristic from exact distances to the destination.
+
+The default heuristic eta = (1 / w) ** beta only looks at the edge itself. On
+uniform grids every street edge costs the same, so it carries no signal and
+ants wander. With the exact remaining distance h(v) from the head of the
+edge to the food (one reverse Dijkstra per destination) the heuristic becomes
+
+    eta = (1 / (w + h(v))) ** beta
+
+which ranks the neighbors of a node by the best total cost through them, as
+in A*. Edges into nodes that cannot reach the food get eta = 0. The distances
+are cached on the walk graph per destination (a small LRU), so batch queries
+towards one destination pay for a single Dijkstra.
+"""
+
+import heapq
+from collections import OrderedDict
+
+import numpy as np
+
+from .compact_graph import edge_sources
+from .heuristic_weights import normalize_for_selection
+from .reachability import reverse_edges
+
+# Destinations whose distances are kept per walk graph
+DISTANCE_CACHE_SIZE = 16
+
+
+def distances_to(walk_graph, end):
+    """
+    Cost of the best route from every node to ``end`` (reverse Dijkstra), cached per destination.
+
+    Parameters:
+        walk_graph (dict): Graph from prepare_walk_graph.
+        end (int): Dense index of the destination.
+
+    Returns:
+        numpy.ndarray: Distance of every dense node to ``end`` (inf when unreachable).
+    """
+    cache = walk_graph.setdefault("goal_distances", OrderedDict())
+    end = int(end)
+    if end in cache:
+        cache.move_to_end(end)
+        return cache[end]
+
+    reverse_indptr, reverse = reverse_edges(walk_graph)
+    sources = edge_sources(walk_graph)
+    weights = walk_graph["weights"]
+
+    distances = np.full(reverse_indptr.size - 1, np.inf)
+    settled = np.zeros(reverse_indptr.size - 1, dtype=bool)
+    distances[end] = 0.0
+    priority_queue = [(0.0, end)]
+    while priority_queue:
+        current_distance, current_node = heapq.heappop(priority_queue)
+        if settled[current_node]:
+            continue
+        settled[current_node] = True
+
+        incoming = reverse[reverse_indptr[current_node]:reverse_indptr[current_node + 1]]
+        for neighbor, weight in zip(sources[incoming].tolist(), weights[incoming].tolist()):
+            distance = current_distance + weight
+            if distance < distances[neighbor]:
+                distances[neighbor] = distance
+                heapq.heappush(priority_queue, (distance, neighbor))
+
+    cache[end] = distances
+    while len(cache) > DISTANCE_CACHE_SIZE:
+        cache.popitem(last=False)
+    return distances
+
+
+def goal_directed_eta(walk_graph, end, beta):
+    """Return eta = (1 / (normalize_for_selection(w) + h(head))) ** beta of every edge."""
+    remaining = distances_to(walk_graph, end)[walk_graph["indices"]]
+    effective_weights = normalize_for_selection(np.asarray(walk_graph["weights"], dtype=np.float64))
+    with np.errstate(divide="ignore"):
+        return (1.0 / (effective_weights + remaining)) ** beta
@@ -1,47 +1,85 @@
+"""Drawing of city graphs and routes.
+
+Large cities are drawn from arrays: ``graph_layout`` converts the graph to a
+compact graph and computes node positions once per graph fingerprint (the
+result is cached), and ``draw_graph`` renders every edge through a single
+matplotlib ``LineCollection``, with bus line edges and the route as extra
+collections. Rendering many route snapshots of the same city therefore only
+pays for the drawing itself.
+"""
+
+import hashlib
 import math
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple
 
 import matplotlib.pyplot as plt
 import networkx as nx
+import numpy as np
+from matplotlib.collections import LineCollection
+
+from .compact_graph import compact_to_dict, compile_graph, edge_sources
+from .node_index import BUS_LINE_NODE, STREET_NODE, _positions, node_types_by_id, to_dense
+
+# Number of graph layouts kept by graph_layout
+LAYOUT_CACHE_SIZE = 8
+
+_layout_cache: "OrderedDict[str, dict]" = OrderedDict()
 
 
 def build_graph_from_dict(graph_dict: dict) -> nx.DiGraph:
     """Create a NetworkX DiGraph from a simple graph dictionary.
 
     Expected keys in graph_dict: "node_index", "connections", "weights".
+    Every node gets a "node_type" attribute (see node_index) derived from the
+    graph's "buses", if any.
     """
     graph_nx = nx.DiGraph()
+    node_types = node_types_by_id(graph_dict)
 
     for node in graph_dict["node_index"]:
-        graph_nx.add_node(node)
+        graph_nx.add_node(node, node_type=node_types.get(node, STREET_NODE))
 
     for node, neighbors in graph_dict["connections"].items():
         weights = graph_dict["weights"].get(node, [])
         for neighbor, weight in zip(neighbors, weights):
             graph_nx.add_edge(node, neighbor, weight=weight)
 
+    # Nodes only reachable through connections still need a type
+    for node, node_type in node_types.items():
+        if node in graph_nx:
+            graph_nx.nodes[node].setdefault("node_type", node_type)
+
     return graph_nx
 
 
+def _is_bus_line_node(graph_nx: nx.DiGraph, node) -> bool:
+    return graph_nx.nodes[node].get("node_type", STREET_NODE) == BUS_LINE_NODE
+
+
 def _grid_positions(graph_dict: dict, graph_nx: nx.DiGraph) -> Optional[Dict[int, Tuple[float, float]]]:
     """Return a grid layout when base nodes are 0..n*n-1; otherwise None.
 
-    Base map nodes are treated as integers < 100000. Bus nodes are >= 100000 and
-    are placed with a small offset next to their base node.
+    Base map nodes are every node that is not a bus line node. Bus line nodes
+    are placed with a small offset next to the map node of their stop.
     """
     try:
         # Prefer explicit branching over one-liners for clarity
         node_index_obj = graph_dict.get("node_index")
         if isinstance(node_index_obj, (set, list)):
-            nodes_sorted = sorted(node_index_obj)
+            nodes_all = list(node_index_obj)
         else:
-            nodes_sorted = list(graph_nx.nodes)
+            nodes_all = list(graph_nx.nodes)
 
         # Build base_nodes with a standard loop for clarity
         base_nodes: List[int] = []
-        for n in nodes_sorted:
-            if isinstance(n, int) and n < 100000:
-                base_nodes.append(n)
+        for n in nodes_all:
+            if _is_bus_line_node(graph_nx, n):
+                continue
+            if not isinstance(n, int):
+                return None
+            base_nodes.append(n)
+        base_nodes.sort()
         if not base_nodes:
             return None
 
@@ -60,12 +98,17 @@ def _grid_positions(graph_dict: dict, graph_nx: nx.DiGraph) -> Optional[Dict[int
             positions[n] = (col, -row)
 
         # Place bus nodes slightly offset from their base station
+        stop_of_bus_node = {}
+        for bus_graph in graph_dict.get("buses", []):
+            for map_node, bus_node in bus_graph.get("stops", []):
+                stop_of_bus_node[bus_node] = map_node
+
         bus_nodes: List[int] = []
-        for n in nodes_sorted:
-            if isinstance(n, int) and n >= 100000:
+        for n in nodes_all:
+            if _is_bus_line_node(graph_nx, n):
                 bus_nodes.append(n)
         for n in bus_nodes:
-            base = n - 100000
+            base = stop_of_bus_node.get(n)
             if base in positions:
                 x, y = positions[base]
                 positions[n] = (x + 0.25, y)
@@ -87,8 +130,8 @@ def node_style(graph_nx: nx.DiGraph, base_size: int = 300, bus_size: int = 450)
 
     Sizes are provided by caller to allow adaptive scaling.
     """
-    colors = ["orange" if n >= 100000 else "lightblue" for n in graph_nx.nodes]
-    sizes = [bus_size if n >= 100000 else base_size for n in graph_nx.nodes]
+    colors = ["orange" if _is_bus_line_node(graph_nx, n) else "lightblue" for n in graph_nx.nodes]
+    sizes = [bus_size if _is_bus_line_node(graph_nx, n) else base_size for n in graph_nx.nodes]
     return colors, sizes
 
 
@@ -136,85 +179,175 @@ def highlight_route(graph_nx: nx.DiGraph, positions: Dict[int, Tuple[float, floa
     )
 
 
-def draw_graph(graph: dict, path: Optional[List[int]] = None, save_path: Optional[str] = None):
+def graph_fingerprint(graph: dict) -> str:
+    """Digest of the structure of a dict or compact graph (nodes, edges and bus stops).
+
+    Edge weights are left out since they do not change the drawing.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if "indptr" in graph:
+        node_ids = graph["node_ids"]
+        digest.update(node_ids.tobytes() if node_ids.dtype != object else repr(node_ids.tolist()).encode())
+        digest.update(np.asarray(graph["indptr"]).tobytes())
+        digest.update(np.asarray(graph["indices"]).tobytes())
+        for column in ("lat", "lon"):
+            if column in graph:
+                digest.update(np.asarray(graph[column]).tobytes())
+    else:
+        digest.update(repr(list(graph.get("node_index", ()))).encode())
+        digest.update(repr(list(graph["connections"].items())).encode())
+    digest.update(repr([bus_graph.get("stops", []) for bus_graph in graph.get("buses", [])]).encode())
+    return digest.hexdigest()
+
+
+def _grid_xy(compact: dict) -> Optional[np.ndarray]:
+    """Vectorized grid layout of a compact graph (same rules as _grid_positions); None if not a grid."""
+    node_ids = compact["node_ids"]
+    is_line = compact["node_type"] == BUS_LINE_NODE
+    base = node_ids[~is_line]
+    if base.size == 0 or base.dtype.kind not in "iu":
+        return None
+    side = int(math.isqrt(base.size))
+    if side * side != base.size or base.min() != 0 or base.max() != base.size - 1 or np.unique(base).size != base.size:
+        return None
+
+    xy = np.zeros((node_ids.size, 2))
+    xy[~is_line, 0] = base % side
+    xy[~is_line, 1] = -(base // side)
+
+    # Bus line nodes sit slightly to the right of the map node of their stop
+    stops = [stop for bus_graph in compact.get("buses", []) for stop in bus_graph.get("stops", [])]
+    if stops:
+        map_nodes = [map_node for map_node, _ in stops]
+        bus_nodes = [bus_node for _, bus_node in stops]
+        bus_pos = _positions(node_ids, bus_nodes)
+        map_pos = _positions(node_ids, map_nodes)
+        if bus_pos.size == len(stops) and map_pos.size == len(stops):
+            placed = is_line[bus_pos] & ~is_line[map_pos]
+            xy[bus_pos[placed]] = xy[map_pos[placed]] + (0.25, 0.0)
+    return xy
+
+
+def graph_layout(graph: dict) -> dict:
+    """Compact graph plus node positions, cached per graph fingerprint.
+
+    Positions come from the "lon"/"lat" columns of imported cities, then from
+    the grid layout of the toy cities, and finally from a spring layout.
+
+    Returns
+    -------
+    dict
+        The compact graph (see compact_graph) with "xy", an (n, 2) float
+        array of positions aligned with "node_ids".
+    """
+    key = graph_fingerprint(graph)
+    if key in _layout_cache:
+        _layout_cache.move_to_end(key)
+        return _layout_cache[key]
+
+    compact = dict(graph) if "indptr" in graph else compile_graph(graph)
+    if "lon" in compact and "lat" in compact:
+        xy = np.column_stack([compact["lon"], compact["lat"]]).astype(np.float64)
+    else:
+        xy = _grid_xy(compact)
+        if xy is None:
+            graph_dict = compact_to_dict(compact) if "indptr" in graph else graph
+            positions = compute_positions(graph_dict, build_graph_from_dict(graph_dict))
+            xy = np.array([positions[node] for node in compact["node_ids"].tolist()], dtype=np.float64).reshape(-1, 2)
+    compact["xy"] = xy
+
+    _layout_cache[key] = compact
+    while len(_layout_cache) > LAYOUT_CACHE_SIZE:
+        _layout_cache.popitem(last=False)
+    return compact
+
+
+def clear_layout_cache():
+    """Forget every cached graph layout."""
+    _layout_cache.clear()
+
+
+def _render_style(n_nodes: int) -> dict:
+    """Level of detail by graph size."""
+    if n_nodes <= 400:
+        return {"labels": True, "node_size_base": 300, "node_size_bus": 450, "edge_alpha": 0.6, "edge_width": 1.0}
+    if n_nodes <= 5000:
+        return {"labels": False, "node_size_base": 40, "node_size_bus": 60, "edge_alpha": 0.35, "edge_width": 0.6}
+    if n_nodes <= 20000:
+        return {"labels": False, "node_size_base": 8, "node_size_bus": 10, "edge_alpha": 0.15, "edge_width": 0.3}
+    return {"labels": False, "node_size_base": 2, "node_size_bus": 3, "edge_alpha": 0.05, "edge_width": 0.2}
+
+
+def draw_layout(ax, layout: dict, path: Optional[List[int]] = None):
+    """Draw a cached layout (see graph_layout) and an optional route on a matplotlib axis."""
+    xy = layout["xy"]
+    is_line = layout["node_type"] == BUS_LINE_NODE
+    style = _render_style(xy.shape[0])
+
+    src = edge_sources(layout)
+    dst = layout["indices"]
+    segments = np.stack([xy[src], xy[dst]], axis=1)
+    bus_edges = is_line[src] & is_line[dst]
+    ax.add_collection(LineCollection(
+        segments[~bus_edges], colors="gray", alpha=style["edge_alpha"], linewidths=style["edge_width"], zorder=1,
+    ))
+    ax.add_collection(LineCollection(
+        segments[bus_edges], colors="orange", alpha=min(1.0, 2 * style["edge_alpha"]),
+        linewidths=style["edge_width"], zorder=1,
+    ))
+
+    sizes = np.where(is_line, style["node_size_bus"], style["node_size_base"])
+    colors = np.where(is_line, "orange", "lightblue")
+    ax.scatter(xy[:, 0], xy[:, 1], s=sizes, c=colors, linewidths=0.2, edgecolors="black", zorder=2)
+
+    if style["labels"]:
+        for node, (x, y) in zip(layout["node_ids"].tolist(), xy):
+            ax.text(x, y, str(node), fontsize=7, ha="center", va="center", zorder=3,
+                    bbox=dict(boxstyle="round,pad=0.1", fc="white", ec="none", alpha=0.6))
+
+    if path:
+        route = xy[to_dense(layout, path)]
+        ax.add_collection(LineCollection(np.stack([route[:-1], route[1:]], axis=1), colors="red", linewidths=2, zorder=4))
+
+    ax.autoscale_view()
+    ax.set_aspect("equal", adjustable="datalim")
+    ax.axis("off")
+
+
+def draw_graph(graph: dict, path: Optional[List[int]] = None, save_path: Optional[str] = None, dpi: int = 300):
     """Draw a graph highlighting bus nodes and optionally a specific path.
 
+    The graph's layout is cached (see graph_layout), so drawing many routes
+    on the same city only pays for the rendering.
+
     Parameters
     ----------
     graph : dict
-        Graph structure with "node_index", "connections" and "weights".
+        Dict graph with "node_index", "connections" and "weights", or a compact graph.
     path : list[int], optional
         Sequence of node IDs representing a path to highlight.
     save_path : str, optional
         If provided, saves the figure to this path; otherwise shows it.
+    dpi : int
+        Resolution of the saved figure.
     """
-    graph_nx = build_graph_from_dict(graph)
-    positions = compute_positions(graph, graph_nx)
-
-    # Adaptive figure size and density handling
-    n_nodes = graph_nx.number_of_nodes()
-    n_edges = graph_nx.number_of_edges()
-
-    # Derive an approximate side length if positions come from a grid
-    # Estimate grid side length using an explicit loop (avoid generator one-liner)
-    base_count = 0
-    for n in graph_nx.nodes:
-        if isinstance(n, int) and n < 100000:
-            base_count += 1
-    side_guess = int(math.sqrt(max(1, base_count)))
+    layout = graph_layout(graph)
 
-    # Figure size scales with side length but is capped to avoid gigantic figures
+    # Figure size scales with the grid side but is capped to avoid gigantic figures
+    base_count = int(np.count_nonzero(layout["node_type"] != BUS_LINE_NODE))
+    side_guess = int(math.sqrt(max(1, base_count)))
     if side_guess >= 2:
         scale = max(6.0, min(22.0, side_guess * 0.35))
-        figsize = (scale, scale)
-    else:
-        # fallback based on node count density
-        scale = max(6.0, min(22.0, math.sqrt(max(1, n_nodes)) * 0.5))
-        figsize = (scale, scale)
-
-    plt.figure(figsize=figsize)
-
-    # Decide rendering detail based on size thresholds
-    if n_nodes <= 400:
-        draw_labels = True
-        node_size_base, node_size_bus = 300, 450
-        draw_edges = True
-        edge_alpha, edge_width = 0.6, 1.0
-    elif n_nodes <= 5000:
-        draw_labels = False
-        node_size_base, node_size_bus = 40, 60
-        draw_edges = True
-        edge_alpha, edge_width = 0.35, 0.6
-    elif n_nodes <= 20000:
-        draw_labels = False
-        node_size_base, node_size_bus = 8, 10
-        # draw edges lightly; large graphs can be very heavy
-        draw_edges = n_edges < 80000
-        edge_alpha, edge_width = 0.15, 0.3
     else:
-        draw_labels = False
-        node_size_base, node_size_bus = 2, 3
-        draw_edges = False  # too dense; show only nodes
-        edge_alpha, edge_width = 0.05, 0.2
+        scale = max(6.0, min(22.0, math.sqrt(max(1, layout["node_ids"].size)) * 0.5))
 
-    draw_base_graph(
-        graph_nx,
-        positions,
-        draw_labels=draw_labels,
-        node_size_base=node_size_base,
-        node_size_bus=node_size_bus,
-        draw_edges=draw_edges,
-        edge_alpha=edge_alpha,
-        edge_width=edge_width,
-    )
-    if path:
-        highlight_route(graph_nx, positions, path)
+    fig, ax = plt.subplots(figsize=(scale, scale))
+    draw_layout(ax, layout, path)
 
-    plt.axis("off")
     if save_path:
-        plt.tight_layout()
-        plt.savefig(save_path, dpi=300)
-        plt.close()
+        fig.tight_layout()
+        fig.savefig(save_path, dpi=dpi)
+        plt.close(fig)
         print(f"Graph saved to {save_path}")
     else:
         plt.show()
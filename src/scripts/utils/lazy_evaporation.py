@@ -0,0 +1,148 @@
+"""Dense pheromones with O(1) global evaporation.
+
+Every epoch the colonies multiply all their trails by (1 - rate), touching
+every edge of the city although only a few edges get a deposit.
+``LazyPheromones`` stores the trails divided by a running decay scale::
+
+    level = scale * max(stored, floor)
+
+``tau *= factor`` only updates ``scale``; deposits and writes are divided by
+it, so an epoch costs O(edges read or written). The scale is folded back
+into the array (one O(edges) pass) when it falls below ``RENORMALIZE_BELOW``,
+before the stored levels get large enough to overflow ``tau ** alpha``.
+
+``floor`` (in stored units) is the lazy lower bound of ``clip``: clamping
+every edge to f_min after an evaporation is the same as raising the floor to
+f_min / scale, and the floor then decays with the scale exactly like the
+clamped levels would, until the next ``clip`` raises it again. Only the edges
+written since the previous clip are clamped to the upper bound one by one.
+This keeps the MAX-MIN bounds exact with colonies that clamp after every
+evaporation; ABW's mutation, which moves every edge, rewrites the whole
+array anyway.
+
+Walk probabilities only depend on the ratios of the levels, so the walk
+kernels (Numba included) read ``stored`` with the floor as is (see walk_ants).
+"""
+
+import numpy as np
+
+# Smallest decay scale kept before folding it into the stored levels
+RENORMALIZE_BELOW = 1e-16
+
+
+class LazyPheromones:
+    """
+    Pheromone levels of ``size`` edges with lazy global evaporation.
+
+    The store supports what the colony strategies do with a dense array:
+    integer indexing, ``tau[edges] = levels``, ``tau *= factor``, ``fill``,
+    ``mean``/``min``/``max``, plus ``add_at`` (as ``np.add.at``), ``clip`` and
+    ``touched``; ``np.asarray(tau)`` materializes the levels.
+
+    Parameters:
+        size (int): Number of edges of the graph.
+        initial (float): Initial level of every edge.
+
+    Attributes:
+        stored (numpy.ndarray): Levels divided by ``scale``.
+        scale (float): Global decay since the last renormalization.
+        floor (float): Lazy lower bound of the stored levels.
+    """
+
+    def __init__(self, size, initial):
+        self.stored = np.full(int(size), float(initial))
+        self.scale = 1.0
+        self.floor = 0.0
+
+    @property
+    def size(self):
+        return self.stored.size
+
+    @property
+    def nbytes(self):
+        return self.stored.nbytes
+
+    def to_arrays(self):
+        """Arrays that rebuild the store exactly (see from_arrays)."""
+        return {"stored": self.stored, "scale": np.float64(self.scale), "floor": np.float64(self.floor)}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        tau = cls(0, 0.0)
+        tau.stored = np.array(arrays["stored"], dtype=np.float64)
+        tau.scale = float(arrays["scale"])
+        tau.floor = float(arrays["floor"])
+        return tau
+
+    def renormalize(self):
+        """Fold the scale and the floor into the stored levels (O(edges))."""
+        np.maximum(self.stored, self.floor, out=self.stored)
+        self.stored *= self.scale
+        self.floor = 0.0
+        self.scale = 1.0
+
+    def __getitem__(self, edges):
+        return self.scale * np.maximum(self.stored[edges], self.floor)
+
+    def __setitem__(self, edges, levels):
+        self.stored[edges] = np.asarray(levels, dtype=np.float64) / self.scale
+
+    def __imul__(self, factor):
+        factor = float(factor)
+        if factor < 0:
+            raise ValueError("Pheromone decay factors must be non-negative")
+        if factor == 0:
+            self.fill(0.0)
+            return self
+        self.scale *= factor
+        if self.scale < RENORMALIZE_BELOW:
+            self.renormalize()
+        return self
+
+    def __array__(self, dtype=None, copy=None):
+        levels = self.scale * np.maximum(self.stored, self.floor)
+        return levels if dtype is None else levels.astype(dtype)
+
+    def touched(self):
+        """Return (edge ids, levels) of every edge (the whole array is stored)."""
+        return np.arange(self.size), np.asarray(self)
+
+    def add_at(self, edges, amounts):
+        """Add amounts to edges, summing repeated edges (like ``np.add.at``)."""
+        edges = np.asarray(edges, dtype=np.int64)
+        self.stored[edges] = np.maximum(self.stored[edges], self.floor)
+        np.add.at(self.stored, edges, np.asarray(amounts, dtype=np.float64) / self.scale)
+
+    def fill(self, level):
+        """Put every edge at ``level``."""
+        self.stored.fill(level)
+        self.scale = 1.0
+        self.floor = 0.0
+
+    def clip(self, lower, upper, edges=None):
+        """
+        Clamp every level to [lower, upper] in place.
+
+        Parameters:
+            lower, upper (float): Bounds.
+            edges (numpy.ndarray, optional): The only edges that may exceed
+                ``upper`` (written since the previous clip); None clamps every
+                edge in one O(edges) pass.
+        """
+        if edges is None:
+            self.renormalize()
+            np.clip(self.stored, lower, upper, out=self.stored)
+            self.floor = lower
+            return
+        self.floor = lower / self.scale
+        edges = np.asarray(edges, dtype=np.int64)
+        self.stored[edges] = np.clip(self.stored[edges], self.floor, upper / self.scale)
+
+    def mean(self):
+        return np.asarray(self).mean()
+
+    def min(self):
+        return np.asarray(self).min()
+
+    def max(self):
+        return np.asarray(self).max()
@@ -0,0 +1,166 @@
+"""Local search on ant routes: shortcut splicing and loop removal.
+
+Walking ants often keep detours until the trails evaporate: a zig-zag
+between two points of the route that a direct sub-path would avoid, or a
+node visited twice (MAX-MIN ants may revisit). ``improve_route`` repairs a
+route in two steps:
+
+1. From every anchor node of the route, a Dijkstra search bounded by a cost
+   budget looks for the farthest later node of the route that it reaches
+   more cheaply than the route does; that stretch is replaced by the
+   shortest sub-path and the scan continues from there.
+2. Loops (nodes that appear twice, possibly created by a splice) are cut.
+
+With non-negative weights neither step makes a route more expensive.
+LocalSearch applies it to the best ants of every epoch before the pheromone
+update, so every colony deposits on the improved routes.
+"""
+
+import heapq
+
+import numpy as np
+
+# Improvements below this are rounding noise
+_EPSILON = 1e-9
+
+
+def remove_loops(nodes, edges):
+    """
+    Cut the cycles of a route, jumping from each node to its last visit.
+
+    Parameters:
+        nodes (numpy.ndarray): Dense node ids of the route.
+        edges (numpy.ndarray): Edge ids between consecutive nodes.
+
+    Returns:
+        tuple: (nodes, edges) without repeated nodes.
+    """
+    last_seen = {node: i for i, node in enumerate(nodes.tolist())}
+    if len(last_seen) == nodes.size:
+        return nodes, edges
+    keep_nodes, keep_edges = [], []
+    i = 0
+    while True:
+        i = last_seen[int(nodes[i])]
+        keep_nodes.append(nodes[i])
+        if i == nodes.size - 1:
+            break
+        keep_edges.append(edges[i])
+        i += 1
+    return np.array(keep_nodes, dtype=nodes.dtype), np.array(keep_edges, dtype=edges.dtype)
+
+
+def _bounded_dijkstra(indptr, indices, weights, source, radius):
+    """Distances and (predecessor, edge) of the nodes reachable from ``source`` within ``radius``."""
+    distances = {source: 0.0}
+    previous = {}
+    settled = set()
+    queue = [(0.0, source)]
+    while queue:
+        distance, node = heapq.heappop(queue)
+        if node in settled:
+            continue
+        settled.add(node)
+        for edge in range(indptr[node], indptr[node + 1]):
+            neighbor = int(indices[edge])
+            candidate = distance + weights[edge]
+            if candidate <= radius and candidate < distances.get(neighbor, np.inf):
+                distances[neighbor] = candidate
+                previous[neighbor] = (node, edge)
+                heapq.heappush(queue, (candidate, neighbor))
+    return distances, previous
+
+
+def _sub_path(previous, source, target):
+    """Nodes (without ``source``) and edge ids of the shortest sub-path to ``target``."""
+    nodes, edges = [], []
+    node = target
+    while node != source:
+        nodes.append(node)
+        node, edge = previous[node]
+        edges.append(edge)
+    return nodes[::-1], edges[::-1]
+
+
+def improve_route(walk_graph, nodes, edges, cost_budget=None):
+    """
+    Shortcut the detours and loops of a route (see the module docstring).
+
+    Parameters:
+        walk_graph (dict): Compact graph the route was walked on.
+        nodes (numpy.ndarray): Dense node ids of the route.
+        edges (numpy.ndarray): Edge ids between consecutive nodes.
+        cost_budget (float, optional): Radius of every shortcut search, i.e.
+            the most expensive stretch of route that may be replaced; None
+            lets a search span the rest of the route.
+
+    Returns:
+        tuple: (nodes, edges, cost) of the improved route.
+    """
+    indptr, indices, weights = walk_graph["indptr"], walk_graph["indices"], walk_graph["weights"]
+    nodes = np.asarray(nodes)
+    edges = np.asarray(edges)
+    # Route cost up to every node
+    reached = np.concatenate([[0.0], np.cumsum(weights[edges])])
+
+    new_nodes, new_edges = [int(nodes[0])], []
+    i = 0
+    while i < nodes.size - 1:
+        radius = reached[-1] - reached[i]
+        if cost_budget is not None:
+            radius = min(radius, cost_budget)
+        distances, previous = _bounded_dijkstra(indptr, indices, weights, int(nodes[i]), radius)
+
+        # Farthest later node of the route reached by a strictly cheaper sub-path
+        target = None
+        for j in range(nodes.size - 1, i + 1, -1):
+            distance = distances.get(int(nodes[j]))
+            if distance is not None and distance < reached[j] - reached[i] - _EPSILON:
+                target = j
+                break
+
+        if target is None:
+            new_nodes.append(int(nodes[i + 1]))
+            new_edges.append(int(edges[i]))
+            i += 1
+        else:
+            sub_nodes, sub_edges = _sub_path(previous, int(nodes[i]), int(nodes[target]))
+            new_nodes.extend(sub_nodes)
+            new_edges.extend(sub_edges)
+            i = target
+
+    route_nodes, route_edges = remove_loops(np.array(new_nodes, dtype=np.int32), np.array(new_edges, dtype=np.int64))
+    return route_nodes, route_edges, float(weights[route_edges].sum())
+
+
+class LocalSearch:
+    """
+    Improve the cheapest ants of every epoch before the pheromone update.
+
+    Pass an instance as ``local_search`` to any colony (or to run_colony).
+    The improved routes replace the ants' routes in the RouteBuffer, with
+    their new cost, so the deposit and the convergence test see them.
+
+    Parameters:
+        top_k (int): Number of ants improved per epoch (cheapest first).
+        cost_budget (float, optional): See improve_route.
+    """
+
+    def __init__(self, top_k=1, cost_budget=None):
+        if top_k < 1:
+            raise ValueError("top_k must be at least 1")
+        self.top_k = top_k
+        self.cost_budget = cost_budget
+
+    def improve(self, state):
+        """Improve the top_k arrived ants of the last walk, in place."""
+        routes = state.routes
+        arrived = np.flatnonzero(routes.arrived())
+        if arrived.size == 0:
+            return
+        best = arrived[np.argsort(routes.costs[arrived], kind="stable")[:self.top_k]]
+        for ant in best:
+            nodes, edges, cost = improve_route(state.walk_graph, routes.path(ant), routes.edge_path(ant), self.cost_budget)
+            if cost < routes.costs[ant]:
+                routes.store(ant, nodes, edges, cost, routes.status[ant])
+        routes.update_hashes()
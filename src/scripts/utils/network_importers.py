@@ -0,0 +1,341 @@
+"""Streaming importers for real street networks and GTFS bus feeds.
+
+Real city extracts hold millions of elements, so nothing here goes through
+the dict-of-lists graph layout:
+
+- OSM XML files are read with ``iterparse`` and every element is released as
+  soon as it has been consumed; node coordinates and way segments are kept in
+  compact ``array`` buffers and turned into a compact graph at the end.
+- GTFS CSV files are read in fixed-size chunks and filtered with NumPy, so
+  ``stop_times.txt`` never has to fit in memory.
+
+Edge weights are Haversine distances (km) computed in one vectorized pass.
+"""
+
+import bz2
+import csv
+import gzip
+import os
+from array import array
+from itertools import islice
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from .compact_graph import build_compact_graph, merge_bus_and_compact_graph
+from .weights import calculate_bus_time_travel_cost, haversine_vectorized
+
+_ONEWAY_FORWARD = {"yes", "true", "1"}
+_ONEWAY_REVERSE = {"-1", "reverse"}
+# Same offset used by the toy bus line generator for bus node ids
+_MIN_BUS_NODE_OFFSET = 100000
+_KM_PER_DEGREE_LAT = 111.195
+
+
+def _open_text(path):
+    """Open a plain, gzip or bz2 compressed file for reading."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    return open(path, "rb")
+
+
+def iter_osm_elements(path):
+    """
+    Stream the nodes and ways of an OSM XML file.
+
+    Yields:
+        tuple: ("node", id, lat, lon) or ("way", node_refs, tags).
+    """
+    with _open_text(path) as source:
+        context = ET.iterparse(source, events=("start", "end"))
+        _, root = next(context)
+        for event, elem in context:
+            if event != "end":
+                continue
+            if elem.tag == "node":
+                yield "node", int(elem.get("id")), float(elem.get("lat")), float(elem.get("lon"))
+                root.clear()
+            elif elem.tag == "way":
+                refs = [int(nd.get("ref")) for nd in elem.iter("nd")]
+                tags = {tag.get("k"): tag.get("v") for tag in elem.iter("tag")}
+                yield "way", refs, tags
+                root.clear()
+            elif elem.tag == "relation":
+                root.clear()
+
+
+def load_osm_street_network(path, highway_types=None, respect_oneway=True, weight_scale=1.0):
+    """
+    Load the street network of an OSM XML extract into a compact graph.
+
+    Parameters:
+        path (str): Path to an ``.osm`` file (optionally ``.gz``/``.bz2`` compressed).
+        highway_types (set, optional): Allowed ``highway`` tag values; any highway if None.
+        respect_oneway (bool): Add only the forward direction of ``oneway`` ways.
+        weight_scale (float): Factor applied to the distances in km.
+
+    Returns:
+        dict: Compact graph with "lat"/"lon" node columns. Only nodes used by
+        the selected ways are kept.
+    """
+    node_ids, node_lat, node_lon = array("q"), array("d"), array("d")
+    sources, targets = array("q"), array("q")
+
+    for element in iter_osm_elements(path):
+        if element[0] == "node":
+            _, osm_id, lat, lon = element
+            node_ids.append(osm_id)
+            node_lat.append(lat)
+            node_lon.append(lon)
+            continue
+
+        _, refs, tags = element
+        highway = tags.get("highway")
+        if highway is None or (highway_types is not None and highway not in highway_types):
+            continue
+        oneway = tags.get("oneway", "no") if respect_oneway else "no"
+        for u, v in zip(refs, refs[1:]):
+            if oneway not in _ONEWAY_REVERSE:
+                sources.append(u)
+                targets.append(v)
+            if oneway not in _ONEWAY_FORWARD:
+                sources.append(v)
+                targets.append(u)
+
+    ids = np.frombuffer(node_ids, dtype=np.int64)
+    order = np.argsort(ids, kind="stable")
+    ids = ids[order]
+    lat = np.frombuffer(node_lat, dtype=np.float64)[order]
+    lon = np.frombuffer(node_lon, dtype=np.float64)[order]
+
+    src = np.frombuffer(sources, dtype=np.int64)
+    dst = np.frombuffer(targets, dtype=np.int64)
+
+    # Drop segments that reference nodes outside the extract
+    if ids.size:
+        src_pos = np.minimum(np.searchsorted(ids, src), ids.size - 1)
+        dst_pos = np.minimum(np.searchsorted(ids, dst), ids.size - 1)
+        known = (ids[src_pos] == src) & (ids[dst_pos] == dst) & (src != dst)
+    else:
+        src_pos = dst_pos = np.zeros(0, dtype=np.int64)
+        known = np.zeros(src.size, dtype=bool)
+    src, dst = src[known], dst[known]
+    src_pos, dst_pos = src_pos[known], dst_pos[known]
+
+    weights = weight_scale * haversine_vectorized(lat[src_pos], lon[src_pos], lat[dst_pos], lon[dst_pos])
+
+    # Ways sharing a segment produce parallel edges; keep the cheapest one
+    order = np.lexsort((weights, dst, src))
+    src, dst, weights = src[order], dst[order], weights[order]
+    first = np.ones(src.size, dtype=bool)
+    first[1:] = (src[1:] != src[:-1]) | (dst[1:] != dst[:-1])
+
+    graph = build_compact_graph(src[first], dst[first], weights[first])
+    positions = np.searchsorted(ids, graph["node_ids"])
+    graph["lat"] = lat[positions]
+    graph["lon"] = lon[positions]
+    return graph
+
+
+def iter_csv_chunks(path, columns, chunk_size=100000, optional=()):
+    """
+    Read selected columns of a CSV file in chunks.
+
+    Columns listed in ``optional`` may be missing from the file; they are then
+    read as empty strings.
+
+    Yields:
+        dict: Column name -> NumPy string array with at most ``chunk_size`` rows.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as handle:
+        reader = csv.reader(handle)
+        header = next(reader)
+        positions = [None if column in optional and column not in header else header.index(column)
+                     for column in columns]
+        while True:
+            rows = list(islice(reader, chunk_size))
+            if not rows:
+                break
+            yield {
+                column: np.array([row[pos] for row in rows]) if pos is not None else np.full(len(rows), "")
+                for column, pos in zip(columns, positions)
+            }
+
+
+def snap_to_nearest_nodes(graph, lat, lon, radius_deg=0.005):
+    """
+    Find the nearest graph node of every (lat, lon) point.
+
+    Nodes are scanned inside a latitude band around each point. The band grows
+    until it holds a candidate and is wide enough that no node outside it can
+    be closer than the best candidate inside.
+
+    Returns:
+        numpy.ndarray: Dense index of the nearest node for every point.
+    """
+    order = np.argsort(graph["lat"], kind="stable")
+    sorted_lat = graph["lat"][order]
+    sorted_lon = graph["lon"][order]
+
+    nearest = np.empty(len(lat), dtype=np.int64)
+    for i, (point_lat, point_lon) in enumerate(zip(lat, lon)):
+        radius = radius_deg
+        while True:
+            lo = np.searchsorted(sorted_lat, point_lat - radius, side="left")
+            hi = np.searchsorted(sorted_lat, point_lat + radius, side="right")
+            if hi == lo:
+                radius *= 4
+                continue
+            distances = haversine_vectorized(point_lat, point_lon, sorted_lat[lo:hi], sorted_lon[lo:hi])
+            best = np.argmin(distances)
+            # Any node outside the band is at least `radius` degrees of latitude away
+            needed = distances[best] / _KM_PER_DEGREE_LAT
+            if needed <= radius or radius >= 180:
+                break
+            radius = needed
+        nearest[i] = order[lo + best]
+    return nearest
+
+
+def load_gtfs_bus_lines(gtfs_dir, street_graph, chunk_size=100000, weight_scale=1.0, bus_node_offset=None):
+    """
+    Build bus lines from a GTFS bundle (stops, routes, trips and stop_times).
+
+    One representative trip (the first listed) is used per route and direction
+    (``direction_id``, when present). Its stops are snapped to the nearest street node and mapped to the ``node_bus_index`` /
+    ``stops`` layout of the bus line generators.
+
+    Parameters:
+        gtfs_dir (str): Directory with the GTFS ``.txt`` files.
+        street_graph (dict): Compact street graph with "lat"/"lon" columns.
+        chunk_size (int): Rows read per CSV chunk.
+        weight_scale (float): Factor applied to the distances in km.
+        bus_node_offset (int, optional): First bus node id; defaults to a power
+            of ten above every street node id (at least 100000).
+
+    Returns:
+        list: Bus line dicts ready for merge_bus_and_compact_graph.
+    """
+    def gtfs_file(name):
+        return os.path.join(gtfs_dir, name)
+
+    # Stops: ids and coordinates
+    stop_ids, stop_lat, stop_lon = [], [], []
+    for chunk in iter_csv_chunks(gtfs_file("stops.txt"), ["stop_id", "stop_lat", "stop_lon"], chunk_size):
+        stop_ids.append(chunk["stop_id"])
+        stop_lat.append(chunk["stop_lat"].astype(np.float64))
+        stop_lon.append(chunk["stop_lon"].astype(np.float64))
+    stop_ids = np.concatenate(stop_ids)
+    stop_lat = np.concatenate(stop_lat)
+    stop_lon = np.concatenate(stop_lon)
+    stop_order = np.argsort(stop_ids)
+    sorted_stop_ids = stop_ids[stop_order]
+
+    # Routes: display names (GTFS only requires one of the short and long names)
+    route_names = {}
+    columns = ["route_id", "route_short_name", "route_long_name"]
+    for chunk in iter_csv_chunks(gtfs_file("routes.txt"), columns, chunk_size, optional=columns[1:]):
+        for route_id, short_name, long_name in zip(*(chunk[column].tolist() for column in columns)):
+            route_names[route_id] = short_name or long_name
+
+    # Trips: first trip of every route and direction is its representative (lines are one-way)
+    representative = {}
+    columns = ["route_id", "direction_id", "trip_id"]
+    for chunk in iter_csv_chunks(gtfs_file("trips.txt"), columns, chunk_size, optional=["direction_id"]):
+        for route_id, direction, trip_id in zip(*(chunk[column].tolist() for column in columns)):
+            representative.setdefault((route_id, direction), trip_id)
+    wanted_trips = np.array(sorted(representative.values()))
+
+    # Stop times: keep only rows of representative trips
+    kept_trips, kept_seq, kept_stops = [], [], []
+    columns = ["trip_id", "stop_sequence", "stop_id"]
+    for chunk in iter_csv_chunks(gtfs_file("stop_times.txt"), columns, chunk_size):
+        mask = np.isin(chunk["trip_id"], wanted_trips)
+        if np.any(mask):
+            kept_trips.append(chunk["trip_id"][mask])
+            kept_seq.append(chunk["stop_sequence"][mask].astype(np.int64))
+            kept_stops.append(chunk["stop_id"][mask])
+    if not kept_trips:
+        return []
+    trips = np.concatenate(kept_trips)
+    sequence = np.concatenate(kept_seq)
+    trip_stops = np.concatenate(kept_stops)
+
+    # Drop stop times of stops missing from stops.txt (e.g. outside a clipped extract)
+    if sorted_stop_ids.size:
+        stop_pos = np.minimum(np.searchsorted(sorted_stop_ids, trip_stops), sorted_stop_ids.size - 1)
+        known = sorted_stop_ids[stop_pos] == trip_stops
+    else:
+        stop_pos = np.zeros(trip_stops.size, dtype=np.int64)
+        known = np.zeros(trip_stops.size, dtype=bool)
+    trips, sequence, stop_pos = trips[known], sequence[known], stop_pos[known]
+    if not trips.size:
+        return []
+    order = np.lexsort((sequence, trips))
+    trips, stop_pos = trips[order], stop_pos[order]
+
+    # Snap every used stop to its nearest street node
+    stop_rows = stop_order[stop_pos]
+    used_rows, inverse = np.unique(stop_rows, return_inverse=True)
+    snapped = snap_to_nearest_nodes(street_graph, stop_lat[used_rows], stop_lon[used_rows])
+    street_nodes = street_graph["node_ids"][snapped][inverse]
+    lat = street_graph["lat"][snapped][inverse]
+    lon = street_graph["lon"][snapped][inverse]
+
+    if bus_node_offset is None:
+        max_id = int(street_graph["node_ids"].max()) if street_graph["node_ids"].size else 0
+        bus_node_offset = max(_MIN_BUS_NODE_OFFSET, 10 ** len(str(max_id)))
+    next_bus_node = bus_node_offset
+
+    bus_lines = []
+    boundaries = np.flatnonzero(trips[1:] != trips[:-1]) + 1
+    trip_of_route = {trip_id: route_id for (route_id, _), trip_id in representative.items()}
+    for lo, hi in zip(np.r_[0, boundaries], np.r_[boundaries, trips.size]):
+        # Consecutive stops snapped to the same street node collapse into one
+        keep = np.ones(hi - lo, dtype=bool)
+        keep[1:] = street_nodes[lo + 1:hi] != street_nodes[lo:hi - 1]
+        route = street_nodes[lo:hi][keep].tolist()
+        if len(route) < 2:
+            continue
+        route_lat, route_lon = lat[lo:hi][keep], lon[lo:hi][keep]
+        hops = weight_scale * haversine_vectorized(route_lat[:-1], route_lon[:-1], route_lat[1:], route_lon[1:])
+
+        bus_nodes = list(range(next_bus_node, next_bus_node + len(route)))
+        next_bus_node += len(route)
+
+        route_id = trip_of_route[trips[lo]]
+        bus_dict = {
+            "name": route_names.get(route_id) or route_id,
+            "stops": list(zip(route, bus_nodes)),
+            "route": route,
+            "node_bus_index": set(bus_nodes),
+            "connections": {},
+            "weights": {},
+        }
+        for i, bus_current in enumerate(bus_nodes):
+            if i < len(bus_nodes) - 1:
+                bus_dict["connections"][bus_current] = [bus_nodes[i + 1]]
+                bus_dict["weights"][bus_current] = [calculate_bus_time_travel_cost(float(hops[i]))]
+            else:
+                bus_dict["connections"][bus_current] = []
+                bus_dict["weights"][bus_current] = []
+        bus_lines.append(bus_dict)
+
+    return bus_lines
+
+
+def load_city(osm_path, gtfs_dir=None, highway_types=None, weight_scale=1.0, chunk_size=100000):
+    """
+    Load an OSM street network and, optionally, merge the bus lines of a GTFS bundle.
+
+    Returns:
+        dict: Compact graph with street and bus nodes.
+    """
+    street_graph = load_osm_street_network(osm_path, highway_types=highway_types, weight_scale=weight_scale)
+    if gtfs_dir is None:
+        return street_graph
+    bus_lines = load_gtfs_bus_lines(gtfs_dir, street_graph, chunk_size=chunk_size, weight_scale=weight_scale)
+    return merge_bus_and_compact_graph(street_graph, bus_lines)
+
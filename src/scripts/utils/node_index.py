@@ -0,0 +1,162 @@
+"""Dense node indexing for graphs with sparse or non-integer external ids.
+
+External node ids (grid numbers, ``map_node + 100000`` bus nodes, OSM ids,
+GTFS stop codes...) are mapped to dense ``int32`` indices ``0..n-1`` so that
+every array-based structure (pheromones, visited sets, distances) can be a
+small flat array. Paths are translated back to external ids at the API
+boundary with ``to_external``.
+
+Every node also carries a type so that drawing and heuristics no longer need
+to guess from the id value:
+
+- STREET_NODE: a plain map node
+- BUS_STOP_NODE: a map node where at least one bus line stops
+- BUS_LINE_NODE: a node that belongs to a bus line
+"""
+
+import numpy as np
+
+STREET_NODE = 0
+BUS_STOP_NODE = 1
+BUS_LINE_NODE = 2
+
+
+def _is_integer_array(values):
+    return values.dtype.kind in "iu"
+
+
+def concat_ids(parts):
+    """Concatenate id arrays/sequences, falling back to objects for mixed id kinds."""
+    arrays = [as_id_array(part) for part in parts]
+    if all(_is_integer_array(array) for array in arrays):
+        return np.concatenate(arrays)
+    return np.concatenate([array.astype(object) for array in arrays])
+
+
+def as_id_array(ids):
+    """Return ids as an int64 array when possible, otherwise as an object array."""
+    if isinstance(ids, np.ndarray) and _is_integer_array(ids):
+        return ids.astype(np.int64, copy=False)
+    ids = list(ids)
+    if all(isinstance(i, (int, np.integer)) and not isinstance(i, bool) for i in ids):
+        return np.asarray(ids, dtype=np.int64).reshape(-1)
+    values = np.empty(len(ids), dtype=object)
+    values[:] = ids
+    return values
+
+
+def factorize_ids(ids):
+    """
+    Assign dense indices to a sequence of external ids.
+
+    Integer ids are sorted so lookups can use binary search; any other
+    hashable ids keep their first-seen order.
+
+    Returns:
+        tuple: (node_ids, codes) where node_ids[codes] == ids.
+    """
+    values = as_id_array(ids)
+    if _is_integer_array(values):
+        node_ids, codes = np.unique(values, return_inverse=True)
+        return node_ids, codes.reshape(-1).astype(np.int32)
+
+    lookup = {}
+    codes = np.empty(values.size, dtype=np.int32)
+    for i, node in enumerate(values):
+        codes[i] = lookup.setdefault(node, len(lookup))
+    node_ids = np.empty(len(lookup), dtype=object)
+    node_ids[:] = list(lookup)
+    return node_ids, codes
+
+
+def _query_array(ids):
+    """Normalize a single id or a sequence of ids into an id array."""
+    if isinstance(ids, np.ndarray):
+        return as_id_array(ids.reshape(-1))
+    if isinstance(ids, (list, tuple, set)):
+        return as_id_array(ids)
+    return as_id_array([ids])
+
+
+def to_dense(graph, ids):
+    """
+    Map external ids to dense indices of a compact graph.
+
+    Raises:
+        KeyError: If any id is not part of the graph.
+    """
+    node_ids = graph["node_ids"]
+    query = _query_array(ids)
+
+    if _is_integer_array(node_ids):
+        if not _is_integer_array(query) or node_ids.size == 0:
+            raise KeyError(f"Unknown node ids: {query[:10].tolist()}")
+        dense = np.searchsorted(node_ids, query)
+        found = node_ids[np.minimum(dense, node_ids.size - 1)] == query
+        if not np.all(found):
+            raise KeyError(f"Unknown node ids: {query[~found][:10].tolist()}")
+        return dense.astype(np.int32)
+
+    lookup = graph.get("node_lookup")
+    if lookup is None:
+        lookup = {node: i for i, node in enumerate(node_ids)}
+        graph["node_lookup"] = lookup
+    missing = [node for node in query if node not in lookup]
+    if missing:
+        raise KeyError(f"Unknown node ids: {missing[:10]}")
+    return np.fromiter((lookup[node] for node in query), dtype=np.int32, count=query.size)
+
+
+def to_external(graph, dense):
+    """Map dense indices (e.g. a path) back to a list of external ids."""
+    return graph["node_ids"][np.asarray(dense, dtype=np.int64)].tolist()
+
+
+def _positions(node_ids, query):
+    """Dense positions of the query ids that exist in node_ids (others are dropped)."""
+    values = as_id_array(node_ids) if not isinstance(node_ids, np.ndarray) else node_ids
+    query = as_id_array(query)
+    if query.size == 0 or values.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    if _is_integer_array(values) and _is_integer_array(query) and np.all(values[1:] >= values[:-1]):
+        pos = np.searchsorted(values, query)
+        found = values[np.minimum(pos, values.size - 1)] == query
+        return pos[found]
+    lookup = {node: i for i, node in enumerate(values.tolist())}
+    return np.array([lookup[node] for node in query.tolist() if node in lookup], dtype=np.int64)
+
+
+def classify_nodes(node_ids, buses_graph):
+    """
+    Build the node-type column for a set of nodes.
+
+    Bus line nodes come from every line's "node_bus_index" and bus stops are
+    the map nodes listed in the lines' "stops".
+
+    Parameters:
+        node_ids (array-like): External node ids, in dense order.
+        buses_graph (list): Bus line dicts.
+
+    Returns:
+        numpy.ndarray: int8 array of STREET_NODE / BUS_STOP_NODE / BUS_LINE_NODE.
+    """
+    node_type = np.full(len(node_ids), STREET_NODE, dtype=np.int8)
+    stop_nodes, line_nodes = [], []
+    for bus_graph in buses_graph:
+        for map_node, bus_node in bus_graph.get("stops", []):
+            stop_nodes.append(map_node)
+            line_nodes.append(bus_node)
+        line_nodes.extend(bus_graph.get("node_bus_index", ()))
+
+    node_type[_positions(node_ids, stop_nodes)] = BUS_STOP_NODE
+    node_type[_positions(node_ids, line_nodes)] = BUS_LINE_NODE
+    return node_type
+
+
+def node_types_by_id(graph_map):
+    """Return a dict mapping each node of a dict graph to its node type."""
+    nodes = list(graph_map.get("node_index", ())) + [
+        node for node in graph_map.get("connections", {}) if node not in graph_map.get("node_index", ())
+    ]
+    types = classify_nodes(nodes, graph_map.get("buses", []))
+    return dict(zip(nodes, types.tolist()))
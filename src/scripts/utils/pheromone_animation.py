@@ -0,0 +1,129 @@
+"""Pheromone heatmaps of a colony run, as image sequences or videos.
+
+Record the run with a telemetry.PheromoneSnapshots observer, then render it:
+
+    snapshots = PheromoneSnapshots(every=5)
+    ACS(city, 1, 60, 20, 0.3, 0.1, 0.2, 0.5, 0.7, 0.4, observer=snapshots)
+    export_heatmap_frames(snapshots, city, "frames/")
+    export_heatmap_video(snapshots, city, "pheromones.mp4")
+
+The edge geometry is built once (from graph_visualizer.graph_layout) and
+every frame only updates the colors of one LineCollection; frames are written
+to disk as soon as they are drawn instead of being kept in memory.
+"""
+
+import os
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib import animation
+from matplotlib.collections import LineCollection
+from matplotlib.colors import LogNorm, Normalize
+
+from .compact_graph import edge_sources
+from .graph_visualizer import graph_layout
+from .node_index import to_dense
+
+
+def _color_norm(snapshots, log_scale):
+    """One color scale for every frame, from the extreme finite levels."""
+    low, high = np.inf, -np.inf
+    for snapshot in snapshots.snapshots:
+        values = snapshot[np.isfinite(snapshot)].astype(np.float64)
+        if log_scale:
+            values = values[values > 0]
+        if values.size:
+            low, high = min(low, values.min()), max(high, values.max())
+    if not np.isfinite(low):
+        low, high = (1e-6, 1.0) if log_scale else (0.0, 1.0)
+    if high <= low:
+        high = low * 2 if log_scale else low + 1.0
+    return LogNorm(low, high) if log_scale else Normalize(low, high)
+
+
+def _heatmap_figure(snapshots, graph, cmap, log_scale, figsize):
+    """Figure with the edge collection whose colors change per frame."""
+    if snapshots.graph is None:
+        raise ValueError("No pheromone snapshot was recorded")
+    layout = graph_layout(graph)
+    xy = layout["xy"][to_dense(layout, snapshots.graph["node_ids"])]
+    src = edge_sources(snapshots.graph)
+    segments = np.stack([xy[src], xy[snapshots.graph["indices"]]], axis=1)
+
+    fig, ax = plt.subplots(figsize=figsize)
+    edges = LineCollection(segments, cmap=cmap, norm=_color_norm(snapshots, log_scale), linewidths=1.5)
+    edges.set_array(snapshots.snapshots[0].astype(np.float64))
+    ax.add_collection(edges)
+    ax.scatter(xy[:, 0], xy[:, 1], s=2, c="black", zorder=2)
+    ax.autoscale_view()
+    ax.set_aspect("equal", adjustable="datalim")
+    ax.axis("off")
+    fig.colorbar(edges, ax=ax, label="pheromone")
+    return fig, ax, edges
+
+
+def _frames(snapshots, ax, edges):
+    """Update the figure to every snapshot in turn."""
+    for epoch, snapshot in zip(snapshots.epochs, snapshots.snapshots):
+        edges.set_array(snapshot.astype(np.float64))
+        ax.set_title(f"Epoch {epoch}")
+        yield epoch
+
+
+def export_heatmap_frames(snapshots, graph, output_dir, prefix="epoch", cmap="viridis", log_scale=False,
+                          figsize=(8, 8), dpi=100):
+    """
+    Write one PNG heatmap per snapshot.
+
+    Parameters:
+        snapshots (PheromoneSnapshots): Recorded run.
+        graph (dict): The graph given to the colony (dict or compact).
+        output_dir (str): Directory of the frames (created if needed).
+        prefix (str): File name prefix; frames are ``<prefix>_<epoch>.png``.
+        cmap (str): Matplotlib colormap.
+        log_scale (bool): Logarithmic color scale.
+        figsize (tuple): Figure size in inches.
+        dpi (int): Resolution of the frames.
+
+    Returns:
+        list: Paths of the written frames.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    fig, ax, edges = _heatmap_figure(snapshots, graph, cmap, log_scale, figsize)
+    width = len(str(max(snapshots.epochs)))
+    paths = []
+    try:
+        for epoch in _frames(snapshots, ax, edges):
+            path = os.path.join(output_dir, f"{prefix}_{epoch:0{width}d}.png")
+            fig.savefig(path, dpi=dpi)
+            paths.append(path)
+    finally:
+        plt.close(fig)
+    return paths
+
+
+def export_heatmap_video(snapshots, graph, path, fps=5, cmap="viridis", log_scale=False, figsize=(8, 8), dpi=100):
+    """
+    Write the snapshots as a video (ffmpeg) or, for a ``.gif`` path, an animated GIF.
+
+    Frames are streamed to ffmpeg as they are drawn; the GIF writer (Pillow)
+    keeps the frames until the end, so prefer video or PNG frames for long runs.
+
+    Raises:
+        RuntimeError: If ffmpeg is needed and not installed.
+    """
+    if path.lower().endswith(".gif"):
+        writer = animation.PillowWriter(fps=fps)
+    elif animation.writers.is_available("ffmpeg"):
+        writer = animation.FFMpegWriter(fps=fps)
+    else:
+        raise RuntimeError("ffmpeg is not installed; export PNG frames or a .gif instead")
+
+    fig, ax, edges = _heatmap_figure(snapshots, graph, cmap, log_scale, figsize)
+    try:
+        with writer.saving(fig, path, dpi):
+            for _ in _frames(snapshots, ax, edges):
+                writer.grab_frame()
+    finally:
+        plt.close(fig)
+    return path
@@ -0,0 +1,59 @@
+"""Reproducible random streams for the colonies.
+
+Every colony accepts a ``seed`` (int, ``numpy.random.SeedSequence`` or
+``numpy.random.Generator``). The seed is spawned into independent streams:
+one for the colony itself (e.g. ABW mutation) and one per ant, so an ant's
+walk only depends on its own stream. Splitting the ants across threads,
+processes or islands therefore never changes the results.
+
+``seed=None`` keeps the historical behaviour of drawing from the global
+``np.random`` state, so ``np.random.seed`` still reproduces older runs.
+"""
+
+import numpy as np
+
+
+def seed_sequence(seed=None):
+    """
+    Normalize a seed into a SeedSequence.
+
+    Parameters:
+        seed (int, SeedSequence, Generator or None): Source of entropy. A
+            Generator is consumed once to derive the sequence.
+
+    Returns:
+        numpy.random.SeedSequence
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    if isinstance(seed, np.random.Generator):
+        return np.random.SeedSequence(seed.integers(0, 2**32, size=4, dtype=np.uint64).tolist())
+    return np.random.SeedSequence(seed)
+
+
+def spawn_seeds(seed, count):
+    """Spawn ``count`` independent child SeedSequences (per ant, island or worker)."""
+    return seed_sequence(seed).spawn(count)
+
+
+def colony_streams(seed, ants_number):
+    """
+    Create the colony stream and the per-ant streams of a run.
+
+    Parameters:
+        seed (int, SeedSequence, Generator or None): Run seed.
+        ants_number (int): Number of ants.
+
+    Returns:
+        tuple: (colony_rng, ant_rngs); both are None when seed is None, meaning
+        the global np.random state is used.
+    """
+    if seed is None:
+        return None, None
+    colony_seed, *ant_seeds = spawn_seeds(seed, ants_number + 1)
+    return np.random.default_rng(colony_seed), [np.random.default_rng(ant_seed) for ant_seed in ant_seeds]
+
+
+def stream(rng=None):
+    """Return ``rng`` or the global np.random module when no generator is given."""
+    return np.random if rng is None else rng
@@ -0,0 +1,59 @@
+"""Which nodes of a compact graph can still reach a destination.
+
+An ant that steps into a node from which the food is unreachable (a one-way
+street pocket, the end of a bus line) is bound to get lost, and its whole
+walk is wasted. One reverse breadth-first search from the destination finds
+every node that can reach it; the colonies then hand the other nodes to the
+walk kernels as if they were already visited, so ants never enter them.
+"""
+
+import numpy as np
+
+from .compact_graph import edge_sources
+
+
+def reverse_edges(walk_graph):
+    """
+    Return the reverse CSR of a walk graph (see prepare_walk_graph), cached on it.
+
+    Returns:
+        tuple: (reverse_indptr, reverse_edges); the incoming edge ids of node
+        i are reverse_edges[reverse_indptr[i]:reverse_indptr[i + 1]].
+    """
+    if "reverse_indptr" not in walk_graph:
+        indices = walk_graph["indices"]
+        order = np.argsort(indices, kind="stable")
+        counts = np.bincount(indices, minlength=walk_graph["indptr"].size - 1)
+        reverse_indptr = np.zeros(counts.size + 1, dtype=np.int64)
+        np.cumsum(counts, out=reverse_indptr[1:])
+        walk_graph["reverse_indptr"] = reverse_indptr
+        walk_graph["reverse_edges"] = order.astype(np.int64)
+    return walk_graph["reverse_indptr"], walk_graph["reverse_edges"]
+
+
+def can_reach(walk_graph, end):
+    """
+    Boolean mask of the nodes with a path to ``end`` (reverse BFS).
+
+    Parameters:
+        walk_graph (dict): Graph from prepare_walk_graph.
+        end (int): Dense index of the destination.
+
+    Returns:
+        numpy.ndarray: ``mask[i]`` is True when node i can reach ``end``.
+    """
+    reverse_indptr, reverse = reverse_edges(walk_graph)
+    sources = edge_sources(walk_graph)
+
+    reached = np.zeros(reverse_indptr.size - 1, dtype=bool)
+    reached[end] = True
+    frontier = np.array([end], dtype=np.int64)
+    while frontier.size:
+        # Incoming edges of the whole frontier at once
+        starts = reverse_indptr[frontier]
+        counts = reverse_indptr[frontier + 1] - starts
+        offsets = np.repeat(starts - np.concatenate([[0], np.cumsum(counts)[:-1]]), counts)
+        predecessors = sources[reverse[offsets + np.arange(counts.sum())]]
+        frontier = np.unique(predecessors[~reached[predecessors]])
+        reached[frontier] = True
+    return reached
@@ -0,0 +1,172 @@
+"""Preallocated storage for the routes walked by a colony.
+
+Instead of one Python list per ant, an epoch's routes live in two padded
+matrices reused across epochs:
+
+- ``nodes``: int32 (ants x capacity), dense node ids, padded with -1,
+- ``edges``: int64 (ants x capacity - 1), traversed edge ids, padded with -1,
+
+plus ``lengths`` (nodes per route), ``status`` (walk outcome, see
+walk_kernels), ``costs`` (inf when the ant did not arrive) and ``hashes``
+(a polynomial hash of each route). The capacity grows geometrically when a
+longer route shows up.
+
+Hashes make "which ants walked the same route" a vectorized question, so
+deposits can be applied once per distinct route with a multiplicity.
+"""
+
+import numpy as np
+
+# Odd 64-bit multiplier of the polynomial route hash
+_HASH_BASE = np.uint64(0x9E3779B97F4A7C15)
+
+
+class RouteBuffer:
+    """Routes of one epoch of ants (see the module docstring)."""
+
+    def __init__(self, ants_number, capacity=64):
+        capacity = max(2, int(capacity))
+        self.nodes = np.full((ants_number, capacity), -1, dtype=np.int32)
+        self.edges = np.full((ants_number, capacity - 1), -1, dtype=np.int64)
+        self.lengths = np.zeros(ants_number, dtype=np.int32)
+        self.status = np.zeros(ants_number, dtype=np.int8)
+        self.costs = np.full(ants_number, np.inf)
+        self.hashes = np.zeros(ants_number, dtype=np.uint64)
+        self._powers = None
+        self._scratch = {}
+
+    @property
+    def ants_number(self):
+        return self.lengths.size
+
+    @property
+    def capacity(self):
+        return self.nodes.shape[1]
+
+    def _grow(self, length):
+        capacity = self.capacity
+        while capacity < length:
+            capacity *= 2
+        nodes = np.full((self.ants_number, capacity), -1, dtype=np.int32)
+        edges = np.full((self.ants_number, capacity - 1), -1, dtype=np.int64)
+        nodes[:, :self.capacity] = self.nodes
+        edges[:, :self.capacity - 1] = self.edges
+        self.nodes, self.edges = nodes, edges
+        self._powers = None
+
+    def scratch(self, n_nodes, max_steps=0, worker=0):
+        """
+        Return the kernel's work arrays (visited mask, path, edges), allocated once per worker thread.
+
+        A route visits every node at most once unless ``max_steps`` allows more.
+        """
+        capacity = max(n_nodes, max_steps) + 2
+        current = self._scratch.get(worker)
+        if current is None or current[0].size != n_nodes or current[1].size < capacity:
+            current = self._scratch[worker] = (
+                np.zeros(n_nodes, dtype=np.uint8),
+                np.empty(capacity, dtype=np.int32),
+                np.empty(capacity, dtype=np.int64),
+            )
+        return current
+
+    def store(self, ant, path, edges, cost, status):
+        """Copy one walked route (the kernel's scratch arrays) into the buffer."""
+        length = path.size
+        if length > self.capacity:
+            self._grow(length)
+        previous = self.lengths[ant]
+        self.nodes[ant, :length] = path
+        self.edges[ant, :length - 1] = edges
+        if previous > length:
+            self.nodes[ant, length:previous] = -1
+            self.edges[ant, max(length - 1, 0):previous - 1] = -1
+        self.lengths[ant] = length
+        self.costs[ant] = cost
+        self.status[ant] = status
+
+    def update_hashes(self):
+        """Recompute the route hashes after an epoch of walks."""
+        if self._powers is None or self._powers.size != self.capacity:
+            self._powers = np.cumprod(np.full(self.capacity, _HASH_BASE, dtype=np.uint64))
+        # Padding is -1, so (node + 1) is 0 there and only walked nodes contribute
+        with np.errstate(over="ignore"):
+            terms = (self.nodes.astype(np.int64) + 1).astype(np.uint64) * self._powers
+            self.hashes = terms.sum(axis=1, dtype=np.uint64) ^ self.lengths.astype(np.uint64)
+
+    def path(self, ant):
+        """Dense node ids of an ant's route (a view)."""
+        return self.nodes[ant, :self.lengths[ant]]
+
+    def edge_path(self, ant):
+        """Edge ids of an ant's route (a view)."""
+        return self.edges[ant, :max(self.lengths[ant] - 1, 0)]
+
+    def arrived(self):
+        """Boolean mask of the ants with a finite cost."""
+        return np.isfinite(self.costs)
+
+    def unique_routes(self, ants=None):
+        """
+        Group ants walking identical routes.
+
+        Parameters:
+            ants (numpy.ndarray, optional): Ant indices (or a boolean mask) to
+                consider; defaults to the ants that arrived.
+
+        Returns:
+            tuple: (representatives, multiplicity); the first ant of every
+            distinct route, in ant order, and how many ants walked it.
+        """
+        if ants is None:
+            ants = self.arrived()
+        ants = np.flatnonzero(ants) if np.asarray(ants).dtype == bool else np.asarray(ants, dtype=np.int64)
+        if ants.size == 0:
+            return ants, np.zeros(0, dtype=np.int64)
+
+        _, first, inverse, counts = np.unique(self.hashes[ants], return_index=True, return_inverse=True, return_counts=True)
+        representatives = ants[first]
+        if not np.array_equal(self.nodes[ants], self.nodes[representatives[inverse.reshape(-1)]]):
+            # Hash collision: fall back to comparing the padded rows
+            _, first, counts = np.unique(self.nodes[ants], axis=0, return_index=True, return_counts=True)
+            representatives = ants[first]
+
+        order = np.argsort(representatives, kind="stable")
+        return representatives[order], counts[order]
+
+    def edge_amounts(self, ants, amounts, n_edges):
+        """
+        Sum per-ant amounts over every edge of their routes.
+
+        An edge walked twice by the same ant receives the amount twice, like
+        ``np.add.at`` on the edge path.
+
+        Parameters:
+            ants (numpy.ndarray): Ant indices.
+            amounts (numpy.ndarray): Amount per listed ant.
+            n_edges (int): Number of edges of the graph.
+
+        Returns:
+            numpy.ndarray: Per-edge totals (float64, length ``n_edges``).
+        """
+        edges, weights = self.edge_events(ants, amounts)
+        return np.bincount(edges, weights=weights, minlength=n_edges)
+
+    def edge_events(self, ants, amounts):
+        """
+        Flatten per-ant amounts into one (edge, amount) event per walked edge.
+
+        Parameters:
+            ants (numpy.ndarray): Ant indices.
+            amounts (numpy.ndarray): Amount per listed ant.
+
+        Returns:
+            tuple: (edges, amounts); edge ids in route order, ant after ant.
+        """
+        ants = np.asarray(ants, dtype=np.int64)
+        if ants.size == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        edges = self.edges[ants]
+        walked = edges >= 0
+        weights = np.broadcast_to(np.asarray(amounts, dtype=np.float64)[:, None], edges.shape)
+        return edges[walked], weights[walked]
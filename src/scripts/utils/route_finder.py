@@ -1,5 +1,10 @@
 import heapq
 
+import numpy as np
+
+from .chain_compression import expand_path
+from .node_index import to_dense, to_external
+
 def dijkstra(graph, start_node, end_node):
     """
     Finds one of the best routes between two nodes using Dijkstra's algorithm.
@@ -44,4 +49,76 @@ def dijkstra(graph, start_node, end_node):
                         distances[neighbor] = distance
                         heapq.heappush(priority_queue, (distance, neighbor, path))
 
-    return None  # Return None if no path is found
\ No newline at end of file
+    return None  # Return None if no path is found
+
+
+def dijkstra_compact(compact, start_node, end_node):
+    """
+    Finds one of the best routes between two nodes of a compact graph.
+
+    Distances, predecessors and the visited set are dense arrays indexed by
+    node position; node ids are translated only at the boundaries.
+
+    Parameters:
+    compact (dict): Compact graph (see compact_graph).
+    start_node: External id of the starting node.
+    end_node: External id of the ending node.
+
+    Returns:
+    list: The route from start_node to end_node in external ids, or None if unreachable.
+    Routes over a compressed graph (see chain_compression) are expanded.
+    """
+    start, end = to_dense(compact, [start_node, end_node])
+    distances, predecessors = _dijkstra_tree(compact, start, end)
+
+    if not np.isfinite(distances[end]):
+        return None
+
+    path = [int(end)]
+    while path[-1] != start:
+        path.append(int(predecessors[path[-1]]))
+    return expand_path(compact, to_external(compact, path[::-1]))
+
+
+def dijkstra_distances(compact, start_node):
+    """
+    One-to-many Dijkstra: cost of the best route from start_node to every node.
+
+    Parameters:
+    compact (dict): Compact graph (see compact_graph).
+    start_node: External id of the starting node.
+
+    Returns:
+    numpy.ndarray: Distance of every dense node index (inf when unreachable).
+    """
+    start = to_dense(compact, start_node)[0]
+    return _dijkstra_tree(compact, start)[0]
+
+
+def _dijkstra_tree(compact, start, end=-1):
+    """Shortest-path tree from dense node ``start``, stopping early once ``end`` is settled."""
+    indptr, indices, weights = compact["indptr"], compact["indices"], compact["weights"]
+
+    distances = np.full(indptr.size - 1, np.inf)
+    predecessors = np.full(indptr.size - 1, -1, dtype=np.int32)
+    visited = np.zeros(indptr.size - 1, dtype=bool)
+    distances[start] = 0.0
+    priority_queue = [(0.0, int(start))]
+
+    while priority_queue:
+        current_distance, current_node = heapq.heappop(priority_queue)
+        if current_node == end:
+            break
+        if visited[current_node]:
+            continue
+        visited[current_node] = True
+
+        lo, hi = indptr[current_node], indptr[current_node + 1]
+        for neighbor, weight in zip(indices[lo:hi].tolist(), weights[lo:hi].tolist()):
+            distance = current_distance + weight
+            if distance < distances[neighbor]:
+                distances[neighbor] = distance
+                predecessors[neighbor] = current_node
+                heapq.heappush(priority_queue, (distance, neighbor))
+
+    return distances, predecessors
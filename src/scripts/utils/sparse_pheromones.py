@@ -0,0 +1,240 @@
+"""Sparse pheromone store: only the edges the ants touched take memory.
+
+The ants of one query explore a corridor of the city, yet a dense pheromone
+array holds a level for every edge of it. ``SparsePheromones`` keeps the
+levels of the touched edges in an open-addressing hash table (edge ids as
+keys, linear probing); every other edge implicitly holds the initial level.
+
+Evaporation is lazy: ``tau *= factor`` only advances a clock and extends a
+running log of the global decay. Every entry (and the implicit level)
+remembers the clock tick it was written at and is scaled by the decay since
+then when it is read::
+
+    level = stored * exp(log_decay[now] - log_decay[stamp])
+
+so an epoch costs O(edges read or written), whatever the size of the city,
+and the log never underflows.
+
+The store supports what the colony strategies and the Python walk kernel do
+with a dense array: integer indexing, ``tau[edges] = levels``,
+``tau *= factor``, ``fill``, ``mean``/``min``/``max``, plus ``add_at`` (as
+``np.add.at``) and ``clip``; ``np.asarray(tau)`` materializes the dense
+levels (for telemetry). The Numba kernel needs a dense array, so colonies
+using the store walk with the Python kernel.
+"""
+
+import numpy as np
+
+_EMPTY = -1
+# Fibonacci hashing multiplier (2^64 / golden ratio)
+_HASH = np.uint64(0x9E3779B97F4A7C15)
+
+
+class SparsePheromones:
+    """
+    Pheromone levels of ``size`` edges, stored for the touched edges only.
+
+    Parameters:
+        size (int): Number of edges of the graph.
+        initial (float): Level of every edge that was never written.
+        capacity (int): Initial number of table slots (grows as needed; the
+            table is kept at most half full).
+
+    Attributes:
+        size (int): Number of edges of the graph.
+    """
+
+    def __init__(self, size, initial, capacity=64):
+        self.size = int(size)
+        capacity = 1 << max(int(capacity) - 1, 7).bit_length()
+        self._keys = np.full(capacity, _EMPTY, dtype=np.int64)
+        self._values = np.zeros(capacity)
+        self._stamps = np.zeros(capacity, dtype=np.int64)
+        self._count = 0
+        self._tick = 0
+        self._log_decay = np.zeros(64)
+        self._default = float(initial)
+        self._default_stamp = 0
+
+    @property
+    def touched_count(self):
+        """Number of edges holding an entry of their own."""
+        return self._count
+
+    @property
+    def untouched_level(self):
+        """Current level of every edge without an entry of its own."""
+        return self._implicit()
+
+    @property
+    def nbytes(self):
+        """Memory taken by the table and the decay log."""
+        return self._keys.nbytes + self._values.nbytes + self._stamps.nbytes + self._log_decay.nbytes
+
+    def to_arrays(self):
+        """Arrays that rebuild the store exactly (see from_arrays)."""
+        return {
+            "keys": self._keys,
+            "values": self._values,
+            "stamps": self._stamps,
+            "log_decay": self._log_decay[:self._tick + 1],
+            "counters": np.array([self.size, self._count, self._tick, self._default_stamp]),
+            "default": np.float64(self._default),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        size, count, tick, default_stamp = (int(value) for value in arrays["counters"])
+        tau = cls(size, float(arrays["default"]))
+        tau._keys = np.array(arrays["keys"], dtype=np.int64)
+        tau._values = np.array(arrays["values"], dtype=np.float64)
+        tau._stamps = np.array(arrays["stamps"], dtype=np.int64)
+        tau._log_decay = np.concatenate([arrays["log_decay"], np.zeros(tau._log_decay.size)])
+        tau._count, tau._tick, tau._default_stamp = count, tick, default_stamp
+        return tau
+
+    def _decay_since(self, stamps):
+        return np.exp(self._log_decay[self._tick] - self._log_decay[stamps])
+
+    def _implicit(self):
+        """Current level of the edges without an entry."""
+        return self._default * float(self._decay_since(self._default_stamp))
+
+    def _probe(self, edges):
+        """Slot of every edge: its entry, or the empty slot where the probing stopped."""
+        mask = self._keys.size - 1
+        shift = np.uint64(64 - (self._keys.size.bit_length() - 1))
+        slots = ((edges.astype(np.uint64) * _HASH) >> shift).astype(np.int64)
+        pending = np.arange(edges.size)
+        while pending.size:
+            keys = self._keys[slots[pending]]
+            pending = pending[(keys != edges[pending]) & (keys != _EMPTY)]
+            slots[pending] = (slots[pending] + 1) & mask
+        return slots
+
+    def _insert(self, edges):
+        """Slots of distinct edges, creating the missing entries (values left to the caller)."""
+        if 2 * (self._count + edges.size) > self._keys.size:
+            self._rehash(1 << (4 * (self._count + edges.size) - 1).bit_length())
+        slots = self._probe(edges)
+        missing = np.flatnonzero(self._keys[slots] != edges)
+        self._count += missing.size
+        while missing.size:
+            # New edges probing to the same empty slot: the first one takes it, the others probe on
+            taken, first = np.unique(slots[missing], return_index=True)
+            self._keys[taken] = edges[missing[first]]
+            missing = np.delete(missing, first)
+            slots[missing] = self._probe(edges[missing])
+        return slots
+
+    def _rehash(self, capacity):
+        live = self._keys != _EMPTY
+        keys, values, stamps = self._keys[live], self._values[live], self._stamps[live]
+        self._keys = np.full(capacity, _EMPTY, dtype=np.int64)
+        self._values = np.zeros(capacity)
+        self._stamps = np.zeros(capacity, dtype=np.int64)
+        self._count = 0
+        slots = self._insert(keys)
+        self._values[slots] = values
+        self._stamps[slots] = stamps
+
+    def _levels(self, edges):
+        slots = self._probe(edges)
+        found = self._keys[slots] == edges
+        levels = np.full(edges.size, self._implicit())
+        slots = slots[found]
+        levels[found] = self._values[slots] * self._decay_since(self._stamps[slots])
+        return levels
+
+    def _write(self, edges, levels):
+        """Store the levels of distinct edges, stamped now."""
+        slots = self._probe(edges)
+        # Untouched edges written at the implicit level need no entry
+        needed = (self._keys[slots] == edges) | (levels != self._implicit())
+        edges, levels = edges[needed], levels[needed]
+        slots = self._insert(edges)
+        self._values[slots] = levels
+        self._stamps[slots] = self._tick
+
+    def _edge_ids(self, edges):
+        if isinstance(edges, slice):
+            return np.arange(self.size)[edges]
+        return np.atleast_1d(np.asarray(edges, dtype=np.int64))
+
+    def __getitem__(self, edges):
+        levels = self._levels(self._edge_ids(edges))
+        return levels[0] if np.ndim(edges) == 0 and not isinstance(edges, slice) else levels
+
+    def __setitem__(self, edges, levels):
+        edges = self._edge_ids(edges)
+        levels = np.broadcast_to(np.asarray(levels, dtype=np.float64), edges.shape)
+        # Repeated edges: the last write wins, as with numpy
+        unique, last = np.unique(edges[::-1], return_index=True)
+        self._write(unique, levels[::-1][last])
+
+    def __imul__(self, factor):
+        factor = float(factor)
+        if factor < 0:
+            raise ValueError("Pheromone decay factors must be non-negative")
+        if factor == 0:
+            self.fill(0.0)
+            return self
+        self._tick += 1
+        if self._tick == self._log_decay.size:
+            self._log_decay = np.concatenate([self._log_decay, np.empty(self._log_decay.size)])
+        self._log_decay[self._tick] = self._log_decay[self._tick - 1] + np.log(factor)
+        return self
+
+    def __array__(self, dtype=None, copy=None):
+        dense = np.full(self.size, self._implicit())
+        edges, levels = self.touched()
+        dense[edges] = levels
+        return dense if dtype is None else dense.astype(dtype)
+
+    def touched(self):
+        """Return (edge ids, levels) of the edges holding an entry, by edge id."""
+        slots = np.flatnonzero(self._keys != _EMPTY)
+        slots = slots[np.argsort(self._keys[slots])]
+        return self._keys[slots], self._values[slots] * self._decay_since(self._stamps[slots])
+
+    def add_at(self, edges, amounts):
+        """Add amounts to edges, summing repeated edges (like ``np.add.at``)."""
+        edges = self._edge_ids(edges)
+        unique, inverse = np.unique(edges, return_inverse=True)
+        totals = np.bincount(inverse, weights=np.broadcast_to(np.asarray(amounts, dtype=np.float64), edges.shape))
+        self._write(unique, self._levels(unique) + totals)
+
+    def fill(self, level):
+        """Put every edge at ``level``, dropping every entry."""
+        self._keys.fill(_EMPTY)
+        self._count = 0
+        self._default = float(level)
+        self._default_stamp = self._tick
+
+    def clip(self, lower, upper, edges=None):
+        """
+        Clamp every level to [lower, upper] in place (O(touched edges)).
+
+        ``edges`` (the edges written since the previous clip, see
+        LazyPheromones.clip) is accepted for symmetry; every entry is clamped.
+        """
+        slots = np.flatnonzero(self._keys != _EMPTY)
+        levels = self._values[slots] * self._decay_since(self._stamps[slots])
+        self._values[slots] = np.clip(levels, lower, upper)
+        self._stamps[slots] = self._tick
+        self._default = float(np.clip(self._implicit(), lower, upper))
+        self._default_stamp = self._tick
+
+    def mean(self):
+        if self.size == 0:
+            return np.nan
+        levels = self.touched()[1]
+        return (levels.sum() + self._implicit() * (self.size - levels.size)) / self.size
+
+    def min(self):
+        levels = self.touched()[1]
+        return min(levels.min(initial=np.inf), self._implicit() if levels.size < self.size else np.inf)
+
+    def max(self):
+        levels = self.touched()[1]
+        return max(levels.max(initial=-np.inf), self._implicit() if levels.size < self.size else -np.inf)
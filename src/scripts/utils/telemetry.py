@@ -0,0 +1,227 @@
+"""Per-epoch telemetry for the colonies.
+
+Every colony accepts an ``observer``: any callable that receives one flat
+dict per epoch with
+
+- ``epoch`` and the wall time of each phase (``time_walk``,
+  ``time_evaporation``, ``time_deposit``, ...),
+- ``best_cost`` / ``mean_cost`` / ``worst_cost`` over the ants that reached
+  the food, ``lost_ants`` and ``cut_ants``,
+- ``path_length_min`` / ``path_length_mean`` / ``path_length_max`` (nodes),
+- ``distinct_routes`` and ``best_route_ants`` (ants sharing the cheapest
+  route), from the route hashes,
+- ``pheromone_min`` / ``pheromone_max`` / ``pheromone_entropy`` (Shannon
+  entropy of the normalized pheromone levels, divided by its maximum so 1.0
+  means uniform trails).
+
+Without an observer the colonies only pay for a few no-op method calls per
+epoch. TelemetryRecorder collects the records and exports them as CSV or JSON.
+
+Observers that also define ``pheromone_snapshot(state)`` are handed the
+ColonyState after every record; PheromoneSnapshots uses it to keep compact
+pheromone snapshots for pheromone_animation.
+
+The pheromone statistics of a SparsePheromones store are computed from its
+touched edges plus the level shared by the untouched ones, so recording a
+sparse run never builds the dense array of the city.
+"""
+
+import copy
+import csv
+import json
+from time import perf_counter
+
+import numpy as np
+
+from .sparse_pheromones import SparsePheromones
+from .walk_kernels import WALK_CUT, WALK_LOST
+
+
+class PhaseTimer:
+    """Accumulate the wall time of the phases of an epoch; a no-op when disabled."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.timings = {}
+        self._last = 0.0
+
+    def start(self):
+        """Start a new epoch."""
+        if self.enabled:
+            self.timings = {}
+            self._last = perf_counter()
+
+    def lap(self, phase):
+        """Charge the time elapsed since the previous lap to ``phase``."""
+        if self.enabled:
+            now = perf_counter()
+            self.timings[phase] = self.timings.get(phase, 0.0) + now - self._last
+            self._last = now
+
+
+def _weighted_levels(pheromones):
+    """Return (levels, counts): pheromone levels and how many edges hold each one."""
+    if isinstance(pheromones, SparsePheromones):
+        # Touched edges one by one, plus every untouched edge at their common level
+        levels = np.append(pheromones.touched()[1], pheromones.untouched_level)
+        counts = np.ones(levels.size)
+        counts[-1] = pheromones.size - pheromones.touched_count
+        return levels, counts
+    tau = np.asarray(pheromones, dtype=np.float64)
+    return tau, np.ones(tau.size)
+
+
+def pheromone_entropy(pheromones):
+    """Normalized Shannon entropy of the pheromone levels (1.0 = uniform)."""
+    levels, counts = _weighted_levels(pheromones)
+    size = counts.sum()
+    total = (levels * counts).sum()
+    if size < 2 or not np.isfinite(total) or total <= 0:
+        return 0.0
+    held = (levels > 0) & (counts > 0)
+    p = levels[held] / total
+    return float(-(counts[held] * p * np.log(p)).sum() / np.log(size))
+
+
+def _float16_snapshot(pheromones):
+    """Level of every edge as float16 (clipped to its range), without a float64 copy of sparse trails."""
+    float16_max = np.finfo(np.float16).max
+    if isinstance(pheromones, SparsePheromones):
+        snapshot = np.full(pheromones.size, min(pheromones.untouched_level, float16_max), dtype=np.float16)
+        edges, levels = pheromones.touched()
+        snapshot[edges] = np.minimum(levels, float16_max)
+        return snapshot
+    return np.minimum(pheromones, float16_max).astype(np.float16)
+
+
+def _stats(values):
+    if values.size == 0:
+        return None, None, None
+    return float(values.min()), float(values.mean()), float(values.max())
+
+
+def epoch_record(epoch, costs, path_lengths, status, pheromones, timings, **extra):
+    """
+    Build the telemetry record of one epoch.
+
+    Parameters:
+        epoch (int): Epoch number (0-based).
+        costs (numpy.ndarray): Cost of every ant (inf when it did not arrive).
+        path_lengths (numpy.ndarray): Number of nodes walked by every ant.
+        status (numpy.ndarray): Walk outcome of every ant (see walk_kernels).
+        pheromones (numpy.ndarray, LazyPheromones or SparsePheromones):
+            Pheromone level of every edge.
+        timings (dict): Seconds spent per phase.
+        **extra: Additional fields (e.g. ``restart``, ``distinct_routes``).
+
+    Returns:
+        dict: Flat record (see the module docstring for the keys).
+    """
+    costs = np.asarray(costs, dtype=np.float64)
+    best, mean, worst = _stats(costs[np.isfinite(costs)])
+    length_min, length_mean, length_max = _stats(np.asarray(path_lengths))
+
+    record = {"epoch": epoch}
+    record.update({f"time_{phase}": seconds for phase, seconds in timings.items()})
+    record.update({
+        "best_cost": best,
+        "mean_cost": mean,
+        "worst_cost": worst,
+        "lost_ants": int(np.count_nonzero(status == WALK_LOST)),
+        "cut_ants": int(np.count_nonzero(status == WALK_CUT)),
+        "path_length_min": length_min,
+        "path_length_mean": length_mean,
+        "path_length_max": length_max,
+        "pheromone_min": float(pheromones.min()) if pheromones.size else None,
+        "pheromone_max": float(pheromones.max()) if pheromones.size else None,
+        "pheromone_entropy": pheromone_entropy(pheromones),
+    })
+    record.update(extra)
+    return record
+
+
+class TelemetryRecorder:
+    """Observer that keeps every epoch record and exports them."""
+
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, record):
+        self.records.append(record)
+
+    def fieldnames(self):
+        """Union of the record keys, in first-seen order."""
+        names = {}
+        for record in self.records:
+            names.update(dict.fromkeys(record))
+        return list(names)
+
+    def to_csv(self, path):
+        """Write one row per epoch; missing fields are left empty."""
+        with open(path, "w", newline="", encoding="utf-8") as handle:
+            writer = csv.DictWriter(handle, fieldnames=self.fieldnames())
+            writer.writeheader()
+            writer.writerows(self.records)
+
+    def to_json(self, path):
+        """Write the records as a JSON list."""
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.records, handle, indent=2)
+
+
+class PheromoneSnapshots(TelemetryRecorder):
+    """
+    Telemetry recorder that also keeps the pheromone level of every edge.
+
+    Snapshots are stored as float16 edge arrays (levels above the float16
+    range are clipped to its maximum), one every ``every`` epochs plus the
+    last epoch, so a long run on a large city stays small in memory. Sparse
+    trails are snapshotted from their touched edges, and the last epoch is
+    only expanded when the snapshots are read.
+
+    Attributes:
+        epochs (list): Epoch of every snapshot.
+        snapshots (list): float16 pheromone array of every snapshot.
+        graph (dict): node_ids / node_type / indptr / indices of the walked graph.
+    """
+
+    def __init__(self, every=1):
+        super().__init__()
+        self.every = max(1, int(every))
+        self.graph = None
+        self._epochs = []
+        self._snapshots = []
+        self._last = None
+
+    @property
+    def epochs(self):
+        return self._epochs + ([self._last[0]] if self._last is not None else [])
+
+    @property
+    def snapshots(self):
+        if self._last is None:
+            return list(self._snapshots)
+        epoch, levels = self._last
+        if not isinstance(levels, np.ndarray):
+            self._last = epoch, levels = epoch, _float16_snapshot(levels)
+        return self._snapshots + [levels]
+
+    def pheromone_snapshot(self, state):
+        """Snapshot ``state.pheromones``; off-cadence epochs only survive as the last one."""
+        if self.graph is None:
+            self.graph = {key: state.walk_graph[key] for key in ("node_ids", "node_type", "indptr", "indices")}
+        if state.epoch % self.every == 0:
+            self._epochs.append(state.epoch)
+            self._snapshots.append(_float16_snapshot(state.pheromones))
+            self._last = None
+        elif isinstance(state.pheromones, SparsePheromones):
+            # Kept as a copy of the store (O(touched edges)) until someone reads the snapshots
+            self._last = state.epoch, copy.deepcopy(state.pheromones)
+        else:
+            self._last = state.epoch, _float16_snapshot(state.pheromones)
+
+    def stacked(self):
+        """Snapshots as one (snapshots x edges) float16 array."""
+        if not self.snapshots:
+            return np.zeros((0, 0), dtype=np.float16)
+        return np.stack(self.snapshots)
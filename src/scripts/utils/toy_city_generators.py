@@ -103,6 +103,51 @@ def generate_bus_line_square_city(size, fixed_weight):
     return [bus_dict]
 
 
+def generate_bus_lines_square_city(size, fixed_weight, lines_number):
+    """
+    Generate several vertical bus lines evenly spread over a square city.
+
+    Every line gets its own bus node offset (a power of ten above the number
+    of map nodes, times the line number), so ids never collide with map nodes
+    even on large grids.
+
+    Parameters:
+        size (int): The size of the city (number of nodes per side).
+        fixed_weight (float): The weight for each edge.
+        lines_number (int): Number of bus lines (at most ``size``).
+
+    Returns:
+        list: A list of bus line graphs.
+    """
+    base_offset = max(100000, 10 ** len(str(size * size)))
+    distance = calculate_bus_time_travel_cost(fixed_weight)
+    columns = sorted({int(round(c)) for c in [(k + 0.5) * size / lines_number for k in range(lines_number)]})
+
+    buses_graph = []
+    for line, column in enumerate(columns):
+        offset = base_offset * (line + 1)
+        route = list(range(min(column, size - 1), size * size, size))
+        bus_dict = {
+            "name": f"bus line {line + 1}",
+            "stops": [(node, node + offset) for node in route],
+            "route": route,
+            "node_bus_index": {node + offset for node in route},
+            "connections": {},
+            "weights": {},
+        }
+        for i, current_node in enumerate(route):
+            bus_current = current_node + offset
+            if i < len(route) - 1:
+                bus_dict["connections"][bus_current] = [route[i + 1] + offset]
+                bus_dict["weights"][bus_current] = [distance]
+            else:
+                bus_dict["connections"][bus_current] = []
+                bus_dict["weights"][bus_current] = []
+        buses_graph.append(bus_dict)
+
+    return buses_graph
+
+
 def _compute_route_cost(graph, path):
     total = 0.0
     for start, end in zip(path, path[1:]):
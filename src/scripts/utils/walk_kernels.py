@@ -0,0 +1,441 @@
+"""Ant walk kernels over compact (CSR) graphs.
+
+A walk is the innermost loop of every colony: filter visited neighbors,
+weigh them by tau^alpha * eta, sample the next node and accumulate the cost.
+Done through dict lookups and tiny NumPy arrays it is dominated by
+interpreter overhead, so the kernels here work on the flat arrays of a
+compact graph instead:
+
+- a visited mask replaces ``np.isin(neighbors, path)``,
+- the heuristic eta = (1 / normalize_for_selection(w)) ** beta is computed
+  once per edge instead of once per step,
+- pheromones are a flat array aligned with the graph edges,
+- ants first pick among the node's candidate list ("cand_indptr" /
+  "cand_edges", see candidate_lists) and only scan the whole row when every
+  candidate was visited. Without candidate lists the list is the whole row.
+
+When Numba is installed the kernel is JIT-compiled; otherwise the very same
+function runs as plain NumPy code. Both consume random numbers exactly like
+the reference ``ant_solution_*`` functions (one draw per q0 test and one per
+roulette selection), so seeded runs follow the same paths. Each ant may draw
+from its own Generator (see random_streams).
+
+With ``threads`` > 1 the ants of an epoch are split into contiguous groups
+walked by a thread pool, each group with its own scratch arrays. The graph
+and the pheromones are only read during the walks and every ant draws from
+its own stream, so the routes are the same as with one thread; every group
+stores its routes straight into its own ant slots of the buffer, and the
+deposits that follow see the same buffer. The compiled kernel releases the
+GIL (``nogil``), so the groups walk in parallel; the Python kernel only does
+on free-threaded CPython builds, and walk_threads falls back to one thread
+elsewhere.
+"""
+
+import sys
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+import numpy as np
+
+from .candidate_lists import build_candidate_lists
+from .compact_graph import compile_graph, node_count
+from .heuristic_weights import normalize_for_selection
+from .lazy_evaporation import LazyPheromones
+from .random_streams import stream
+from .route_buffer import RouteBuffer
+
+try:  # optional dependency
+    import numba
+except ImportError:  # pragma: no cover - depends on the environment
+    numba = None
+
+HAS_NUMBA = numba is not None
+
+# Walk outcome codes
+WALK_OK = 0
+WALK_LOST = 1  # no unvisited neighbor left
+WALK_CUT = 2  # step limit reached
+
+
+def _pocket_is_open(indptr, indices, visited, node, end, limit, queue):
+    """
+    Tell whether the unvisited region around ``node`` holds the food or at least ``limit`` nodes.
+
+    Breadth-first search through unvisited nodes, marking them with 2 in
+    ``visited`` and unmarking them before returning; ``queue`` needs
+    ``limit`` + 2 slots. Already visited nodes (revisiting ants) count as open.
+    """
+    if node == end or visited[node] != 0:
+        return True
+    queue[0] = node
+    visited[node] = 2
+    head = 0
+    tail = 1
+    is_open = False
+    while head < tail and not is_open:
+        current = queue[head]
+        head += 1
+        for edge in range(indptr[current], indptr[current + 1]):
+            neighbor = indices[edge]
+            if neighbor == end:
+                is_open = True
+                break
+            if visited[neighbor] == 0:
+                visited[neighbor] = 2
+                queue[tail] = neighbor
+                tail += 1
+                if tail > limit:
+                    is_open = True
+                    break
+    for i in range(tail):
+        visited[queue[i]] = 0
+    return is_open
+
+
+if HAS_NUMBA:  # pragma: no cover - depends on the environment
+    # Called from the kernel, so it must be compiled too
+    _pocket_is_open = numba.njit(cache=True, nogil=True)(_pocket_is_open)
+
+
+def _walk(indptr, indices, weights, eta, tau, cand_indptr, cand_edges, start, end, alpha, q0, revisit, max_steps,
+          max_cost, lookahead, backtrack, local_rho, local_tau0, tau_floor, rng, visited, path, edges, queue,
+          dead_ends):
+    """
+    Walk one ant from start to end.
+
+    q0 < 0 disables the ACS greedy test (no random draw is spent on it).
+    With ``revisit`` (MAX-MIN semantics) an ant whose neighbors are all
+    visited may revisit them instead of getting lost, and degenerate weights
+    fall back to a uniform choice; otherwise they fall back to the cheapest
+    neighbor. ``max_steps`` > 0 cuts walks after that many moves (steps back
+    included) and walks whose route costs more than ``max_cost`` (np.inf: no
+    limit) are cut before reaching the food.
+    With ``lookahead`` > 0 the ant avoids neighbors that lead into a pocket of
+    fewer than ``lookahead`` unvisited nodes without the food (see
+    _pocket_is_open), unless every candidate does; ``queue`` is its scratch.
+    With ``backtrack`` > 0 an ant stuck in a dead end steps back along its own
+    path (up to ``backtrack`` times) instead of getting lost; the abandoned
+    nodes stay banned for the rest of the walk, are recorded in ``dead_ends``
+    and never appear in the returned (loop-free) path.
+    ``local_rho`` > 0 applies the classic ACS local update
+    tau <- (1 - local_rho) * tau + local_rho * local_tau0 to every edge as soon
+    as it is walked. Levels below ``tau_floor`` are read as ``tau_floor``
+    (the lazy floor of LazyPheromones; 0 for plain arrays). ``rng`` is the ant's Generator (or the np.random module in
+    Python mode).
+
+    Returns:
+        tuple: (path length, cost, status); the nodes are written to ``path``
+        and the traversed edge ids to ``edges``.
+    """
+    path[0] = start
+    visited[start] = 1
+    length = 1
+    cost = 0.0
+    status = WALK_OK
+    current = start
+    backtracked = 0
+    moves = 0
+
+    while current != end:
+        if (max_steps > 0 and moves >= max_steps) or cost > max_cost:
+            status = WALK_CUT
+            break
+
+        lo = indptr[current]
+        hi = indptr[current + 1]
+        listed = cand_edges[cand_indptr[current]:cand_indptr[current + 1]]
+        candidates = listed[visited[indices[listed]] == 0]
+        if candidates.size == 0 and listed.size < hi - lo:
+            # Every candidate was visited: fall back to the full row
+            row = np.arange(lo, hi)
+            candidates = row[visited[indices[lo:hi]] == 0]
+        if candidates.size == 0:
+            if revisit and hi > lo:
+                candidates = np.arange(lo, hi)
+            elif backtracked < backtrack and length > 1:
+                # Step back; the dead end stays marked as visited
+                dead_ends[backtracked] = current
+                backtracked += 1
+                moves += 1
+                cost -= weights[edges[length - 2]]
+                length -= 1
+                current = path[length - 1]
+                continue
+            else:
+                status = WALK_LOST
+                break
+
+        if lookahead > 0 and candidates.size > 1:
+            open_ahead = np.zeros(candidates.size, dtype=np.bool_)
+            for k in range(candidates.size):
+                open_ahead[k] = _pocket_is_open(indptr, indices, visited, indices[candidates[k]], end, lookahead, queue)
+            if open_ahead.any():
+                candidates = candidates[open_ahead]
+
+        levels = tau[candidates]
+        if tau_floor > 0.0:
+            levels = np.maximum(levels, tau_floor)
+        combined = (levels ** alpha) * eta[candidates]
+
+        greedy = False
+        if q0 >= 0.0:
+            greedy = rng.random() <= q0
+
+        if greedy:
+            if not revisit and (not np.isfinite(combined).all() or np.all(combined == 0)):
+                choice = np.argmin(weights[candidates])
+            else:
+                choice = np.argmax(combined)
+        else:
+            total = np.sum(combined)
+            if revisit:
+                if total == 0:
+                    probabilities = np.ones(candidates.size) / candidates.size
+                else:
+                    probabilities = combined / total
+            elif total <= 0 or not np.isfinite(total):
+                probabilities = np.zeros(0)
+            else:
+                probabilities = combined / total
+
+            if probabilities.size == 0:
+                choice = np.argmin(weights[candidates])
+            else:
+                # Same arithmetic as roulette_wheel_selection + np.random.choice
+                probabilities = probabilities / np.sum(probabilities)
+                cdf = np.cumsum(probabilities)
+                cdf = cdf / cdf[-1]
+                choice = np.searchsorted(cdf, rng.random(), side="right")
+
+        edge = candidates[choice]
+        if local_rho > 0.0:
+            tau[edge] = (1.0 - local_rho) * max(tau[edge], tau_floor) + local_rho * local_tau0
+        current = indices[edge]
+        edges[length - 1] = edge
+        path[length] = current
+        length += 1
+        moves += 1
+        cost += weights[edge]
+        visited[current] = 1
+
+    visited[path[:length]] = 0
+    if backtracked > 0:
+        visited[dead_ends[:backtracked]] = 0
+        cost = 0.0
+        for i in range(length - 1):
+            cost += weights[edges[i]]
+    return length, cost, status
+
+
+if HAS_NUMBA:  # pragma: no cover - depends on the environment
+    _walk_numba = numba.njit(cache=True, nogil=True)(_walk)
+else:
+    _walk_numba = None
+
+
+def resolve_backend(backend="auto"):
+    """
+    Pick the walk backend.
+
+    Parameters:
+        backend (str): "auto" (Numba when installed), "numba" or "python".
+
+    Returns:
+        str: "numba" or "python".
+    """
+    if backend == "auto":
+        return "numba" if HAS_NUMBA else "python"
+    if backend == "numba" and not HAS_NUMBA:
+        raise ImportError("The 'numba' backend requires numba to be installed")
+    if backend not in ("numba", "python"):
+        raise ValueError(f"Unknown walk backend: {backend!r}")
+    return backend
+
+
+def _gil_enabled():
+    """Tell whether this interpreter has a GIL (always before CPython 3.13)."""
+    return getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+def walk_threads(threads, backend="auto", sparse=False):
+    """
+    Pick the number of threads worth walking the ants on.
+
+    The Python kernel (the "python" backend, or any backend on sparse trails)
+    holds the GIL, so with a GIL more threads only add overhead: warn and walk
+    in one thread.
+
+    Parameters:
+        threads (int): Requested number of threads.
+        backend (str): Walk backend (see resolve_backend).
+        sparse (bool): Whether the trails are a SparsePheromones store.
+
+    Returns:
+        int: ``threads``, or 1 when the walks cannot run in parallel.
+    """
+    if threads > 1 and (sparse or resolve_backend(backend) == "python") and _gil_enabled():
+        warnings.warn("The Python walk kernel holds the GIL; walking the ants in one thread", stacklevel=2)
+        return 1
+    return threads
+
+
+def edge_desirability(weights, beta):
+    """Return the heuristic eta = (1 / normalize_for_selection(w)) ** beta of every edge."""
+    effective_weights = normalize_for_selection(np.asarray(weights, dtype=np.float64))
+    with np.errstate(divide="ignore"):
+        return (1.0 / effective_weights) ** beta
+
+
+def prepare_walk_graph(graph_map, beta, candidate_list_size=None):
+    """
+    Compile a graph for the walk kernels.
+
+    Parameters:
+        graph_map (dict): Dict graph or already compiled compact graph.
+        beta (float): Exponent of the heuristic term.
+        candidate_list_size (int, optional): Restrict transitions to the top-k
+            neighbors by heuristic (see candidate_lists); None keeps full rows.
+
+    Returns:
+        dict: Compact graph with an "eta" edge array and the candidate lists.
+    """
+    compact = graph_map if "indptr" in graph_map else compile_graph(graph_map)
+    walk_graph = dict(compact)
+    walk_graph["eta"] = edge_desirability(compact["weights"], beta)
+    if candidate_list_size is None:
+        walk_graph["cand_indptr"] = compact["indptr"]
+        walk_graph["cand_edges"] = np.arange(compact["indices"].size, dtype=np.int64)
+    else:
+        walk_graph["cand_indptr"], walk_graph["cand_edges"] = build_candidate_lists(walk_graph, candidate_list_size)
+    return walk_graph
+
+
+def walk_ants(walk_graph, tau, start, end, routes, alpha, q0=-1.0, revisit=False, max_steps=0, backend="auto", rngs=None,
+              local_rho=0.0, local_tau0=0.0, blocked=None, lookahead=0, backtrack=0, max_cost=np.inf, threads=1,
+              pool=None):
+    """
+    Walk a whole epoch of ants over a prepared graph into a RouteBuffer.
+
+    Parameters:
+        walk_graph (dict): Graph from prepare_walk_graph.
+        tau (numpy.ndarray, LazyPheromones or SparsePheromones): Pheromone
+            level of every edge; sparse trails are walked by the Python kernel.
+        start, end (int): Dense indices of the ant hill and the food.
+        routes (RouteBuffer): Buffer receiving one route per ant; its hashes
+            are updated once every ant walked.
+        alpha (float): Exponent of the pheromone term.
+        q0 (float): ACS greedy transition probability; negative to disable.
+        revisit (bool): MAX-MIN "controlled revisit" semantics.
+        max_steps (int): Cut walks after this many moves (0 = no limit).
+        backend (str): "auto", "numba" or "python".
+        rngs (list, optional): One Generator per ant; None draws from the
+            global np.random state.
+        local_rho, local_tau0 (float): Classic ACS local update applied during
+            the walk (see _walk); 0 disables it.
+        blocked (numpy.ndarray, optional): Dense nodes the ants must never
+            enter (e.g. nodes that cannot reach the food, see reachability);
+            they are marked as visited before every walk.
+        lookahead (int): Avoid stepping into pockets of fewer unvisited nodes
+            than this (see _walk); 0 disables the check.
+        backtrack (int): Dead ends an ant may back out of before it is lost
+            (see _walk); 0 keeps the "lost at the first dead end" semantics.
+        max_cost (float): Cut walks whose route costs more than this before
+            they reach the food (np.inf = no limit).
+        threads (int): Split the ants into this many contiguous groups walked
+            by a thread pool (see the module docstring); 1 walks them in the
+            calling thread. Taken as is: see walk_threads for the fallback.
+        pool (concurrent.futures.Executor, optional): Pool of at least
+            ``threads`` workers walking the groups, reused across epochs
+            (run_colony creates one per run); None creates one for this call.
+
+    Returns:
+        RouteBuffer: ``routes``; lost or cut ants cost ``np.inf``.
+
+    Raises:
+        ValueError: If ``threads`` > 1 without per-ant ``rngs`` or with the
+            during-walk local update, whose results depend on the ant order.
+    """
+    ants_number = routes.ants_number
+    tau_floor = 0.0
+    if isinstance(tau, LazyPheromones):
+        # Walk probabilities only depend on the ratios of the levels: walk the stored ones
+        tau, tau_floor, local_tau0 = tau.stored, tau.floor, local_tau0 / tau.scale
+    dense = isinstance(tau, np.ndarray)
+    if backend == "numba" and not dense:
+        raise ValueError("The 'numba' backend needs a dense pheromone array")
+    walk = _walk_numba if dense and resolve_backend(backend) == "numba" else _walk
+    if threads > 1 and (rngs is None or local_rho > 0.0):
+        raise ValueError("Thread-parallel walks need per-ant streams and no during-walk local update")
+    if rngs is None:
+        if walk is _walk_numba:
+            # Numba cannot draw from the global state; derive a Generator from it so seeded runs repeat
+            rngs = [np.random.default_rng(np.random.randint(2**31 - 1))] * ants_number
+        else:
+            rngs = [stream()] * ants_number
+
+    def walk_group(ants, scratch, store):
+        """Walk ants with one set of scratch arrays, storing every route as soon as it is walked."""
+        visited, path, edges = scratch
+        queue = np.empty(lookahead + 2, dtype=np.int32)
+        dead_ends = np.empty(min(backtrack, visited.size), dtype=np.int32)
+        for ant in ants:
+            if blocked is not None:
+                # Re-marked per ant: a revisiting ant may have walked through (and unmarked) a blocked node
+                visited[blocked] = 1
+            length, cost, outcome = walk(
+                walk_graph["indptr"], walk_graph["indices"], walk_graph["weights"], walk_graph["eta"], tau,
+                walk_graph["cand_indptr"], walk_graph["cand_edges"], start, end, alpha, q0, revisit, max_steps,
+                float(max_cost), lookahead, backtrack, local_rho, local_tau0, float(tau_floor), rngs[ant], visited,
+                path, edges, queue, dead_ends,
+            )
+            cost = cost if outcome == WALK_OK else np.inf
+            store(ant, path[:length], edges[:length - 1], cost, outcome)
+        if blocked is not None:
+            visited[blocked] = 0
+
+    n_nodes = node_count(walk_graph)
+    if threads <= 1:
+        walk_group(range(ants_number), routes.scratch(n_nodes, max_steps), routes.store)
+    else:
+        lock = Lock()
+
+        def store(*route):
+            # Groups own disjoint ant slots, but a long route may grow (reallocate) the whole buffer
+            with lock:
+                routes.store(*route)
+
+        groups = np.array_split(np.arange(ants_number), min(threads, ants_number))
+        owned = pool is None
+        if owned:
+            pool = ThreadPoolExecutor(max_workers=len(groups))
+        try:
+            futures = [pool.submit(walk_group, group.tolist(), routes.scratch(n_nodes, max_steps, worker), store)
+                       for worker, group in enumerate(groups)]
+            for future in futures:
+                future.result()
+        finally:
+            if owned:
+                pool.shutdown()
+
+    routes.update_hashes()
+    return routes
+
+
+def run_ant_walks(walk_graph, tau, start, end, ants_number, alpha, q0=-1.0, revisit=False, max_steps=0, backend="auto", rngs=None,
+                  local_rho=0.0, local_tau0=0.0, blocked=None, lookahead=0, backtrack=0, max_cost=np.inf, threads=1,
+                  pool=None):
+    """
+    Walk a whole epoch of ants and return the routes as separate arrays.
+
+    Same parameters as walk_ants, with the number of ants instead of a buffer.
+
+    Returns:
+        tuple: (paths, edge_paths, costs, status) with one dense-index path and
+        edge-id array per ant; lost or cut ants cost ``np.inf``.
+    """
+    routes = walk_ants(walk_graph, tau, start, end, RouteBuffer(ants_number), alpha, q0, revisit, max_steps, backend, rngs,
+                       local_rho, local_tau0, blocked, lookahead, backtrack, max_cost, threads, pool)
+    paths = [routes.path(ant).copy() for ant in range(ants_number)]
+    edge_paths = [routes.edge_path(ant).copy() for ant in range(ants_number)]
+    return paths, edge_paths, routes.costs, routes.status
@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 # Support both execution modes:
 # - tests add `src` to sys.path -> top-level package is `configuration`
 # - running as a package `python -m src...` -> package path is `src.configuration`
@@ -55,6 +57,30 @@ def haversine(lat1, lon1, lat2, lon2):
     distance = R * c
     return distance
 
+def haversine_vectorized(lat1, lon1, lat2, lon2):
+    """
+    Vectorized Haversine distance for arrays of coordinates.
+
+    Parameters:
+    lat1, lon1: Arrays with the latitudes/longitudes of the first points
+    lat2, lon2: Arrays with the latitudes/longitudes of the second points
+
+    Returns:
+    distance: Array of Haversine distances in kilometers
+    """
+    R = 6371  # Radius of the Earth in kilometers
+
+    lat1_rad = np.radians(lat1)
+    lat2_rad = np.radians(lat2)
+    delta_latitude = np.radians(np.subtract(lat2, lat1))
+    delta_longitude = np.radians(np.subtract(lon2, lon1))
+
+    a = (np.sin(delta_latitude / 2) ** 2 +
+         np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(delta_longitude / 2) ** 2)
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    return R * c
+
 def calculate_bus_get_on_cost():
     """Return the cost incurred when boarding a bus.
 
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from src.scripts.batch_queries.od_batch import solve_od_pairs, write_results_csv
+from src.scripts.utils.compact_graph import compile_graph
+from src.scripts.utils.route_finder import dijkstra_compact, dijkstra_distances
+
+PAIRS = [(1, 60), (8, 60), (1, 63), (0, 60), (8, 63)]
+PARAMETERS = {"ants": 8, "epomax": 10}
+
+
+def test_dijkstra_distances_matches_single_queries(city):
+    compact = compile_graph(city)
+    distances = dijkstra_distances(compact, 1)
+
+    for end in (60, 63, 100013):
+        path = dijkstra_compact(compact, 1, end)
+        cost = sum(city["weights"][a][city["connections"][a].index(b)] for a, b in zip(path, path[1:]))
+        assert distances[np.searchsorted(compact["node_ids"], end)] == pytest.approx(cost)
+
+
+@pytest.mark.parametrize("algorithm", ["ACS", "ACS_MAXMIN"])
+def test_batch_results_keep_input_order_and_never_beat_dijkstra(city, algorithm):
+    results = solve_od_pairs(city, PAIRS, algorithm, PARAMETERS, processes=1, seed=3, backend="python",
+                             compare_dijkstra=True)
+
+    assert [(row["origin"], row["destination"]) for row in results] == PAIRS
+    arrived = [row for row in results if np.isfinite(row["cost"])]
+    assert len(arrived) >= 3
+    for row in arrived:
+        assert row["path"][0] == row["origin"] and row["path"][-1] == row["destination"]
+        assert row["cost"] >= row["dijkstra_cost"] - 1e-9
+        assert row["cost_gap"] >= -1e-9
+    assert all(1 <= row["epochs"] <= 10 for row in results)
+
+
+def test_batch_results_do_not_depend_on_the_pool(city, tmp_path):
+    serial = solve_od_pairs(city, PAIRS, "ACO", PARAMETERS, processes=1, seed=0, backend="python")
+    pooled = solve_od_pairs(city, PAIRS, "ACO", PARAMETERS, processes=2, seed=0, backend="python")
+
+    assert [(r["path"], r["cost"], r["epochs"]) for r in serial] == [(r["path"], r["cost"], r["epochs"]) for r in pooled]
+
+    write_results_csv(pooled, tmp_path / "od.csv")
+    lines = (tmp_path / "od.csv").read_text().splitlines()
+    assert lines[0] == "origin,destination,path,cost,epochs,time_s"
+    assert len(lines) == len(PAIRS) + 1
+
+
+def test_unknown_algorithm_is_rejected(city):
+    with pytest.raises(ValueError):
+        solve_od_pairs(city, PAIRS, "ANTS", processes=1)
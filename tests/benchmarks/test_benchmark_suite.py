@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from src.scripts.benchmarks.benchmark_suite import build_city, find_regressions, load_parameters, main, run_suite
+from src.scripts.utils.toy_city_generators import generate_bus_lines_square_city
+
+
+def test_bus_lines_do_not_collide_with_map_nodes():
+    buses = generate_bus_lines_square_city(400, 1, 3)
+    bus_nodes = set().union(*(bus["node_bus_index"] for bus in buses))
+
+    assert len(buses) == 3
+    assert min(bus_nodes) >= 400 * 400
+    assert len(bus_nodes) == 3 * 400
+
+
+def test_run_suite_reports_every_case():
+    report = run_suite(sizes=[6], bus_lines=[0, 1], algorithms=["ACO", "dijkstra"], max_epochs=3, ants=4, backend="python")
+    results = report["results"]
+
+    assert len(results) == 4
+    assert report["metadata"]["seed"] == 0
+    for case in results:
+        assert case["wall_time_s"] >= 0
+        assert case["peak_memory_bytes"] > 0
+        assert case["time_per_epoch_s"] == pytest.approx(case["wall_time_s"] / case["epochs"])
+    dijkstra_cases = [case for case in results if case["algorithm"] == "dijkstra"]
+    assert all(case["cost_gap"] == 0 for case in dijkstra_cases)
+    assert all(case["epochs"] <= 3 for case in results)
+
+
+def test_seeded_suite_is_reproducible():
+    runs = [
+        run_suite(sizes=[6], bus_lines=[1], algorithms=["ACS"], max_epochs=5, ants=5, backend="python", measure_memory=False)
+        for _ in range(2)
+    ]
+    assert [case["cost"] for case in runs[0]["results"]] == [case["cost"] for case in runs[1]["results"]]
+
+
+def test_find_regressions_flags_only_real_slowdowns():
+    def report(*times):
+        return {"results": [
+            {"algorithm": "ACO", "size": size, "bus_lines": 0, "profile": "settings", "wall_time_s": t}
+            for size, t in zip((10, 20, 30), times)
+        ]}
+
+    regressions = find_regressions(report(1.0, 1.5, 0.01), report(1.0, 1.0, 0.001), tolerance=0.2)
+    assert [(r["size"], r["baseline"], r["current"]) for r in regressions] == [(20, 1.0, 1.5)]
+
+
+def test_cli_writes_json_and_gates_regressions(tmp_path, capsys):
+    output = tmp_path / "bench.json"
+    args = ["--sizes", "5", "--bus-lines", "1", "--algorithms", "dijkstra", "--no-memory"]
+    assert main(args + ["--output", str(output)]) == 0
+    report = json.loads(output.read_text())
+    assert report["results"][0]["algorithm"] == "dijkstra"
+
+    report["results"][0]["wall_time_s"] = -1.0  # impossible baseline: any run is slower
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(report))
+    assert main(args + ["--baseline", str(baseline)]) == 1
+    assert "REGRESSION" in capsys.readouterr().out
+
+
+def test_profiles_and_cities():
+    assert load_parameters("bus_friendly")["ants"] == 80
+    with pytest.raises(ValueError):
+        load_parameters("unknown")
+    assert len(build_city(5, 2)["buses"]) == 2
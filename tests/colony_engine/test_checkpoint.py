@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from src.scripts.colony_engine.checkpoint import load_checkpoint
+from src.scripts.colony_engine.engine import best_route, run_colony
+from src.scripts.colony_engine.strategies import ACOStrategy, ACSStrategy, BestWorstStrategy, MaxMinStrategy
+
+STRATEGIES = {
+    "ACO": lambda: ACOStrategy(0.3),
+    "ACS": lambda: ACSStrategy(0.3, 0.1, 0.2, local_update_during_walk=True),
+    "ABW": lambda: BestWorstStrategy(0.3, 0.1, max_stagnant_count=3),
+    "ACS_MAXMIN": lambda: MaxMinStrategy(0.3, 0.2, 0.5, 3.0),
+}
+
+
+class Preempted(Exception):
+    pass
+
+
+def _run(city, name, store, seed=2, **options):
+    state = run_colony(city, 1, 60, STRATEGIES[name](), 10, 24, 0.5, 0.7, 0.4, backend="python", seed=seed,
+                       sparse_pheromones=store == "sparse", lazy_evaporation=store == "lazy", **options)
+    return best_route(state, mark_lost=False), state.epoch, np.asarray(state.pheromones)
+
+
+def _preempt_at(epoch):
+    def observer(record):
+        if record["epoch"] == epoch:
+            raise Preempted
+    return observer
+
+
+@pytest.mark.parametrize("store", ["dense", "lazy", "sparse"])
+@pytest.mark.parametrize("name", sorted(STRATEGIES))
+def test_resumed_run_matches_uninterrupted_run(city, tmp_path, name, store):
+    path = str(tmp_path / "colony.npz")
+    expected = _run(city, name, store)
+    with pytest.raises(Preempted):
+        _run(city, name, store, checkpoint=path, checkpoint_every=5, observer=_preempt_at(13))
+    assert load_checkpoint(path)["epoch"] == 10
+
+    resumed = _run(city, name, store, resume=path)
+    assert resumed[:2] == expected[:2]
+    assert np.array_equal(resumed[2], expected[2])
+
+
+def test_unseeded_run_resumes_from_the_global_random_state(city, tmp_path):
+    path = str(tmp_path / "colony.npz")
+    np.random.seed(7)
+    expected = _run(city, "ABW", "dense", seed=None)
+    np.random.seed(7)
+    with pytest.raises(Preempted):
+        _run(city, "ABW", "dense", seed=None, checkpoint=path, checkpoint_every=4, observer=_preempt_at(9))
+    np.random.seed(123)
+    resumed = _run(city, "ABW", "dense", seed=None, resume=path)
+    assert resumed[:2] == expected[:2]
+    assert np.array_equal(resumed[2], expected[2])
+
+
+def test_checkpoint_warm_starts_follow_up_queries(city, tmp_path):
+    path = str(tmp_path / "colony.npz")
+    _run(city, "ACS", "sparse", checkpoint=path)
+    checkpoint = load_checkpoint(path)
+    assert checkpoint["epoch"] == 24 and checkpoint["strategy"] == "ACSStrategy"
+
+    with pytest.raises(ValueError):
+        run_colony(city, 2, 60, STRATEGIES["ACS"](), 10, 24, 0.5, 0.7, 0.4, seed=2, sparse_pheromones=True,
+                   resume=checkpoint)
+    state = run_colony(city, 2, 60, STRATEGIES["ACS"](), 10, 5, 0.5, 0.7, 0.4, seed=3,
+                       warm_start=checkpoint["pheromones"])
+    assert np.isfinite(best_route(state, mark_lost=False)[1])
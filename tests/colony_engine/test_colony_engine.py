@@ -0,0 +1,181 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from src.scripts.ant_best_worst.ant_colony_best_worst import ABW
+from src.scripts.ant_colony_simple_ACO.ant_colony_optimization import ACO
+from src.scripts.ant_colony_system.ant_colony_system import ACS
+from src.scripts.ant_max_min.ant_colony_MAXMIN import ACS_MAXMIN
+from src.scripts.colony_engine import engine
+from src.scripts.colony_engine.engine import ColonyStrategy, best_route, run_colony
+from src.scripts.colony_engine.strategies import ACOStrategy, BestWorstStrategy
+from src.scripts.utils import walk_kernels
+
+BUS_ROUTE = [1, 2, 3, 4, 5, 100005, 100013, 100021, 100029, 100037, 100045, 100053, 100061, 61, 60]
+
+# Results of the colonies before they were moved onto the shared engine
+# (np.random.seed(0), 15 ants, 30 epochs on the 8x8 bus city)
+LEGACY_RESULTS = {
+    "ACO": (lambda city: ACO(city, 1, 60, 15, 0.3, 0.5, 0.7, 0.4, 30, backend="python"), BUS_ROUTE, 8.51),
+    "ACS": (
+        lambda city: ACS(city, 1, 60, 15, 0.3, 0.1, 0.2, 0.5, 0.7, 0.4, 30, backend="python"),
+        [1, 2, 10, 11, 12, 13, 100013, 100021, 100029, 100037, 100045, 100053, 100061, 61, 60],
+        9.21,
+    ),
+    "ABW": (
+        lambda city: ABW(city, 1, 60, 15, 0.3, 30, 0.5, 0.7, 0.4, backend="python"),
+        [1, 2, 3, 11, 12, 4, 5, 13, 100013, 100021, 100029, 100037, 100045, 45, 53, 100053, 100061, 61, 60],
+        13.32,
+    ),
+    "ACS_MAXMIN": (lambda city: ACS_MAXMIN(city, 1, 60, 15, 0.3, 0.2, 30, 0.5, 0.7, 0.4, backend="python"), BUS_ROUTE, 8.51),
+}
+
+
+@pytest.mark.parametrize("variant", sorted(LEGACY_RESULTS))
+def test_wrappers_keep_legacy_results(city, variant):
+    run, expected_path, expected_cost = LEGACY_RESULTS[variant]
+    np.random.seed(0)
+    path, cost, _, epochs = run(city)
+
+    assert path == expected_path
+    assert cost == pytest.approx(expected_cost)
+    assert epochs == 30
+
+
+class RecordingStrategy(ColonyStrategy):
+    """Strategy that records the hook calls and never updates anything."""
+
+    def __init__(self):
+        super().__init__(0.0)
+        self.calls = []
+
+    def setup(self, graph_map, state):
+        self.calls.append("setup")
+
+    def evaporate(self, state):
+        self.calls.append("evaporate")
+
+    def local_update(self, state):
+        self.calls.append("local_update")
+
+    def deposit(self, state):
+        self.calls.append("deposit")
+
+    def clamp(self, state):
+        self.calls.append("clamp")
+
+    def mutate(self, state):
+        self.calls.append("mutate")
+
+    def restart(self, state):
+        self.calls.append("restart")
+        return False
+
+
+def test_engine_calls_strategy_hooks_in_order(city):
+    strategy = RecordingStrategy()
+    state = run_colony(city, 1, 60, strategy, 5, 2, 0.5, 1.0, 1.0, backend="python", seed=0)
+
+    epoch = ["evaporate", "local_update", "deposit", "clamp", "mutate", "restart"]
+    assert strategy.calls == ["setup"] + epoch * 2
+    assert state.epoch == 2
+    assert np.all(state.pheromones == 0.5)
+
+
+def test_engine_stops_when_every_ant_agrees():
+    # A line graph leaves a single possible route, so the first epoch converges
+    line = {
+        "node_index": {0, 1, 2},
+        "connections": {0: [1], 1: [2], 2: []},
+        "weights": {0: [1.0], 1: [2.0], 2: []},
+    }
+    state = run_colony(line, 0, 2, ACOStrategy(0.1), 4, 50, 0.5, 1.0, 1.0, backend="python", seed=0)
+
+    assert state.epoch == 1
+    assert state.converged_ants == 4
+    assert best_route(state) == ([0, 1, 2], 3.0)
+
+
+def test_best_route_reports_lost_ants():
+    dead_end = {
+        "node_index": {0, 1, 2},
+        "connections": {0: [1], 1: [], 2: []},
+        "weights": {0: [1.0], 1: [], 2: []},
+    }
+    state = run_colony(dead_end, 0, 2, ACOStrategy(0.1), 3, 2, 0.5, 1.0, 1.0, backend="python", seed=0)
+
+    assert best_route(state) == ([0, 1, np.inf], np.inf)
+    assert best_route(state, mark_lost=False) == ([0, 1], np.inf)
+
+
+def test_best_worst_mutation_matches_per_trail_loop(city):
+    strategy = BestWorstStrategy(0.3, min_pheromone=0.45)
+    state = run_colony(city, 1, 60, strategy, 5, 3, 0.5, 1.0, 1.0, backend="python", seed=0)
+    strategy.threshold = 0.2
+    tau = state.pheromones.copy()
+    indptr = state.walk_graph["indptr"]
+
+    # Per-trail reference on a copy of the colony stream
+    random = np.random.default_rng(7)
+    state.random = np.random.default_rng(7)
+    mutation = (state.epoch / state.max_epochs) * random.random() * 0.2
+    for node in range(indptr.size - 1):
+        trail = tau[indptr[node]:indptr[node + 1]]
+        if random.random() < 0.5:
+            trail += mutation
+        else:
+            trail -= mutation
+            trail[trail < 0.45] = 0.45
+
+    strategy.mutate(state)
+    np.testing.assert_allclose(state.pheromones, tau)
+
+
+def test_best_worst_restart_resets_pheromones_in_place(city):
+    strategy = BestWorstStrategy(0.3, min_pheromone=0.1, max_stagnant_count=1)
+    state = run_colony(city, 1, 60, strategy, 5, 1, 0.5, 1.0, 1.0, backend="python", seed=0)
+    pheromones = state.pheromones
+    pheromones[:3] = 9.0
+    state.most_common_cost, strategy.global_best_cost = 2.0, 1.0
+
+    assert strategy.restart(state)
+    assert state.pheromones is pheromones
+    assert np.all(pheromones == 0.5)
+
+
+@pytest.mark.parametrize("solver", [
+    lambda city, threads: ACO(city, 1, 60, 12, 0.3, 0.5, 0.7, 0.4, 15, backend="python", seed=5, threads=threads),
+    lambda city, threads: ABW(city, 1, 60, 12, 0.3, 15, 0.5, 0.7, 0.4, backend="python", seed=5, threads=threads),
+    lambda city, threads: ACS_MAXMIN(city, 1, 60, 12, 0.3, 0.2, 15, 0.5, 0.7, 0.4, backend="python", seed=5,
+                                     threads=threads),
+])
+def test_thread_parallel_colonies_match_sequential_ones(city, solver, monkeypatch):
+    sequential = solver(city, 1)
+    with pytest.warns(UserWarning, match="GIL"):
+        fallback = solver(city, 4)
+    assert (fallback[0], fallback[1], fallback[3]) == (sequential[0], sequential[1], sequential[3])
+
+    # As on a free-threaded build: one pool for the whole run
+    pools = []
+
+    class CountedPool(ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            pools.append(self)
+
+    monkeypatch.setattr(walk_kernels, "_gil_enabled", lambda: False)
+    monkeypatch.setattr(engine, "ThreadPoolExecutor", CountedPool)
+    threaded = solver(city, 4)
+    assert (threaded[0], threaded[1], threaded[3]) == (sequential[0], sequential[1], sequential[3])
+    assert len(pools) == 1
+
+
+def test_colonies_forward_run_colony_options(city):
+    recorder = []
+    ACS_MAXMIN(city, 1, 60, 6, 0.3, 0.2, 3, 0.5, 0.7, 0.4, backend="python", seed=1, observer=recorder.append,
+               candidate_list_size=4)
+    assert [record["epoch"] for record in recorder] == [0, 1, 2]
+
+    with pytest.raises(TypeError):
+        ACO(city, 1, 60, 6, 0.3, 0.5, 0.7, 0.4, 3, backend="python", seed=1, not_an_option=True)
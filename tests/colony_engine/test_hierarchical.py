@@ -0,0 +1,66 @@
+import copy
+import warnings
+
+import numpy as np
+import pytest
+
+from src.scripts.ant_colony_simple_ACO.ant_colony_optimization import ACO
+from src.scripts.colony_engine import hierarchical
+from src.scripts.colony_engine.engine import best_route, run_colony
+from src.scripts.colony_engine.hierarchical import run_hierarchical
+from src.scripts.colony_engine.strategies import ACOStrategy
+from src.scripts.utils.compact_graph import compile_graph
+from src.scripts.utils.generators import merge_bus_and_map_graph
+from src.scripts.utils.toy_city_generators import generate_bus_line_square_city, generate_square_city_graph
+
+CITY = merge_bus_and_map_graph(copy.deepcopy(generate_square_city_graph(16, 1)), generate_bus_line_square_city(16, 1))
+
+
+def _path_cost(graph, path):
+    return sum(graph["weights"][u][graph["connections"][u].index(v)] for u, v in zip(path, path[1:]))
+
+
+def test_refinement_runs_inside_a_corridor():
+    state = run_hierarchical(CITY, 0, 255, ACOStrategy(0.3), 15, 20, 0.5, 1.0, 1.0, block_size=16, backend="python",
+                             seed=0, backtrack=20)
+
+    path, cost = best_route(state)
+    assert state.walk_graph["node_ids"].size < compile_graph(CITY)["node_ids"].size
+    assert path[0] == 0 and path[-1] == 255
+    assert cost == pytest.approx(_path_cost(CITY, path))
+
+
+def test_corridor_edges_of_the_coarse_route_start_boosted():
+    state = run_hierarchical(CITY, 0, 255, ACOStrategy(0.3), 5, 1, 0.5, 1.0, 1.0, block_size=16, backend="python",
+                             seed=0, route_boost=3.0)
+
+    # One epoch of ACO evaporates and deposits on top of the projected trails
+    assert np.any(state.pheromones > 0.5 * 3.0 * 0.7 - 1e-12)
+
+
+def test_colonies_accept_a_block_size():
+    first = ACO(CITY, 0, 255, 15, 0.3, 0.5, 1.0, 1.0, 20, backend="python", seed=3, backtrack=20, hierarchical=16)
+    second = ACO(CITY, 0, 255, 15, 0.3, 0.5, 1.0, 1.0, 20, backend="python", seed=3, backtrack=20, hierarchical=16)
+
+    assert first[0] == second[0] and first[1] == second[1]
+    assert np.isfinite(first[1])
+    assert first[1] == pytest.approx(_path_cost(CITY, first[0]))
+
+
+def test_same_block_query_skips_the_coarse_colony(monkeypatch):
+    runs = []
+
+    def counted_run_colony(graph_map, *args, **kwargs):
+        runs.append(graph_map)
+        return run_colony(graph_map, *args, **kwargs)
+
+    monkeypatch.setattr(hierarchical, "run_colony", counted_run_colony)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        state = run_hierarchical(CITY, 0, 1, ACOStrategy(0.3), 10, 10, 0.5, 1.0, 1.0, block_size=16,
+                                 backend="python", seed=0)
+
+    path, cost = best_route(state)
+    assert len(runs) == 1
+    assert path[0] == 0 and path[-1] == 1
+    assert cost == pytest.approx(_path_cost(CITY, path))
@@ -0,0 +1,21 @@
+import copy
+
+import pytest
+
+from src.scripts.utils.generators import merge_bus_and_map_graph
+from src.scripts.utils.toy_city_generators import generate_bus_line_square_city, generate_square_city_graph
+
+
+@pytest.fixture(scope="session")
+def make_bus_city():
+    """Return a builder of square cities (size x size) merged with their toy bus line."""
+    def make(size):
+        map_graph = generate_square_city_graph(size, 1)
+        return merge_bus_and_map_graph(copy.deepcopy(map_graph), generate_bus_line_square_city(size, 1))
+    return make
+
+
+@pytest.fixture(scope="module")
+def city(make_bus_city):
+    """The 8x8 bus city most colony tests walk on (rebuilt per module)."""
+    return make_bus_city(8)
@@ -0,0 +1,57 @@
+import numpy as np
+
+from src.scripts.colony_engine.engine import run_colony
+from src.scripts.colony_engine.strategies import ACOStrategy
+from src.scripts.utils.node_index import to_dense
+from src.scripts.utils.route_buffer import RouteBuffer
+from src.scripts.utils.walk_kernels import WALK_LOST, WALK_OK, prepare_walk_graph, walk_ants
+
+# 0 -> 1 -> 2 -> 3 is the way to the food; 1 -> 4 -> 5 is a one-way dead end
+# and 2 -> 6 <-> 7 a pocket that can only go back to 2
+POCKETS = {
+    "node_index": set(range(8)),
+    "connections": {0: [1], 1: [4, 2], 2: [6, 3], 3: [], 4: [5], 5: [], 6: [7, 2], 7: [6]},
+    "weights": {0: [1.0], 1: [1.0, 1.0], 2: [1.0, 1.0], 3: [], 4: [1.0], 5: [], 6: [1.0, 1.0], 7: [1.0]},
+}
+
+
+def _walk_pockets(backtrack):
+    walk_graph = prepare_walk_graph(POCKETS, 1.0)
+    start, end = to_dense(walk_graph, [0, 3])
+    tau = np.ones(walk_graph["indices"].size)
+    routes = walk_ants(walk_graph, tau, start, end, RouteBuffer(50), 1.0, backend="python",
+                       rngs=[np.random.default_rng(ant) for ant in range(50)], backtrack=backtrack)
+    return walk_graph, routes
+
+
+def test_ants_get_lost_without_backtracking():
+    _, routes = _walk_pockets(0)
+
+    assert np.any(routes.status == WALK_LOST)
+
+
+def test_backtracking_ants_reach_the_food_on_a_loop_free_path():
+    walk_graph, routes = _walk_pockets(4)
+
+    assert np.all(routes.status == WALK_OK)
+    for ant in range(50):
+        path, edges = routes.path(ant), routes.edge_path(ant)
+        assert walk_graph["node_ids"][path].tolist() == [0, 1, 2, 3]
+        assert np.array_equal(walk_graph["indices"][edges], path[1:])
+        assert routes.costs[ant] == walk_graph["weights"][edges].sum() == 3.0
+    # Dead ends are released once the walk is over
+    assert not routes.scratch(8)[0].any()
+
+
+def test_backtracking_budget_is_bounded():
+    _, routes = _walk_pockets(1)
+
+    # One step back is not enough to leave the 6 -> 7 pocket or the 4 -> 5 dead end
+    assert np.any(routes.status == WALK_LOST)
+
+
+def test_colony_with_backtracking_finds_the_route():
+    state = run_colony(POCKETS, 0, 3, ACOStrategy(0.1), 10, 3, 0.5, 1.0, 1.0, backend="python", seed=0, backtrack=4)
+
+    assert not np.any(state.status == WALK_LOST)
+    assert np.all(state.distances == 3.0)
@@ -0,0 +1,104 @@
+import copy
+
+import numpy as np
+import pytest
+
+from src.scripts.ant_best_worst.ant_colony_best_worst import ABW
+from src.scripts.ant_colony_simple_ACO.ant_colony_optimization import ACO
+from src.scripts.ant_colony_system.ant_colony_system import ACS
+from src.scripts.ant_max_min.ant_colony_MAXMIN import ACS_MAXMIN
+from src.scripts.utils.candidate_lists import build_candidate_lists
+from src.scripts.utils.generators import merge_bus_and_map_graph
+from src.scripts.utils.node_index import to_dense, to_external
+from src.scripts.utils.toy_city_generators import generate_bus_lines_square_city, generate_square_city_graph
+from src.scripts.utils.walk_kernels import WALK_OK, prepare_walk_graph, run_ant_walks
+
+
+def _hub_graph(lines=4):
+    """Node 0 links to street nodes 1..5 (cost = id) and boards ``lines`` bus lines."""
+    graph = {
+        "node_index": set(range(7)),
+        "connections": {0: [5, 3, 1, 4, 2], 1: [6], 2: [6], 3: [6], 4: [6], 5: [6], 6: []},
+        "weights": {0: [5.0, 3.0, 1.0, 4.0, 2.0], 1: [1.0], 2: [1.0], 3: [1.0], 4: [1.0], 5: [1.0], 6: []},
+    }
+    buses = []
+    for line in range(lines):
+        buses.append({
+            "stops": [(0, 1000 + line), (6, 2000 + line)],
+            "route": [0, 6],
+            "node_bus_index": {1000 + line, 2000 + line},
+            "connections": {1000 + line: [2000 + line], 2000 + line: []},
+            "weights": {1000 + line: [0.5 + line], 2000 + line: []},
+        })
+    return merge_bus_and_map_graph(graph, buses)
+
+
+def _candidates_of(walk_graph, node):
+    dense = to_dense(walk_graph, [node])[0]
+    edges = walk_graph["cand_edges"][walk_graph["cand_indptr"][dense]:walk_graph["cand_indptr"][dense + 1]]
+    return to_external(walk_graph, walk_graph["indices"][edges])
+
+
+def test_street_and_bus_edges_have_separate_quotas():
+    walk_graph = prepare_walk_graph(_hub_graph(), 1.0)
+    walk_graph["cand_indptr"], walk_graph["cand_edges"] = build_candidate_lists(walk_graph, 2, bus_k=1)
+
+    # The two cheapest street edges and one boarding edge, in row order
+    assert _candidates_of(walk_graph, 0) == [1, 2, 1000]
+    # Rows shorter than the quota are kept whole
+    assert _candidates_of(walk_graph, 1) == [6]
+
+
+def test_without_candidate_lists_the_whole_row_is_listed():
+    walk_graph = prepare_walk_graph(_hub_graph(), 1.0)
+    assert np.array_equal(walk_graph["cand_indptr"], walk_graph["indptr"])
+    assert np.array_equal(walk_graph["cand_edges"], np.arange(walk_graph["indices"].size))
+
+
+def test_invalid_candidate_list_size():
+    with pytest.raises(ValueError):
+        prepare_walk_graph(_hub_graph(), 1.0, candidate_list_size=0)
+
+
+def test_ants_only_take_candidate_edges_at_the_hub():
+    walk_graph = prepare_walk_graph(_hub_graph(), 1.0, candidate_list_size=1)
+    start, end = to_dense(walk_graph, [0, 6])
+    tau = np.ones(walk_graph["indices"].size)
+
+    paths, _, _, status = run_ant_walks(walk_graph, tau, start, end, 30, 1.0, backend="python", rngs=[np.random.default_rng(i) for i in range(30)])
+    first_hops = {to_external(walk_graph, path[1:2])[0] for path in paths}
+
+    assert np.all(status == WALK_OK)
+    assert first_hops <= {1, 1000}
+
+
+def test_ants_fall_back_to_the_full_row_when_candidates_are_visited():
+    # 0 -> 1 is the only candidate of 0 and 1 can only go back to 0's neighbours through 2
+    graph = {
+        "node_index": {0, 1, 2, 3},
+        "connections": {0: [1, 2], 1: [0, 3, 2], 2: [3], 3: []},
+        "weights": {0: [1.0, 5.0], 1: [1.0, 9.0, 2.0], 2: [1.0], 3: []},
+    }
+    walk_graph = prepare_walk_graph(graph, 1.0, candidate_list_size=1)
+    start, end = to_dense(walk_graph, [0, 3])
+    tau = np.ones(walk_graph["indices"].size)
+
+    paths, _, costs, status = run_ant_walks(walk_graph, tau, start, end, 5, 1.0, backend="python", rngs=[np.random.default_rng(i) for i in range(5)])
+
+    # At node 1 the only candidate (back to 0) is visited, so the full row is used
+    assert np.all(status == WALK_OK)
+    assert all(to_external(walk_graph, path)[:2] == [0, 1] for path in paths)
+    assert set(costs.tolist()) <= {10.0, 4.0}
+
+
+@pytest.mark.parametrize("run", [
+    lambda city: ACO(city, 0, 35, 8, 0.3, 0.5, 0.7, 0.4, 5, backend="python", seed=0, candidate_list_size=2),
+    lambda city: ACS(city, 0, 35, 8, 0.3, 0.1, 0.2, 0.5, 0.7, 0.4, 5, backend="python", seed=0, candidate_list_size=2),
+    lambda city: ABW(city, 0, 35, 8, 0.3, 5, 0.5, 0.7, 0.4, backend="python", seed=0, candidate_list_size=2),
+    lambda city: ACS_MAXMIN(city, 0, 35, 8, 0.3, 0.2, 5, 0.5, 0.7, 0.4, backend="python", seed=0, candidate_list_size=2),
+])
+def test_every_colony_accepts_candidate_lists(run):
+    city = merge_bus_and_map_graph(generate_square_city_graph(6, 1), generate_bus_lines_square_city(6, 1, 3))
+    path, cost, _, _ = run(copy.deepcopy(city))
+    if np.isfinite(cost):
+        assert path[0] == 0 and path[-1] == 35
@@ -0,0 +1,125 @@
+import copy
+
+import numpy as np
+import pytest
+
+from src.scripts.ant_colony_system.ant_colony_system import ACS
+from src.scripts.utils.chain_compression import compress_chains, expand_path
+from src.scripts.utils.compact_graph import compile_graph
+from src.scripts.utils.generators import merge_bus_and_map_graph
+from src.scripts.utils.route_finder import dijkstra_compact
+from src.scripts.utils.toy_city_generators import generate_bus_line_square_city, generate_square_city_graph
+from src.scripts.utils.walk_kernels import prepare_walk_graph
+
+# Two junctions 0 and 5 joined by a two-way street 0 - 1 - 2 - 5 and a one-way
+# street 0 -> 3 -> 4 -> 5; 6 hangs off junction 5
+STREETS = {
+    "node_index": set(range(7)),
+    "connections": {0: [1, 3], 1: [0, 2], 2: [1, 5], 3: [4], 4: [5], 5: [2, 6], 6: [5]},
+    "weights": {0: [1.0, 2.0], 1: [1.0, 1.0], 2: [1.0, 1.0], 3: [2.0], 4: [2.0], 5: [1.0, 1.0], 6: [1.0]},
+}
+
+
+def _edges(compact):
+    ids = compact["node_ids"]
+    sources = np.repeat(ids, np.diff(compact["indptr"]))
+    return {(int(u), int(v)): w for u, v, w in zip(sources, ids[compact["indices"]], compact["weights"])}
+
+
+def _path_cost(graph, path):
+    return sum(graph["weights"][u][graph["connections"][u].index(v)] for u, v in zip(path, path[1:]))
+
+
+def _subdivided_city(size):
+    """Toy city with bus line whose every street is split in three, as in imported maps."""
+    city = merge_bus_and_map_graph(copy.deepcopy(generate_square_city_graph(size, 1)),
+                                   generate_bus_line_square_city(size, 1))
+    bus_nodes = {node for bus in city["buses"] for node in bus["node_bus_index"]}
+    graph = {"node_index": set(city["node_index"]), "connections": {}, "weights": {}, "buses": city["buses"]}
+    for node in city["connections"]:
+        graph["connections"][node], graph["weights"][node] = [], []
+    middles = {}
+    for node, neighbors in city["connections"].items():
+        for neighbor, weight in zip(neighbors, city["weights"][node]):
+            if node in bus_nodes or neighbor in bus_nodes:
+                graph["connections"][node].append(neighbor)
+                graph["weights"][node].append(weight)
+                continue
+            key = (min(node, neighbor), max(node, neighbor))
+            if key not in middles:
+                middles[key] = [10 ** 6 + 2 * len(middles), 10 ** 6 + 2 * len(middles) + 1]
+                for middle in middles[key]:
+                    graph["node_index"].add(middle)
+                    graph["connections"][middle], graph["weights"][middle] = [], []
+            chain = [key[0], *middles[key], key[1]] if node < neighbor else [key[1], *middles[key][::-1], key[0]]
+            for here, there in zip(chain, chain[1:]):
+                graph["connections"][here].append(there)
+                graph["weights"][here].append(weight / 3)
+    return graph
+
+
+def test_chains_become_super_edges():
+    compressed = compress_chains(STREETS)
+
+    assert compressed["node_ids"].tolist() == [0, 5, 6]
+    # The two streets from 0 to 5 cost 3 and 6: only the cheaper one is kept
+    assert _edges(compressed) == {(0, 5): 3.0, (5, 0): 3.0, (5, 6): 1.0, (6, 5): 1.0}
+    assert expand_path(compressed, [0, 5, 6]) == [0, 1, 2, 5, 6]
+    assert expand_path(compressed, [5, 0]) == [5, 2, 1, 0]
+
+
+def test_kept_nodes_survive():
+    compressed = compress_chains(STREETS, keep=[1, 4])
+
+    assert compressed["node_ids"].tolist() == [0, 1, 4, 5, 6]
+    assert _edges(compressed)[(0, 4)] == 4.0
+    assert dijkstra_compact(compressed, 0, 5) == [0, 1, 2, 5]
+
+
+def test_compressed_dijkstra_matches_the_full_graph():
+    graph = _subdivided_city(6)
+    full = compile_graph(graph)
+    for bus_express in (False, True):
+        compressed = compress_chains(graph, bus_express=bus_express)
+        assert compressed["node_ids"].size < full["node_ids"].size / 3
+        nodes = compressed["node_ids"].tolist()
+        for start, end in zip(nodes[::3], nodes[::-5]):
+            expected = dijkstra_compact(full, start, end)
+            path = dijkstra_compact(compressed, start, end)
+            assert (path is None) == (expected is None)
+            if path is not None:
+                assert path[0] == start and path[-1] == end
+                assert len(set(path)) == len(path)
+                assert _path_cost(graph, path) == pytest.approx(_path_cost(graph, expected))
+
+
+def test_bus_express_skips_the_stops_between_transfers():
+    city = merge_bus_and_map_graph(copy.deepcopy(generate_square_city_graph(6, 1)), generate_bus_line_square_city(6, 1))
+
+    compressed = compress_chains(city, bus_express=True)
+
+    edges = _edges(compressed)
+    # One line from 5 to 35: every bus node rides straight to the end of the line
+    assert edges[(100005, 100035)] == pytest.approx(5 * 0.3)
+    assert edges[(100017, 100035)] == pytest.approx(3 * 0.3)
+    assert expand_path(compressed, [100011, 100035]) == [100011, 100017, 100023, 100029, 100035]
+
+
+def test_colonies_return_expanded_routes():
+    graph = _subdivided_city(6)
+
+    path, cost, _, _ = ACS(graph, 1, 35, 10, 0.3, 0.1, 0.2, 0.5, 1.0, 0.4, 20, backend="python", seed=0,
+                           chain_compression="chains")
+
+    assert path[0] == 1 and path[-1] == 35
+    assert len(set(path)) == len(path)
+    assert cost == pytest.approx(_path_cost(graph, path))
+
+
+def test_compression_is_applied_once_and_before_preparing():
+    compressed = compress_chains(STREETS)
+
+    with pytest.raises(ValueError):
+        compress_chains(compressed)
+    with pytest.raises(ValueError):
+        compress_chains(prepare_walk_graph(STREETS, 1.0))
@@ -0,0 +1,57 @@
+import copy
+
+import numpy as np
+
+from src.scripts.utils.coarsening import coarsen_graph, corridor_mask, partition_blocks
+from src.scripts.utils.compact_graph import compile_graph
+from src.scripts.utils.generators import merge_bus_and_map_graph
+from src.scripts.utils.node_index import BUS_LINE_NODE
+from src.scripts.utils.route_finder import dijkstra_compact, dijkstra_distances
+from src.scripts.utils.toy_city_generators import generate_bus_line_square_city, generate_square_city_graph
+
+
+def _city(size):
+    return compile_graph(merge_bus_and_map_graph(copy.deepcopy(generate_square_city_graph(size, 1)),
+                                                 generate_bus_line_square_city(size, 1)))
+
+
+def test_blocks_are_compact_patches_of_streets():
+    city = _city(20)
+
+    blocks, depth = partition_blocks(city, 16)
+
+    street = city["node_type"] != BUS_LINE_NODE
+    street_blocks = np.unique(blocks[street])
+    assert 15 <= street_blocks.size <= 50
+    assert np.bincount(blocks[street]).max() <= 40
+    # Blocks grow by BFS, so no node is far from its seed
+    assert depth[street].max() <= 8
+    # Every bus line node is a block of its own
+    assert np.all(np.bincount(blocks)[blocks[~street]] == 1)
+    assert not np.isin(blocks[~street], street_blocks).any()
+
+
+def test_coarse_route_follows_the_city():
+    city = _city(20)
+    coarse, blocks = coarsen_graph(city, 16)
+
+    route = dijkstra_compact(coarse, blocks[0], blocks[399])
+
+    assert route[0] == blocks[0] and route[-1] == blocks[399]
+    # Coarse costs approximate the fine ones between block seeds
+    fine = dijkstra_distances(city, 0)[399]
+    coarse_cost = dijkstra_distances(coarse, blocks[0])[blocks[399]]
+    assert 0.5 * fine <= coarse_cost <= 2.0 * fine
+
+
+def test_corridor_grows_with_its_width():
+    city = _city(20)
+    coarse, blocks = coarsen_graph(city, 16)
+    route = dijkstra_compact(coarse, blocks[0], blocks[399])
+
+    narrow = corridor_mask(coarse, blocks, route, 0)
+    wide = corridor_mask(coarse, blocks, route, 1)
+
+    assert np.array_equal(narrow, np.isin(blocks, route))
+    assert np.all(wide[narrow])
+    assert narrow.sum() < wide.sum() < blocks.size
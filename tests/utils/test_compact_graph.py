@@ -0,0 +1,79 @@
+import numpy as np
+
+from src.scripts.utils.compact_graph import (
+    compile_graph,
+    compact_to_dict,
+    merge_bus_and_compact_graph,
+    subgraph,
+)
+from src.scripts.utils.node_index import BUS_LINE_NODE, BUS_STOP_NODE, to_dense, to_external
+
+
+def test_compile_graph_keeps_neighbor_order():
+    """Compact rows list neighbors and weights in the same order as the dict."""
+    graph = {
+        "node_index": {0, 1, 2, 7},
+        "connections": {0: [2, 1], 1: [2], 2: [0]},
+        "weights": {0: [5.0, 1.0], 1: [2.0], 2: [3.0]},
+    }
+    compact = compile_graph(graph)
+
+    assert compact["node_ids"].tolist() == [0, 1, 2, 7]
+    assert compact["indptr"].tolist() == [0, 2, 3, 4, 4]
+    assert to_external(compact, compact["indices"][0:2]) == [2, 1]
+    assert compact["weights"][0:2].tolist() == [5.0, 1.0]
+
+    back = compact_to_dict(compact)
+    assert back["connections"][0] == [2, 1]
+    assert back["connections"][7] == []
+
+
+def test_merge_bus_and_compact_graph_adds_get_on_off_edges(monkeypatch):
+    """Bus lines are merged like merge_bus_and_map_graph does for dict graphs."""
+    import src.scripts.utils.compact_graph as mod
+    monkeypatch.setattr(mod, "calculate_bus_get_on_cost", lambda: 3.3)
+    monkeypatch.setattr(mod, "calculate_bus_get_off_cost", lambda: 0.01)
+
+    compact = compile_graph({
+        "node_index": {0, 1, 2},
+        "connections": {0: [1], 1: [2], 2: []},
+        "weights": {0: [1.0], 1: [1.0], 2: []},
+    })
+    compact["lat"] = np.array([10.0, 11.0, 12.0])
+    buses_graph = [{
+        "name": "bus line 0",
+        "route": [0, 2],
+        "node_bus_index": {1000, 1002},
+        "connections": {1000: [1002], 1002: []},
+        "weights": {1000: [0.3], 1002: []},
+        "stops": [(0, 1000), (2, 1002)],
+    }]
+    merged = merge_bus_and_compact_graph(compact, buses_graph)
+    graph = compact_to_dict(merged)
+
+    assert graph["connections"][0] == [1, 1000]
+    assert graph["weights"][0] == [1.0, 3.3]
+    assert graph["connections"][1000] == [1002, 0]
+    assert graph["weights"][1000] == [0.3, 0.01]
+    assert graph["connections"][1002] == [2]
+    assert merged["lat"][to_dense(merged, [1002])[0]] == 12.0
+    assert merged["buses"] == buses_graph
+    assert merged["node_type"][to_dense(merged, 1000)[0]] == BUS_LINE_NODE
+    assert merged["node_type"][to_dense(merged, 2)[0]] == BUS_STOP_NODE
+
+
+def test_subgraph_keeps_the_edges_inside_the_mask():
+    graph = {
+        "node_index": {0, 1, 2, 7},
+        "connections": {0: [2, 1], 1: [2], 2: [0, 7], 7: [1]},
+        "weights": {0: [5.0, 1.0], 1: [2.0], 2: [3.0, 4.0], 7: [6.0]},
+    }
+    compact = compile_graph(graph)
+    compact["lat"] = np.array([10.0, 11.0, 12.0, 17.0])
+
+    sub, edge_ids = subgraph(compact, np.array([True, True, True, False]))
+
+    assert sub["node_ids"].tolist() == [0, 1, 2]
+    assert compact_to_dict(sub)["connections"] == {0: [2, 1], 1: [2], 2: [0]}
+    assert np.array_equal(sub["weights"], compact["weights"][edge_ids])
+    assert sub["lat"].tolist() == [10.0, 11.0, 12.0]
@@ -1,4 +1,5 @@
-from src.scripts.utils.route_finder import dijkstra
+from src.scripts.utils.compact_graph import compile_graph
+from src.scripts.utils.route_finder import dijkstra, dijkstra_compact
 
 
 def test_dijkstra_finds_path_on_linear_chain():
@@ -12,3 +13,16 @@ def test_dijkstra_finds_path_on_linear_chain():
     path = dijkstra(simple_graph, 0, 3)
     expected_path = [0, 1, 2, 3]
     assert path == expected_path
+
+
+def test_dijkstra_compact_matches_dict_dijkstra_with_sparse_ids():
+    """Dense Dijkstra over a compact graph works with sparse/string external ids."""
+    graph = {
+        "node_index": {10, 5_000_000_000, "stop:A", 7},
+        "connections": {10: [5_000_000_000, "stop:A"], 5_000_000_000: [7], "stop:A": [7], 7: []},
+        "weights": {10: [1.0, 0.2], 5_000_000_000: [1.0], "stop:A": [0.3], 7: []},
+    }
+    compact = compile_graph(graph)
+
+    assert dijkstra_compact(compact, 10, 7) == [10, "stop:A", 7]
+    assert dijkstra_compact(compact, 7, 10) is None
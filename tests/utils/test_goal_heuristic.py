@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from src.scripts.ant_colony_system.ant_colony_system import ACS
+from src.scripts.ant_max_min.ant_colony_MAXMIN import ACS_MAXMIN
+from src.scripts.utils.goal_heuristic import distances_to, goal_directed_eta
+from src.scripts.utils.node_index import to_dense
+from src.scripts.utils.route_finder import dijkstra_distances
+from src.scripts.utils.walk_kernels import prepare_walk_graph
+
+
+@pytest.fixture(scope="module")
+def city(make_bus_city):
+    return make_bus_city(6)
+
+
+def test_reverse_dijkstra_matches_forward_distances(city):
+    walk_graph = prepare_walk_graph(city, 1.0)
+    end = to_dense(walk_graph, 35)[0]
+
+    remaining = distances_to(walk_graph, end)
+
+    for node in (0, 7, int(walk_graph["node_ids"][-1]), 35):
+        forward = dijkstra_distances(walk_graph, node)
+        assert remaining[to_dense(walk_graph, node)[0]] == pytest.approx(forward[end])
+    assert distances_to(walk_graph, end) is remaining
+
+
+def test_goal_directed_eta_prefers_edges_towards_the_food():
+    line = {
+        "node_index": {0, 1, 2, 3},
+        "connections": {0: [1, 3], 1: [2], 2: [], 3: []},
+        "weights": {0: [1.0, 1.0], 1: [1.0], 2: [], 3: []},
+    }
+    walk_graph = prepare_walk_graph(line, 1.0)
+
+    eta = goal_directed_eta(walk_graph, to_dense(walk_graph, 2)[0], 1.0)
+
+    # 0 -> 1 is on the way (1 / (1 + 1)), 0 -> 3 is a dead end, 1 -> 2 arrives (1 / 1)
+    assert eta.tolist() == [0.5, 0.0, 1.0]
+
+
+@pytest.mark.parametrize("candidate_list_size", [None, 2])
+def test_colonies_run_goal_directed(city, candidate_list_size):
+    path, cost, _, _ = ACS(city, 0, 35, 10, 0.3, 0.1, 0.2, 0.5, 0.7, 0.4, 10, backend="python", seed=0,
+                           candidate_list_size=candidate_list_size, goal_directed=True)
+    assert path[0] == 0 and path[-1] == 35 and np.isfinite(cost)
+
+    path, cost, _, _ = ACS_MAXMIN(city, 0, 35, 10, 0.3, 0.2, 10, 0.5, 0.7, 0.4, backend="python", seed=0,
+                                  goal_directed=True)
+    assert path[0] == 0 and path[-1] == 35 and np.isfinite(cost)
@@ -1,4 +1,17 @@
-from src.scripts.utils.graph_visualizer import draw_graph
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import LineCollection
+
+from src.scripts.utils.compact_graph import build_compact_graph
+from src.scripts.utils.graph_visualizer import (
+    build_graph_from_dict,
+    compute_positions,
+    draw_graph,
+    draw_layout,
+    graph_fingerprint,
+    graph_layout,
+    node_style,
+)
 
 
 def test_draw_graph_saves_image(tmp_path):
@@ -14,3 +27,55 @@ def test_draw_graph_saves_image(tmp_path):
     draw_graph(small_graph, path=path_to_highlight, save_path=str(output_path))
 
     assert output_path.exists() and output_path.stat().st_size > 0
+
+
+def test_grid_layout_places_bus_nodes_by_stop_not_by_id():
+    """Bus line nodes are found through the graph's buses, whatever their ids."""
+    graph = {
+        "node_index": {0, 1, 2, 3, "L1-a", "L1-b"},
+        "connections": {0: [1, "L1-a"], 1: [3], 2: [3], 3: [], "L1-a": ["L1-b", 0], "L1-b": [3]},
+        "weights": {0: [1.0, 1.4], 1: [1.0], 2: [1.0], 3: [], "L1-a": [0.3, 0.01], "L1-b": [0.01]},
+        "buses": [{"stops": [(0, "L1-a"), (3, "L1-b")], "node_bus_index": {"L1-a", "L1-b"}}],
+    }
+    graph_nx = build_graph_from_dict(graph)
+    positions = compute_positions(graph, graph_nx)
+
+    assert positions[3] == (1, -1)
+    assert positions["L1-b"] == (1.25, -1)
+    colors, _ = node_style(graph_nx)
+    assert dict(zip(graph_nx.nodes, colors))["L1-a"] == "orange"
+
+
+def test_graph_layout_is_cached_per_fingerprint():
+    """The same structure reuses the layout; a new edge gets a new one."""
+    graph = {
+        "node_index": {0, 1, 2, 3},
+        "connections": {0: [1, 2], 1: [3], 2: [3], 3: []},
+        "weights": {0: [1.0, 1.0], 1: [1.0], 2: [1.0], 3: []},
+    }
+    layout = graph_layout(graph)
+
+    assert graph_layout({**graph, "weights": {0: [5.0, 5.0], 1: [5.0], 2: [5.0], 3: []}}) is layout
+    assert layout["xy"].tolist() == [[0.0, 0.0], [1.0, 0.0], [0.0, -1.0], [1.0, -1.0]]
+
+    graph["connections"][3] = [0]
+    graph["weights"][3] = [1.0]
+    assert graph_fingerprint(graph) != graph_fingerprint({**graph, "connections": {**graph["connections"], 3: []}})
+    assert graph_layout(graph) is not layout
+
+
+def test_draw_layout_uses_line_collections_for_edges_and_route():
+    """Compact graphs with coordinates are drawn from lon/lat with one collection per edge group."""
+    compact = build_compact_graph([10, 20, 30], [20, 30, 10], [1.0, 1.0, 1.0])
+    compact["lat"] = np.array([0.0, 1.0, 2.0])
+    compact["lon"] = np.array([5.0, 6.0, 7.0])
+    layout = graph_layout(compact)
+
+    fig, ax = plt.subplots()
+    draw_layout(ax, layout, path=[10, 20, 30])
+    collections = [c for c in ax.collections if isinstance(c, LineCollection)]
+    plt.close(fig)
+
+    assert layout["xy"].tolist() == [[5.0, 0.0], [6.0, 1.0], [7.0, 2.0]]
+    # Street edges, bus line edges and the route
+    assert [len(c.get_segments()) for c in collections] == [3, 0, 2]
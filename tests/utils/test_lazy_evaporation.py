@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from src.scripts.colony_engine.engine import best_route, run_colony
+from src.scripts.colony_engine.strategies import ACOStrategy, ACSStrategy, BestWorstStrategy, MaxMinStrategy
+from src.scripts.utils.lazy_evaporation import LazyPheromones
+
+
+def test_lazy_store_keeps_max_min_bounds_across_renormalizations():
+    rng = np.random.default_rng(2)
+    dense = np.full(300, 0.5)
+    lazy = LazyPheromones(300, 0.5)
+    for epoch in range(120):
+        deposited = rng.integers(0, 300, size=10)
+        dense *= 0.5
+        lazy *= 0.5
+        np.add.at(dense, deposited, 0.4)
+        lazy.add_at(deposited, 0.4)
+        np.clip(dense, 0.01, 1.0, out=dense)
+        lazy.clip(0.01, 1.0, deposited if epoch else None)
+        assert np.allclose(lazy[deposited], dense[deposited])
+        assert lazy.scale >= 1e-16
+
+    assert np.allclose(np.asarray(lazy), dense)
+    assert (lazy.min(), lazy.max(), lazy.mean()) == pytest.approx((dense.min(), dense.max(), dense.mean()))
+
+
+@pytest.mark.parametrize("make_strategy", [
+    lambda: ACOStrategy(0.3),
+    lambda: ACSStrategy(0.3, 0.1, 0.2, local_update_during_walk=True),
+    lambda: BestWorstStrategy(0.3, 0.1),
+    lambda: MaxMinStrategy(0.3, 0.2, 0.5, 3.0),
+])
+def test_lazy_colony_follows_the_dense_one(city, make_strategy):
+    results = []
+    for lazy in (False, True):
+        state = run_colony(city, 1, 60, make_strategy(), 15, 25, 0.5, 0.7, 0.4, backend="python", seed=4,
+                           lazy_evaporation=lazy)
+        results.append((best_route(state, mark_lost=False), state.epoch, np.asarray(state.pheromones)))
+    assert results[0][:2] == results[1][:2]
+    assert np.allclose(results[0][2], results[1][2])
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from src.scripts.ant_best_worst.ant_colony_best_worst import ABW
+from src.scripts.ant_colony_simple_ACO.ant_colony_optimization import ACO
+from src.scripts.ant_colony_system.ant_colony_system import ACS
+from src.scripts.ant_max_min.ant_colony_MAXMIN import ACS_MAXMIN
+from src.scripts.benchmarks.benchmark_suite import path_cost
+from src.scripts.utils.compact_graph import compile_graph
+from src.scripts.utils.local_search import LocalSearch, improve_route, remove_loops
+from src.scripts.utils.node_index import to_dense, to_external
+from src.scripts.utils.route_finder import dijkstra
+from src.scripts.utils.toy_city_generators import generate_square_city_graph
+
+
+def _route(compact, nodes):
+    """Dense nodes and edge ids of a route given in external ids."""
+    dense = to_dense(compact, nodes)
+    edges = []
+    for a, b in zip(dense[:-1], dense[1:]):
+        row = slice(compact["indptr"][a], compact["indptr"][a + 1])
+        edges.append(compact["indptr"][a] + np.flatnonzero(compact["indices"][row] == b)[0])
+    return dense, np.array(edges, dtype=np.int64)
+
+
+def test_remove_loops_jumps_to_the_last_visit():
+    nodes = np.array([0, 1, 2, 1, 3, 4, 3, 5], dtype=np.int32)
+    edges = np.arange(7, dtype=np.int64) * 10
+
+    kept_nodes, kept_edges = remove_loops(nodes, edges)
+
+    assert kept_nodes.tolist() == [0, 1, 3, 5]
+    assert kept_edges.tolist() == [0, 30, 60]
+
+
+def test_improve_route_splices_shortest_sub_paths():
+    compact = compile_graph(generate_square_city_graph(4, 1))
+    # Zig-zag from 0 to 3 through the second row
+    nodes, edges = _route(compact, [0, 4, 5, 1, 2, 6, 7, 3])
+
+    new_nodes, new_edges, cost = improve_route(compact, nodes, edges)
+
+    assert to_external(compact, new_nodes) == [0, 1, 2, 3]
+    assert cost == 3.0
+    assert compact["indices"][new_edges].tolist() == new_nodes[1:].tolist()
+
+
+def test_cost_budget_bounds_the_shortcuts():
+    compact = compile_graph(generate_square_city_graph(4, 1))
+    # Detour 0 -> 4 -> 8 -> 9 -> 10 -> 6 -> 2 -> 3 (cost 7, optimal 3)
+    nodes, edges = _route(compact, [0, 4, 8, 9, 10, 6, 2, 3])
+
+    _, _, limited = improve_route(compact, nodes, edges, cost_budget=1.0)
+    _, _, unlimited = improve_route(compact, nodes, edges)
+
+    assert limited == 7.0
+    assert unlimited == 3.0
+
+
+@pytest.mark.parametrize("colony", [
+    lambda city, ls: ACO(city, 1, 60, 10, 0.3, 0.5, 0.7, 0.4, 10, backend="python", seed=0, local_search=ls),
+    lambda city, ls: ACS(city, 1, 60, 10, 0.3, 0.1, 0.2, 0.5, 0.7, 0.4, 10, backend="python", seed=0, local_search=ls),
+    lambda city, ls: ABW(city, 1, 60, 10, 0.3, 10, 0.5, 0.7, 0.4, backend="python", seed=0, local_search=ls),
+    lambda city, ls: ACS_MAXMIN(city, 1, 60, 10, 0.3, 0.2, 10, 0.5, 0.7, 0.4, backend="python", seed=0, local_search=ls),
+])
+def test_every_colony_reaches_dijkstra_with_local_search(colony, city):
+    path, cost, _, _ = colony(city, LocalSearch(top_k=2))
+
+    assert cost == pytest.approx(path_cost(city, dijkstra(city, 1, 60)))
+    assert path_cost(city, path) == pytest.approx(cost)
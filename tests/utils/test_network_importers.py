@@ -0,0 +1,111 @@
+from math import isclose
+
+from src.scripts.utils.compact_graph import compact_to_dict
+from src.scripts.utils.network_importers import load_city, load_osm_street_network
+from src.scripts.utils.weights import haversine
+
+OSM_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<osm version="0.6">
+  <node id="10" lat="0.000" lon="0.000"/>
+  <node id="20" lat="0.000" lon="0.010"/>
+  <node id="30" lat="0.000" lon="0.020"/>
+  <node id="40" lat="0.010" lon="0.020"/>
+  <node id="99" lat="1.000" lon="1.000"/>
+  <way id="1">
+    <nd ref="10"/><nd ref="20"/><nd ref="30"/>
+    <tag k="highway" v="residential"/>
+  </way>
+  <way id="2">
+    <nd ref="30"/><nd ref="40"/>
+    <tag k="highway" v="primary"/>
+    <tag k="oneway" v="yes"/>
+  </way>
+  <way id="3">
+    <nd ref="10"/><nd ref="99"/>
+    <tag k="waterway" v="river"/>
+  </way>
+</osm>
+"""
+
+
+def _write_gtfs(directory, stop_times=None, routes=None):
+    files = {
+        "stops.txt": "stop_id,stop_name,stop_lat,stop_lon\nA,a,0.0001,0.0\nB,b,0.0,0.0201\n",
+        "routes.txt": "route_id,route_short_name,route_type\nR1,101,3\n",
+        "trips.txt": "route_id,service_id,trip_id,direction_id\nR1,WK,T1,0\nR1,WK,T2,0\nR1,WK,T3,1\n",
+        "stop_times.txt": (
+            "trip_id,arrival_time,departure_time,stop_id,stop_sequence\n"
+            "T1,08:00:00,08:00:00,B,2\n"
+            "T1,07:50:00,07:50:00,A,1\n"
+            "T2,09:00:00,09:00:00,A,1\n"
+            "T3,08:10:00,08:10:00,B,1\n"
+            "T3,08:20:00,08:20:00,A,2\n"
+        ),
+    }
+    if stop_times is not None:
+        files["stop_times.txt"] = "trip_id,arrival_time,departure_time,stop_id,stop_sequence\n" + stop_times
+    if routes is not None:
+        files["routes.txt"] = routes
+    for name, content in files.items():
+        (directory / name).write_text(content)
+
+
+def test_load_osm_street_network_streams_highways(tmp_path):
+    """Only highway ways are loaded; oneway ways get a single direction."""
+    osm_path = tmp_path / "city.osm"
+    osm_path.write_text(OSM_XML)
+
+    graph = compact_to_dict(load_osm_street_network(str(osm_path)))
+
+    assert graph["node_index"] == {10, 20, 30, 40}
+    assert sorted(graph["connections"][20]) == [10, 30]
+    assert sorted(graph["connections"][30]) == [20, 40]
+    assert 30 not in graph["connections"][40]
+    weight = graph["weights"][10][graph["connections"][10].index(20)]
+    assert isclose(weight, haversine(0.0, 0.0, 0.0, 0.01), rel_tol=1e-9)
+
+
+def test_load_city_maps_gtfs_route_to_bus_line(tmp_path):
+    """GTFS stops are snapped to street nodes and merged as a bus line."""
+    osm_path = tmp_path / "city.osm"
+    osm_path.write_text(OSM_XML)
+    _write_gtfs(tmp_path)
+
+    compact = load_city(str(osm_path), gtfs_dir=str(tmp_path))
+    bus_line = compact["buses"][0]
+
+    assert bus_line["name"] == "101"
+    assert bus_line["route"] == [10, 30]
+    bus_start, bus_end = bus_line["stops"][0][1], bus_line["stops"][1][1]
+    assert bus_start >= 100000
+
+    graph = compact_to_dict(compact)
+    assert bus_start in graph["connections"][10]
+    assert graph["connections"][bus_start] == [bus_end, 10]
+    assert graph["connections"][bus_end] == [30]
+
+
+def test_load_city_skips_gtfs_stops_missing_from_stops_file(tmp_path):
+    """Stop times of unknown stops are dropped, and so are trips left with one stop."""
+    osm_path = tmp_path / "city.osm"
+    osm_path.write_text(OSM_XML)
+    _write_gtfs(tmp_path, "T1,07:50:00,07:50:00,A,1\nT1,07:55:00,07:55:00,AB,2\n"
+                          "T1,08:00:00,08:00:00,B,3\nT1,08:05:00,08:05:00,Z,4\n")
+
+    bus_line = load_city(str(osm_path), gtfs_dir=str(tmp_path))["buses"][0]
+    assert bus_line["route"] == [10, 30]
+
+    _write_gtfs(tmp_path, "T1,07:50:00,07:50:00,A,1\nT1,08:00:00,08:00:00,Z,2\n")
+    assert load_city(str(osm_path), gtfs_dir=str(tmp_path))["buses"] == []
+
+
+def test_load_city_keeps_one_line_per_route_direction(tmp_path):
+    """Both directions of a route become one-way lines named after the route."""
+    osm_path = tmp_path / "city.osm"
+    osm_path.write_text(OSM_XML)
+    _write_gtfs(tmp_path, routes="route_id,route_long_name,route_type\nR1,Harbour Loop,3\n")
+
+    bus_lines = load_city(str(osm_path), gtfs_dir=str(tmp_path))["buses"]
+
+    assert [bus_line["route"] for bus_line in bus_lines] == [[10, 30], [30, 10]]
+    assert [bus_line["name"] for bus_line in bus_lines] == ["Harbour Loop", "Harbour Loop"]
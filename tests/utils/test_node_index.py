@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from src.scripts.utils.node_index import (
+    BUS_LINE_NODE,
+    BUS_STOP_NODE,
+    STREET_NODE,
+    classify_nodes,
+    factorize_ids,
+    to_dense,
+    to_external,
+)
+
+
+def test_factorize_large_integer_ids_to_dense_int32():
+    """Sparse 64-bit ids (e.g. OSM) become dense, sorted int32 indices."""
+    node_ids, codes = factorize_ids([9_000_000_001, 42, 9_000_000_001, 7])
+
+    assert node_ids.tolist() == [7, 42, 9_000_000_001]
+    assert codes.dtype == np.int32
+    assert codes.tolist() == [2, 1, 2, 0]
+
+
+def test_to_dense_and_back_with_string_ids():
+    """Non-integer ids keep first-seen order and round-trip through dense indices."""
+    node_ids, _ = factorize_ids(["stop:B", 3, "stop:A"])
+    graph = {"node_ids": node_ids}
+
+    dense = to_dense(graph, ["stop:A", 3])
+    assert dense.tolist() == [2, 1]
+    assert to_external(graph, dense) == ["stop:A", 3]
+    with pytest.raises(KeyError):
+        to_dense(graph, "missing")
+
+
+def test_classify_nodes_uses_bus_lines_not_id_ranges():
+    """Node types come from the bus lines, not from an id offset."""
+    buses = [{"stops": [(1, 5), (2, 6)], "node_bus_index": {5, 6}}]
+    types = classify_nodes(np.array([1, 2, 3, 5, 6]), buses)
+
+    assert types.tolist() == [BUS_STOP_NODE, BUS_STOP_NODE, STREET_NODE, BUS_LINE_NODE, BUS_LINE_NODE]
@@ -0,0 +1,48 @@
+import copy
+
+import numpy as np
+import pytest
+
+from src.scripts.ant_colony_system.ant_colony_system import ACS
+from src.scripts.utils.generators import merge_bus_and_map_graph
+from src.scripts.utils.pheromone_animation import export_heatmap_frames, export_heatmap_video
+from src.scripts.utils.telemetry import PheromoneSnapshots
+from src.scripts.utils.toy_city_generators import generate_bus_line_square_city, generate_square_city_graph
+
+
+@pytest.fixture(scope="module")
+def recorded_run():
+    city = merge_bus_and_map_graph(copy.deepcopy(generate_square_city_graph(6, 1)), generate_bus_line_square_city(6, 1))
+    snapshots = PheromoneSnapshots(every=3)
+    _, _, _, epochs = ACS(city, 1, 30, 6, 0.3, 0.1, 0.2, 0.5, 0.7, 0.4, 7, backend="python", seed=1, observer=snapshots)
+    return city, snapshots, epochs
+
+
+def test_snapshots_are_subsampled_float16_edge_arrays(recorded_run):
+    _, snapshots, epochs = recorded_run
+
+    expected = [epoch for epoch in range(epochs) if epoch % 3 == 0]
+    if (epochs - 1) % 3:
+        expected.append(epochs - 1)
+    assert snapshots.epochs == expected
+    assert len(snapshots.records) == epochs
+    assert snapshots.stacked().dtype == np.float16
+    assert snapshots.stacked().shape == (len(expected), snapshots.graph["indices"].size)
+
+
+def test_export_heatmap_frames_writes_one_png_per_snapshot(recorded_run, tmp_path):
+    city, snapshots, _ = recorded_run
+
+    paths = export_heatmap_frames(snapshots, city, str(tmp_path / "frames"), log_scale=True)
+
+    assert len(paths) == len(snapshots.epochs)
+    assert all((tmp_path / "frames" / p.split("/")[-1]).stat().st_size > 0 for p in paths)
+
+
+def test_export_heatmap_video_as_gif(recorded_run, tmp_path):
+    city, snapshots, _ = recorded_run
+    output = tmp_path / "pheromones.gif"
+
+    export_heatmap_video(snapshots, city, str(output), fps=2, figsize=(3, 3), dpi=40)
+
+    assert output.stat().st_size > 0
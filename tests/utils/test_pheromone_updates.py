@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from src.scripts.ant_colony_system.ant_colony_system import ACS
+from src.scripts.utils.node_index import to_dense
+from src.scripts.utils.pheromone_updates import affine_scatter
+from src.scripts.utils.route_buffer import RouteBuffer
+from src.scripts.utils.toy_city_generators import generate_square_city_graph
+from src.scripts.utils.walk_kernels import prepare_walk_graph, walk_ants
+
+
+def _sequential(tau, edges, kinds, shifts, scales):
+    tau = tau.copy()
+    for edge, kind, shift in zip(edges, kinds, shifts):
+        tau[edge] = scales[kind] * tau[edge] + shift
+    return tau
+
+
+@pytest.mark.parametrize("scales", [(0.9, 0.7), (0.0, 0.5), (1.0, 0.0)])
+def test_affine_scatter_matches_sequential_updates(scales):
+    rng = np.random.default_rng(3)
+    tau = rng.random(12)
+    # Repeated edges, interleaved kinds
+    edges = rng.integers(0, 12, size=60)
+    kinds = rng.integers(0, 2, size=60)
+    shifts = rng.random(60)
+
+    expected = _sequential(tau, edges, kinds, shifts, scales)
+    result = affine_scatter(tau.copy(), edges, kinds, shifts, scales)
+
+    np.testing.assert_allclose(result, expected, rtol=1e-12, atol=1e-15)
+
+
+def test_affine_scatter_leaves_untouched_edges():
+    tau = np.arange(5, dtype=float)
+
+    affine_scatter(tau, np.array([3, 3]), np.array([0, 0]), np.array([1.0, 2.0]), (0.5,))
+
+    assert tau.tolist() == [0.0, 1.0, 2.0, (3.0 * 0.5 + 1.0) * 0.5 + 2.0, 4.0]
+    assert affine_scatter(tau, np.array([], dtype=np.int64), [], [], (0.5,)) is tau
+
+
+def test_local_update_during_walk_decays_walked_edges_towards_tau0():
+    walk_graph = prepare_walk_graph(generate_square_city_graph(4, 1), 1.0)
+    start, end = to_dense(walk_graph, [0, 15])
+    tau = np.full(walk_graph["indices"].size, 1.0)
+
+    routes = walk_ants(walk_graph, tau, start, end, RouteBuffer(5), 1.0, backend="python",
+                       rngs=[np.random.default_rng(ant) for ant in range(5)], local_rho=0.5, local_tau0=0.2)
+
+    walked = np.zeros(tau.size, dtype=bool)
+    for ant in range(5):
+        walked[routes.edge_path(ant)] = True
+    assert np.all(tau[~walked] == 1.0)
+    # Every walk halves the distance to tau0
+    assert np.all((tau[walked] >= 0.2) & (tau[walked] <= 0.6))
+
+
+def test_acs_runs_with_local_update_during_walk(city):
+    path, cost, _, epochs = ACS(city, 1, 60, 10, 0.3, 0.1, 0.2, 0.5, 0.7, 0.4, 15, backend="python", seed=5,
+                                local_update_during_walk=True)
+
+    assert path[0] == 1 and path[-1] == 60
+    assert np.isfinite(cost)
+    assert 1 <= epochs <= 15
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from src.scripts.ant_best_worst.ant_colony_best_worst import ABW
+from src.scripts.ant_colony_simple_ACO.ant_colony_optimization import ACO
+from src.scripts.ant_colony_system.ant_colony_system import ACS
+from src.scripts.ant_max_min.ant_colony_MAXMIN import ACS_MAXMIN
+from src.scripts.utils.node_index import to_dense
+from src.scripts.utils.random_streams import colony_streams, seed_sequence, spawn_seeds
+from src.scripts.utils.roulette_selection import roulette_wheel_selection
+from src.scripts.utils.walk_kernels import prepare_walk_graph, run_ant_walks
+
+COLONIES = {
+    "ACO": lambda city, seed: ACO(city, 1, 60, 10, 0.3, 0.5, 0.7, 0.4, 20, backend="python", seed=seed),
+    "ACS": lambda city, seed: ACS(city, 1, 60, 10, 0.3, 0.1, 0.2, 0.5, 0.7, 0.4, 20, backend="python", seed=seed),
+    "ABW": lambda city, seed: ABW(city, 1, 60, 10, 0.3, 20, 0.5, 0.7, 0.4, backend="python", seed=seed),
+    "ACS_MAXMIN": lambda city, seed: ACS_MAXMIN(city, 1, 60, 10, 0.3, 0.2, 20, 0.5, 0.7, 0.4, backend="python", seed=seed),
+}
+
+
+def test_seed_sequence_accepts_every_seed_kind():
+    assert seed_sequence(5).entropy == 5
+    sequence = np.random.SeedSequence(9)
+    assert seed_sequence(sequence) is sequence
+    derived = [seed_sequence(np.random.default_rng(3)).generate_state(2) for _ in range(2)]
+    assert np.array_equal(derived[0], derived[1])
+
+
+def test_colony_streams_are_independent_and_repeatable():
+    colony_rng, ant_rngs = colony_streams(11, 4)
+    again_colony, again_ants = colony_streams(11, 4)
+    draws = [rng.random() for rng in ant_rngs]
+
+    assert len(set(draws)) == 4
+    assert draws == [rng.random() for rng in again_ants]
+    assert colony_rng.random() == again_colony.random()
+    assert colony_streams(None, 4) == (None, None)
+    assert len(spawn_seeds(11, 3)) == 3
+
+
+def test_roulette_wheel_selection_with_generator_is_repeatable():
+    probabilities = [0.1, 0.2, 0.3, 0.4]
+    first = [roulette_wheel_selection(probabilities, np.random.default_rng(2)) for _ in range(5)]
+    second = [roulette_wheel_selection(probabilities, np.random.default_rng(2)) for _ in range(5)]
+    assert first == second
+    assert all(1 <= winner <= 4 for winner in first)
+
+
+def test_ant_walks_do_not_depend_on_how_ants_are_split(city):
+    """Walking the ants in two batches gives the same paths as one batch."""
+    walk_graph = prepare_walk_graph(city, 0.4)
+    start, end = to_dense(walk_graph, [1, 60])
+    tau = np.full(walk_graph["indices"].size, 0.5)
+
+    _, rngs = colony_streams(21, 6)
+    together, _, costs, _ = run_ant_walks(walk_graph, tau, start, end, 6, 0.7, q0=0.2, backend="python", rngs=rngs)
+
+    _, rngs = colony_streams(21, 6)
+    first, _, first_costs, _ = run_ant_walks(walk_graph, tau, start, end, 4, 0.7, q0=0.2, backend="python", rngs=rngs[:4])
+    second, _, second_costs, _ = run_ant_walks(walk_graph, tau, start, end, 2, 0.7, q0=0.2, backend="python", rngs=rngs[4:])
+
+    assert all(np.array_equal(a, b) for a, b in zip(together, first + second))
+    assert np.array_equal(costs, np.concatenate([first_costs, second_costs]))
+
+
+@pytest.mark.parametrize("variant", sorted(COLONIES))
+def test_seeded_colonies_are_reproducible_and_leave_global_state_alone(city, variant):
+    np.random.seed(0)
+    expected_global = np.random.random()
+
+    np.random.seed(0)
+    first = COLONIES[variant](city, 123)
+    assert np.random.random() == expected_global
+    second = COLONIES[variant](city, np.random.SeedSequence(123))
+
+    assert first[0] == second[0]
+    assert first[1] == second[1]
+    assert first[3] == second[3]
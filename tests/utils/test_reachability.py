@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from src.scripts.colony_engine.engine import run_colony
+from src.scripts.colony_engine.strategies import ACOStrategy
+from src.scripts.utils.node_index import to_dense
+from src.scripts.utils.reachability import can_reach
+from src.scripts.utils.route_buffer import RouteBuffer
+from src.scripts.utils.walk_kernels import WALK_LOST, _pocket_is_open, prepare_walk_graph, walk_ants
+
+# 0 -> 1 -> 2 -> 3 is the way to the food; 1 -> 4 -> 5 is a one-way dead end
+# and 2 -> 6 <-> 7 a pocket that can only go back to 2
+POCKETS = {
+    "node_index": set(range(8)),
+    "connections": {0: [1], 1: [4, 2], 2: [6, 3], 3: [], 4: [5], 5: [], 6: [7, 2], 7: [6]},
+    "weights": {0: [1.0], 1: [1.0, 1.0], 2: [1.0, 1.0], 3: [], 4: [1.0], 5: [], 6: [1.0, 1.0], 7: [1.0]},
+}
+
+
+def test_can_reach_follows_edges_backwards():
+    walk_graph = prepare_walk_graph(POCKETS, 1.0)
+    end = to_dense(walk_graph, 3)[0]
+
+    reached = can_reach(walk_graph, end)
+
+    assert walk_graph["node_ids"][reached].tolist() == [0, 1, 2, 3, 6, 7]
+
+
+def test_blocked_nodes_are_never_entered():
+    walk_graph = prepare_walk_graph(POCKETS, 1.0)
+    start, end = to_dense(walk_graph, [0, 3])
+    tau = np.ones(walk_graph["indices"].size)
+    blocked = np.flatnonzero(~can_reach(walk_graph, end))
+
+    routes = walk_ants(walk_graph, tau, start, end, RouteBuffer(20), 1.0, backend="python",
+                       rngs=[np.random.default_rng(ant) for ant in range(20)], blocked=blocked)
+
+    assert not np.any(np.isin(routes.nodes, blocked))
+    # The mask is cleared once the epoch is walked
+    assert not routes.scratch(8)[0].any()
+
+
+def test_pocket_check_restores_the_visited_mask():
+    walk_graph = prepare_walk_graph(POCKETS, 1.0)
+    visited = np.zeros(8, dtype=np.uint8)
+    visited[to_dense(walk_graph, [0, 1, 2])] = 1
+    queue = np.empty(6, dtype=np.int32)
+    six, three = to_dense(walk_graph, [6, 3])
+
+    assert not _pocket_is_open(walk_graph["indptr"], walk_graph["indices"], visited, six, three, 4, queue)
+    assert _pocket_is_open(walk_graph["indptr"], walk_graph["indices"], visited, six, three, 1, queue)
+    assert visited.tolist() == [1, 1, 1, 0, 0, 0, 0, 0]
+
+
+def test_lookahead_keeps_ants_out_of_pockets():
+    state = run_colony(POCKETS, 0, 3, ACOStrategy(0.1), 20, 3, 0.5, 1.0, 1.0, backend="python", seed=0,
+                       dead_end_pruning="lookahead")
+
+    assert not np.any(state.status == WALK_LOST)
+    assert np.all(state.distances == 3.0)
+
+
+def test_unknown_pruning_mode_is_rejected():
+    with pytest.raises(ValueError):
+        run_colony(POCKETS, 0, 3, ACOStrategy(0.1), 2, 1, 0.5, 1.0, 1.0, backend="python", dead_end_pruning="bfs")
@@ -0,0 +1,64 @@
+import numpy as np
+
+from src.scripts.utils.route_buffer import RouteBuffer
+from src.scripts.utils.walk_kernels import WALK_LOST, WALK_OK
+
+
+def _buffer(routes, capacity=4):
+    """Fill a buffer with (nodes, cost) pairs; edge ids are the node ids times ten."""
+    buffer = RouteBuffer(len(routes), capacity=capacity)
+    for ant, (nodes, cost) in enumerate(routes):
+        nodes = np.asarray(nodes, dtype=np.int32)
+        status = WALK_OK if np.isfinite(cost) else WALK_LOST
+        buffer.store(ant, nodes, nodes[1:].astype(np.int64) * 10, cost, status)
+    buffer.update_hashes()
+    return buffer
+
+
+def test_store_grows_and_pads_routes():
+    buffer = _buffer([([0, 1, 2, 3, 4, 5], 5.0), ([0, 2], 1.0)], capacity=3)
+
+    assert buffer.capacity >= 6
+    assert buffer.nodes.dtype == np.int32
+    assert buffer.path(0).tolist() == [0, 1, 2, 3, 4, 5]
+    assert buffer.edge_path(1).tolist() == [20]
+
+    # A shorter route overwrites a longer one and re-pads the row
+    buffer.store(0, np.array([0, 3], dtype=np.int32), np.array([30]), 2.0, WALK_OK)
+    assert buffer.nodes[0].tolist()[:4] == [0, 3, -1, -1]
+    assert buffer.edges[0].tolist()[:3] == [30, -1, -1]
+
+
+def test_identical_routes_share_a_hash():
+    buffer = _buffer([([0, 1, 2], 2.0), ([0, 2], 1.0), ([0, 1, 2], 2.0), ([0, 2, 1], 2.0)])
+
+    assert buffer.hashes[0] == buffer.hashes[2]
+    assert len({buffer.hashes[0], buffer.hashes[1], buffer.hashes[3]}) == 3
+
+
+def test_unique_routes_counts_multiplicity_of_arrived_ants():
+    buffer = _buffer([([0, 2], 1.0), ([0, 1, 2], 2.0), ([0, 1], np.inf), ([0, 2], 1.0), ([0, 2], 1.0)])
+    representatives, multiplicity = buffer.unique_routes()
+
+    assert representatives.tolist() == [0, 1]
+    assert multiplicity.tolist() == [3, 1]
+
+
+def test_unique_routes_survive_hash_collisions():
+    buffer = _buffer([([0, 2], 1.0), ([0, 1, 2], 2.0), ([0, 2], 1.0)])
+    buffer.hashes[:] = 7  # force every route into the same hash bucket
+
+    representatives, multiplicity = buffer.unique_routes()
+    assert representatives.tolist() == [0, 1]
+    assert multiplicity.tolist() == [2, 1]
+
+
+def test_edge_amounts_match_add_at_with_repeated_edges():
+    buffer = _buffer([([0, 1, 0, 1], 3.0), ([0, 1, 2], 2.0)])
+    amounts = np.array([0.5, 2.0])
+
+    expected = np.zeros(30)
+    for ant, amount in enumerate(amounts):
+        np.add.at(expected, buffer.edge_path(ant), amount)
+
+    assert np.allclose(buffer.edge_amounts(np.array([0, 1]), amounts, 30), expected)
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from src.scripts.colony_engine.engine import best_route, run_colony
+from src.scripts.colony_engine.strategies import ACOStrategy, MaxMinStrategy
+from src.scripts.utils.node_index import to_dense
+from src.scripts.utils.route_buffer import RouteBuffer
+from src.scripts.utils.sparse_pheromones import SparsePheromones
+from src.scripts.utils.walk_kernels import prepare_walk_graph, walk_ants
+
+
+def test_sparse_store_matches_dense_operations():
+    rng = np.random.default_rng(5)
+    dense = np.full(500, 0.5)
+    sparse = SparsePheromones(500, 0.5, capacity=8)
+    for _ in range(40):
+        edges = rng.integers(0, 500, size=20)
+        dense *= 0.9
+        sparse *= 0.9
+        np.add.at(dense, edges, 0.25)
+        sparse.add_at(edges, 0.25)
+        dense[edges[:3]] = 2.0
+        sparse[edges[:3]] = 2.0
+        np.clip(dense, 0.1, 1.5, out=dense)
+        sparse.clip(0.1, 1.5)
+        assert np.allclose(sparse[edges], dense[edges])
+
+    assert np.allclose(np.asarray(sparse), dense)
+    assert sparse.mean() == pytest.approx(dense.mean())
+    assert (sparse.min(), sparse.max()) == pytest.approx((dense.min(), dense.max()))
+    assert isinstance(sparse[7], np.floating)
+
+    sparse.fill(0.5)
+    assert sparse.touched_count == 0 and np.all(sparse[np.arange(500)] == 0.5)
+
+
+def test_sparse_store_memory_follows_touched_edges():
+    sparse = SparsePheromones(10_000_000, 1.0)
+    for _ in range(100):
+        sparse *= 0.95
+        sparse.add_at(np.arange(1000, 1200), 0.1)
+    assert sparse.touched_count == 200
+    assert sparse.nbytes < 10_000_000 * 8 / 1000
+    assert sparse[5] == pytest.approx(0.95 ** 100)
+
+
+def test_sparse_colony_follows_the_dense_one(city):
+    results = []
+    for sparse in (False, True):
+        for strategy in (ACOStrategy(0.3), MaxMinStrategy(0.3, 0.2, 0.5, 3.0)):
+            state = run_colony(city, 1, 60, strategy, 15, 20, 0.5, 0.7, 0.4, backend="python", seed=3,
+                               sparse_pheromones=sparse)
+            results.append(best_route(state, mark_lost=False))
+            if sparse:
+                assert state.pheromones.touched_count < state.pheromones.size
+    assert results[:2] == results[2:]
+
+
+def test_sparse_trails_need_the_python_kernel(city):
+    walk_graph = prepare_walk_graph(city, 0.4)
+    start, end = to_dense(walk_graph, [1, 60])
+    tau = SparsePheromones(walk_graph["indices"].size, 0.5)
+    with pytest.raises(ValueError):
+        walk_ants(walk_graph, tau, start, end, RouteBuffer(2), 0.7, backend="numba")
@@ -0,0 +1,104 @@
+import csv
+import json
+
+import numpy as np
+import pytest
+
+from src.scripts.ant_best_worst.ant_colony_best_worst import ABW
+from src.scripts.ant_colony_simple_ACO.ant_colony_optimization import ACO
+from src.scripts.ant_colony_system.ant_colony_system import ACS
+from src.scripts.ant_max_min.ant_colony_MAXMIN import ACS_MAXMIN
+from src.scripts.utils.sparse_pheromones import SparsePheromones
+from src.scripts.utils.telemetry import (PhaseTimer, PheromoneSnapshots, TelemetryRecorder, epoch_record,
+                                         pheromone_entropy)
+from src.scripts.utils.walk_kernels import WALK_CUT, WALK_LOST, WALK_OK
+
+COLONIES = {
+    "ACO": (lambda city, **kw: ACO(city, 1, 60, 8, 0.3, 0.5, 0.7, 0.4, 6, backend="python", seed=1, **kw), "deposit"),
+    "ACS": (lambda city, **kw: ACS(city, 1, 60, 8, 0.3, 0.1, 0.2, 0.5, 0.7, 0.4, 6, backend="python", seed=1, **kw), "deposit"),
+    "ABW": (lambda city, **kw: ABW(city, 1, 60, 8, 0.3, 6, 0.5, 0.7, 0.4, backend="python", seed=1, **kw), "mutation"),
+    "ACS_MAXMIN": (lambda city, **kw: ACS_MAXMIN(city, 1, 60, 8, 0.3, 0.2, 6, 0.5, 0.7, 0.4, backend="python", seed=1, **kw), "clamp"),
+}
+
+
+def test_pheromone_entropy_bounds():
+    assert pheromone_entropy(np.ones(10)) == pytest.approx(1.0)
+    assert pheromone_entropy(np.array([1.0, 0.0, 0.0])) == pytest.approx(0.0)
+    assert pheromone_entropy(np.zeros(3)) == 0.0
+
+
+def test_disabled_phase_timer_records_nothing():
+    timer = PhaseTimer(enabled=False)
+    timer.start()
+    timer.lap("walk")
+    assert timer.timings == {}
+
+
+def test_epoch_record_statistics():
+    costs = np.array([3.0, np.inf, 5.0, np.inf])
+    lengths = np.array([4, 2, 6, 9])
+    status = np.array([WALK_OK, WALK_LOST, WALK_OK, WALK_CUT], dtype=np.int8)
+    record = epoch_record(2, costs, lengths, status, np.array([0.1, 0.5]), {"walk": 0.25}, restart=False)
+
+    assert record["epoch"] == 2
+    assert record["time_walk"] == 0.25
+    assert (record["best_cost"], record["mean_cost"], record["worst_cost"]) == (3.0, 4.0, 5.0)
+    assert (record["lost_ants"], record["cut_ants"]) == (1, 1)
+    assert (record["path_length_min"], record["path_length_max"]) == (2.0, 9.0)
+    assert (record["pheromone_min"], record["pheromone_max"]) == (0.1, 0.5)
+    assert record["restart"] is False
+
+
+@pytest.mark.parametrize("variant", sorted(COLONIES))
+def test_colonies_report_every_epoch_without_changing_results(city, variant):
+    run, specific_phase = COLONIES[variant]
+    recorder = TelemetryRecorder()
+
+    observed = run(city, observer=recorder)
+    plain = run(city)
+
+    assert observed[0] == plain[0] and observed[1] == plain[1] and observed[3] == plain[3]
+    assert [record["epoch"] for record in recorder.records] == list(range(observed[3]))
+    for record in recorder.records:
+        for phase in ("walk", "evaporation", "convergence", specific_phase):
+            assert record[f"time_{phase}"] >= 0
+        assert record["lost_ants"] + record["cut_ants"] <= 8
+        if record["best_cost"] is not None:
+            assert 1 <= record["distinct_routes"] <= 8 - record["lost_ants"] - record["cut_ants"]
+            assert record["best_route_ants"] >= 1
+
+
+def test_sparse_runs_are_recorded_without_dense_trails(city, monkeypatch):
+    run = COLONIES["ACO"][0]
+    dense, dense_snapshots = TelemetryRecorder(), PheromoneSnapshots(every=4)
+    run(city, observer=dense)
+    run(city, observer=dense_snapshots)
+
+    def materialized(*args, **kwargs):
+        raise AssertionError("the sparse store was materialized")
+
+    monkeypatch.setattr(SparsePheromones, "__array__", materialized)
+    sparse, sparse_snapshots = TelemetryRecorder(), PheromoneSnapshots(every=4)
+    run(city, observer=sparse, sparse_pheromones=True)
+    run(city, observer=sparse_snapshots, sparse_pheromones=True)
+
+    assert len(sparse.records) == len(dense.records)
+    for expected, record in zip(dense.records, sparse.records):
+        for key in ("pheromone_min", "pheromone_max", "pheromone_entropy"):
+            assert record[key] == pytest.approx(expected[key])
+    assert sparse_snapshots.epochs == dense_snapshots.epochs
+    assert np.allclose(sparse_snapshots.stacked(), dense_snapshots.stacked(), rtol=1e-3)
+
+
+def test_recorder_exports_csv_and_json(tmp_path):
+    recorder = TelemetryRecorder()
+    recorder({"epoch": 0, "best_cost": 1.0})
+    recorder({"epoch": 1, "best_cost": 0.5, "restart": True})
+
+    recorder.to_csv(tmp_path / "telemetry.csv")
+    recorder.to_json(tmp_path / "telemetry.json")
+
+    with open(tmp_path / "telemetry.csv", newline="") as handle:
+        rows = list(csv.DictReader(handle))
+    assert rows[0] == {"epoch": "0", "best_cost": "1.0", "restart": ""}
+    assert json.loads((tmp_path / "telemetry.json").read_text())[1]["restart"] is True
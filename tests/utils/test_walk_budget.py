@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from src.scripts.colony_engine.engine import run_colony
+from src.scripts.colony_engine.strategies import ACOStrategy, MaxMinStrategy
+from src.scripts.utils.goal_heuristic import distances_to
+from src.scripts.utils.node_index import to_dense
+from src.scripts.utils.route_buffer import RouteBuffer
+from src.scripts.utils.toy_city_generators import generate_square_city_graph
+from src.scripts.utils.walk_kernels import WALK_CUT, WALK_OK, prepare_walk_graph, walk_ants
+
+CITY = generate_square_city_graph(8, 1)
+
+
+def _walk(walk_graph, start, end, n_ants=40, **options):
+    tau = np.ones(walk_graph["indices"].size)
+    return walk_ants(walk_graph, tau, start, end, RouteBuffer(n_ants), 1.0, backend="python",
+                     rngs=[np.random.default_rng(ant) for ant in range(n_ants)], **options)
+
+
+def test_step_budget_cuts_long_walks():
+    walk_graph = prepare_walk_graph(CITY, 1.0)
+    start, end = to_dense(walk_graph, [1, 60])
+
+    routes = _walk(walk_graph, start, end, max_steps=20)
+
+    cut = routes.status == WALK_CUT
+    assert cut.any()
+    assert np.all(np.isinf(routes.costs[cut]))
+    assert routes.lengths.max() <= 21
+
+
+def test_cost_budget_cuts_expensive_walks():
+    walk_graph = prepare_walk_graph(CITY, 1.0)
+    start, end = to_dense(walk_graph, [1, 60])
+    limit = 1.5 * distances_to(walk_graph, end)[start]
+
+    routes = _walk(walk_graph, start, end, max_cost=limit)
+
+    assert np.any(routes.status == WALK_CUT)
+    for ant in np.flatnonzero(routes.status == WALK_OK):
+        # Only the step onto the food may cross the limit
+        assert routes.costs[ant] - walk_graph["weights"][routes.edge_path(ant)[-1]] <= limit
+
+
+def test_steps_back_count_towards_the_step_budget():
+    # 0 -> 1 -> 2 -> 3 with a dead end 1 -> 4 -> 5 and a pocket 2 -> 6 <-> 7
+    pockets = {
+        "node_index": set(range(8)),
+        "connections": {0: [1], 1: [4, 2], 2: [6, 3], 3: [], 4: [5], 5: [], 6: [7, 2], 7: [6]},
+        "weights": {0: [1.0], 1: [1.0, 1.0], 2: [1.0, 1.0], 3: [], 4: [1.0], 5: [], 6: [1.0, 1.0], 7: [1.0]},
+    }
+    walk_graph = prepare_walk_graph(pockets, 1.0)
+    start, end = to_dense(walk_graph, [0, 3])
+
+    routes = _walk(walk_graph, start, end, backtrack=4, max_steps=4)
+
+    detoured = routes.status == WALK_CUT
+    assert detoured.any()
+    assert np.all(routes.costs[~detoured] == 3.0)
+
+
+def test_colony_counts_cut_ants():
+    state = run_colony(CITY, 1, 60, ACOStrategy(0.3), 15, 10, 0.5, 1.0, 1.0, backend="python", seed=0, cost_limit=1.2)
+
+    assert state.cut_ants > 0
+    assert np.isfinite(state.best_cost)
+
+
+def test_best_cost_reference_leaves_the_first_epoch_unbounded():
+    bounded = run_colony(CITY, 1, 60, ACOStrategy(0.3), 15, 1, 0.5, 1.0, 1.0, backend="python", seed=0,
+                         cost_limit=1.0, cost_limit_reference="best")
+    free = run_colony(CITY, 1, 60, ACOStrategy(0.3), 15, 1, 0.5, 1.0, 1.0, backend="python", seed=0)
+
+    assert bounded.cut_ants == 0
+    assert np.array_equal(bounded.distances, free.distances)
+
+
+def test_step_budget_never_raises_the_strategy_limit():
+    state = run_colony(CITY, 1, 60, MaxMinStrategy(0.3, 0.2, 0.1, 5.0), 10, 2, 0.5, 1.0, 1.0, backend="python",
+                       seed=0, max_steps=10)
+
+    assert state.routes.lengths.max() <= 11
+
+
+def test_invalid_cost_limits_are_rejected():
+    with pytest.raises(ValueError):
+        run_colony(CITY, 1, 60, ACOStrategy(0.3), 2, 1, 0.5, 1.0, 1.0, backend="python", cost_limit=0)
+    with pytest.raises(ValueError):
+        run_colony(CITY, 1, 60, ACOStrategy(0.3), 2, 1, 0.5, 1.0, 1.0, backend="python", cost_limit=2.0,
+                   cost_limit_reference="median")
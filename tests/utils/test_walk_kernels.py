@@ -0,0 +1,122 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from src.scripts.ant_best_worst.ant_solution_ABW import ant_solution_best_worst
+from src.scripts.ant_colony_simple_ACO.ant_solution_ACO import ant_solution_ACO
+from src.scripts.ant_colony_system.ant_solution_ACS import ant_solution_ACS
+from src.scripts.ant_max_min.ant_solution_MAXMIN import ant_solution_MAXMIN
+from src.scripts.utils.generators import generate_pheromone_map
+from src.scripts.utils.node_index import to_dense, to_external
+from src.scripts.utils.route_buffer import RouteBuffer
+from src.scripts.utils.walk_kernels import HAS_NUMBA, WALK_OK, prepare_walk_graph, run_ant_walks, walk_ants
+
+START, END = 1, 60
+ALPHA, BETA, Q0 = 0.7, 0.4, 0.2
+
+
+def _kernel_walks(city, n_ants, seed, **walk_options):
+    walk_graph = prepare_walk_graph(city, BETA)
+    start, end = to_dense(walk_graph, [START, END])
+    rng_state = np.random.get_state()
+    np.random.seed(seed)
+    tau = np.random.uniform(0.1, 1.0, walk_graph["indices"].size)
+    paths, _, costs, status = run_ant_walks(walk_graph, tau, start, end, n_ants, ALPHA, backend="python", **walk_options)
+    np.random.set_state(rng_state)
+    return walk_graph, tau, paths, costs, status
+
+
+def _pheromone_dict(city, walk_graph, tau):
+    """Dict pheromone map holding the same values as the flat kernel array."""
+    pheromone_graph = generate_pheromone_map(city, 0.0)
+    indptr = walk_graph["indptr"]
+    for dense, node in enumerate(walk_graph["node_ids"].tolist()):
+        if node in pheromone_graph:
+            pheromone_graph[node] = tau[indptr[dense]:indptr[dense + 1]].copy()
+    return pheromone_graph
+
+
+@pytest.mark.parametrize("variant", ["ACO", "ABW", "ACS", "MAXMIN"])
+def test_python_kernel_matches_reference_ant_solutions(city, variant):
+    """With the same seed the kernel walks exactly the paths of the reference solvers."""
+    n_ants = 20
+    max_steps = max(len(city["node_index"]), 50)
+    options = {"ACO": {}, "ABW": {}, "ACS": {"q0": Q0}, "MAXMIN": {"q0": Q0, "revisit": True, "max_steps": max_steps}}[variant]
+    walk_graph, tau, paths, costs, _ = _kernel_walks(city, n_ants, seed=3, **options)
+    pheromone_graph = _pheromone_dict(city, walk_graph, tau)
+
+    np.random.seed(3)
+    np.random.uniform(0.1, 1.0, tau.size)  # same draws as the kernel setup
+    for ant in range(n_ants):
+        if variant == "ACO":
+            path, cost = ant_solution_ACO(city, pheromone_graph, START, END, ALPHA, BETA)
+        elif variant == "ABW":
+            path, cost = ant_solution_best_worst(city, pheromone_graph, START, END, ALPHA, BETA)
+        elif variant == "ACS":
+            path, cost = ant_solution_ACS(city, pheromone_graph, START, END, Q0, ALPHA, BETA)
+        else:
+            path, cost = ant_solution_MAXMIN(city, pheromone_graph, START, END, Q0, ALPHA, BETA)
+
+        kernel_path = to_external(walk_graph, paths[ant])
+        if np.isfinite(cost):
+            assert kernel_path == path
+            assert costs[ant] == cost
+        else:
+            assert not np.isfinite(costs[ant])
+            assert kernel_path == [node for node in path if node != np.inf]
+
+
+def test_kernel_paths_are_valid_walks(city):
+    """Successful walks go from start to end over real edges without revisits."""
+    walk_graph, _, paths, costs, status = _kernel_walks(city, 30, seed=5)
+    start, end = to_dense(walk_graph, [START, END])
+
+    for path, cost, outcome in zip(paths, costs, status):
+        assert path[0] == start
+        if outcome == WALK_OK:
+            assert path[-1] == end
+            assert len(set(path.tolist())) == len(path)
+            assert np.isfinite(cost)
+
+
+@pytest.mark.skipif(not HAS_NUMBA, reason="numba is not installed")
+def test_numba_backend_matches_python_backend_statistics(city):
+    """The compiled kernel walks valid paths with the same cost distribution support."""
+    walk_graph = prepare_walk_graph(city, BETA)
+    start, end = to_dense(walk_graph, [START, END])
+    tau = np.full(walk_graph["indices"].size, 0.5)
+
+    np.random.seed(0)
+    paths, _, costs, status = run_ant_walks(walk_graph, tau, start, end, 50, ALPHA, backend="numba")
+    for path, outcome in zip(paths, status):
+        assert path[0] == start
+        if outcome == WALK_OK:
+            assert path[-1] == end
+    assert np.isfinite(costs).any()
+
+
+def test_thread_pool_walks_match_sequential_walks(city):
+    walk_graph = prepare_walk_graph(city, BETA)
+    start, end = to_dense(walk_graph, [START, END])
+    tau = np.random.default_rng(1).uniform(0.1, 1.0, walk_graph["indices"].size)
+    results = []
+    with ThreadPoolExecutor(3) as pool:
+        for threads, shared_pool in ((1, None), (3, None), (3, pool), (3, pool)):
+            rngs = [np.random.default_rng(ant) for ant in range(10)]
+            paths, edges, costs, status = run_ant_walks(walk_graph, tau, start, end, 10, ALPHA, q0=Q0,
+                                                        backend="python", rngs=rngs, backtrack=5, threads=threads,
+                                                        pool=shared_pool)
+            results.append(([p.tolist() for p in paths], [e.tolist() for e in edges], costs.tolist(), status.tolist()))
+    assert all(result == results[0] for result in results)
+
+    # Routes longer than the buffer grow it while the other groups keep storing
+    routes = walk_ants(walk_graph, tau, start, end, RouteBuffer(10, capacity=2), ALPHA, q0=Q0, backend="python",
+                       rngs=[np.random.default_rng(ant) for ant in range(10)], backtrack=5, threads=3)
+    assert [routes.path(ant).tolist() for ant in range(10)] == results[0][0]
+
+    with pytest.raises(ValueError):
+        run_ant_walks(walk_graph, tau, start, end, 10, ALPHA, backend="python", threads=2)
+    with pytest.raises(ValueError):
+        run_ant_walks(walk_graph, tau, start, end, 10, ALPHA, backend="python", threads=2, local_rho=0.1,
+                      rngs=[np.random.default_rng(ant) for ant in range(10)])